@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Figure Path Benchmark
+기존 경로(페이지 PNG → PNG 크롭 → WebP)와 직접 경로(clip pixmap → WebP)의 시간/디스크 I/O 비교
+
+기존: render_page_images → crop_and_save(PNG) → convert_png_to_webp
+      인코딩 3회(페이지 PNG, 크롭 PNG, WebP) + 디코딩 2회(페이지 PNG, 크롭 PNG)
+직접: extract_figure_region(webp=True)
+      인코딩 1회(WebP), 디코딩 없음
+
+Usage:
+    python benchmark_figure_paths.py <pdf_path> [figures.json] [--dpi 150] [--repeat 3]
+    (figures.json이 없으면 각 페이지 중앙 영역을 Figure로 가정)
+"""
+
+import os
+import json
+import time
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Dict, List
+
+import fitz  # PyMuPDF
+from PIL import Image
+
+from pdf_page_renderer import extract_figure_region, WEBP_QUALITY, WEBP_METHOD
+
+
+def _default_figures(doc: fitz.Document, dpi: int) -> List[Dict]:
+    zoom = dpi / 72
+    figures = []
+    for page in doc:
+        w, h = page.rect.width * zoom, page.rect.height * zoom
+        figures.append({
+            "page": page.number + 1,
+            "figure_id": f"page{page.number + 1}_center",
+            "name": f"Page {page.number + 1} center",
+            "crop_box": (int(w * 0.1), int(h * 0.15), int(w * 0.9), int(h * 0.6))
+        })
+    return figures
+
+
+def run_legacy(pdf_path: str, figures: List[Dict], work_dir: str, dpi: int) -> Dict:
+    """기존 경로: 페이지 PNG 저장 → 다시 읽어 PNG 크롭 저장 → 다시 읽어 WebP 저장"""
+    pages_dir = os.path.join(work_dir, "pages")
+    selected_dir = os.path.join(work_dir, "selected")
+    webp_dir = os.path.join(selected_dir, "webp")
+    os.makedirs(pages_dir)
+    os.makedirs(webp_dir)
+    written = read = 0
+
+    doc = fitz.open(pdf_path)
+    zoom = dpi / 72
+    for page_number in sorted({f["page"] for f in figures}):
+        path = os.path.join(pages_dir, f"page_{page_number}.png")
+        doc[page_number - 1].get_pixmap(matrix=fitz.Matrix(zoom, zoom)).save(path)
+        written += os.path.getsize(path)
+    doc.close()
+
+    for fig in figures:
+        page_path = os.path.join(pages_dir, f"page_{fig['page']}.png")
+        crop_path = os.path.join(selected_dir, f"{fig['figure_id']}.png")
+        webp_path = os.path.join(webp_dir, f"{fig['figure_id']}.webp")
+
+        read += os.path.getsize(page_path)
+        with Image.open(page_path) as img:
+            img.crop(fig["crop_box"]).save(crop_path, quality=95)
+        written += os.path.getsize(crop_path)
+
+        read += os.path.getsize(crop_path)
+        with Image.open(crop_path) as img:
+            img.save(webp_path, "WEBP", quality=WEBP_QUALITY, method=WEBP_METHOD)
+        written += os.path.getsize(webp_path)
+
+    return {"bytes_written": written, "bytes_read": read, "encodes": len(figures) * 2 + len({f["page"] for f in figures}), "decodes": len(figures) * 2}
+
+
+def run_direct(pdf_path: str, figures: List[Dict], work_dir: str, dpi: int) -> Dict:
+    """직접 경로: clip pixmap → WebP"""
+    selected_dir = os.path.join(work_dir, "selected")
+    os.makedirs(selected_dir)
+    written = 0
+
+    doc = fitz.open(pdf_path)
+    encodes = 0
+    for fig in figures:
+        result = extract_figure_region(
+            doc, fig["page"], fig["crop_box"], os.path.join(selected_dir, fig["figure_id"]), dpi, webp=True
+        )
+        written += os.path.getsize(result["path"])
+        encodes += 1 if result["method"] == "rendered" else 0
+    doc.close()
+
+    return {"bytes_written": written, "bytes_read": 0, "encodes": encodes, "decodes": 0}
+
+
+def benchmark(pdf_path: str, figures: List[Dict], dpi: int = 150, repeat: int = 3) -> Dict[str, Dict]:
+    """두 경로를 repeat회 실행하여 최소 시간과 I/O 비교"""
+    results = {}
+    for name, runner in (("legacy", run_legacy), ("direct", run_direct)):
+        best = None
+        for _ in range(repeat):
+            work_dir = tempfile.mkdtemp(prefix=f"bench_{name}_")
+            try:
+                start = time.perf_counter()
+                stats = runner(pdf_path, figures, work_dir, dpi)
+                stats["seconds"] = time.perf_counter() - start
+            finally:
+                shutil.rmtree(work_dir, ignore_errors=True)
+            if best is None or stats["seconds"] < best["seconds"]:
+                best = stats
+        results[name] = best
+    return results
+
+
+if __name__ == "__main__":
+    import sys
+
+    args = sys.argv[1:]
+    options = {"--dpi": 150, "--repeat": 3}
+    for flag in list(options):
+        if flag in args:
+            i = args.index(flag)
+            options[flag] = int(args[i + 1])
+            args = args[:i] + args[i + 2:]
+
+    if not args:
+        print("Usage: python benchmark_figure_paths.py <pdf_path> [figures.json] [--dpi 150] [--repeat 3]")
+        sys.exit(1)
+
+    pdf_path = args[0]
+    if len(args) > 1:
+        with open(args[1], "r", encoding="utf-8") as f:
+            figures = json.load(f)
+        if isinstance(figures, dict):
+            figures = figures["figures"]
+    else:
+        doc = fitz.open(pdf_path)
+        figures = _default_figures(doc, options["--dpi"])
+        doc.close()
+
+    # 출력 로그는 측정 중 숨김
+    devnull = open(os.devnull, "w")
+    stdout, sys.stdout = sys.stdout, devnull
+    try:
+        results = benchmark(pdf_path, figures, options["--dpi"], options["--repeat"])
+    finally:
+        sys.stdout = stdout
+        devnull.close()
+
+    legacy, direct = results["legacy"], results["direct"]
+    print(f"=== {Path(pdf_path).name}: {len(figures)} figures @ {options['--dpi']} DPI ===\n")
+    print(f"{'':10}{'time':>10}{'written':>12}{'read':>12}{'encodes':>10}{'decodes':>10}")
+    for name, r in results.items():
+        print(f"{name:10}{r['seconds']:>9.2f}s{r['bytes_written'] / 1024:>10.0f}KB{r['bytes_read'] / 1024:>10.0f}KB"
+              f"{r['encodes']:>10}{r['decodes']:>10}")
+
+    saved_io = (legacy["bytes_written"] + legacy["bytes_read"]) - (direct["bytes_written"] + direct["bytes_read"])
+    print(f"\nI/O saved: {saved_io / 1024:.0f}KB, speedup: {legacy['seconds'] / max(direct['seconds'], 1e-9):.1f}x")
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Render Memory Check
+band 렌더링(render_page_banded)의 최대 메모리(RSS) 회귀 검사
+
+합성 포스터 PDF(A0, 세로 2배 A0)를 만들어 케이스마다 새 프로세스에서 렌더링하고,
+렌더링 전후 ru_maxrss 증가량을 측정한다.
+
+- 상한: band 렌더링 증가량이 --max-growth(MB) 이하
+- 페이지 크기 무관: 폭이 같고 높이만 2배인 페이지의 증가량 차이가 --max-height-delta(MB) 이하
+  (band 메모리는 폭 x band 높이에만 비례해야 함)
+- --compare: 전체 pixmap 렌더링(band_height=0) 증가량도 참고로 출력
+
+band 렌더링 출력은 PNG만 지원한다. WebP 인코더(Pillow/libwebp)는 전체 이미지를 한 번에
+받아야 하므로 band 스트리밍이 불가능하고, WebP는 Figure 단위 clip 렌더링
+(extract_figure_region(webp=True))에서 만든다.
+
+Usage:
+    python check_render_memory.py [--dpi 300] [--band-height 512] [--max-growth 150] [--max-height-delta 16] [--compare]
+"""
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+import resource
+import subprocess
+from pathlib import Path
+from typing import Dict
+
+import fitz  # PyMuPDF
+
+
+A0 = (2384, 3370)  # pt
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return peak / 1024 if sys.platform == "darwin" else peak
+
+
+def make_poster_pdf(path: str, width: float, height: float):
+    """벡터 선/사각형과 텍스트로 페이지 전체를 채운 한 페이지 PDF"""
+    doc = fitz.open()
+    page = doc.new_page(width=width, height=height)
+    for y in range(40, int(height) - 40, 60):
+        page.draw_line((40, y), (width - 40, y), color=(0.2, 0.3, 0.6), width=1.5)
+        page.insert_text((50, y - 10), f"Poster row {y}: aligner outcome measurements", fontsize=14)
+    for x in range(40, int(width) - 200, 240):
+        for y in range(80, int(height) - 200, 480):
+            page.draw_rect(fitz.Rect(x, y, x + 200, y + 160), color=(0.6, 0.1, 0.1), fill=(0.95, 0.9, 0.8))
+    doc.save(path)
+    doc.close()
+
+
+def measure(pdf_path: str, dpi: int, band_height: int) -> Dict:
+    """새 프로세스에서 첫 페이지를 렌더링하고 RSS 증가량 측정"""
+    output = subprocess.run(
+        [sys.executable, __file__, "--child", pdf_path, str(dpi), str(band_height)],
+        capture_output=True, text=True, check=True, cwd=str(Path(__file__).parent)
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def _child(pdf_path: str, dpi: int, band_height: int):
+    from pdf_page_renderer import render_page_banded
+
+    doc = fitz.open(pdf_path)
+    page = doc[0]
+    matrix = fitz.Matrix(dpi / 72, dpi / 72)
+    output_path = os.path.join(os.path.dirname(pdf_path), f"render_{band_height}.png")
+    before = _peak_rss_mb()
+
+    if band_height:
+        result = render_page_banded(page, matrix, output_path, band_height)
+    else:
+        pix = page.get_pixmap(matrix=matrix)
+        pix.save(output_path)
+        result = {"width": pix.width, "height": pix.height, "bands": 1}
+        pix = None
+
+    result["growth_mb"] = _peak_rss_mb() - before
+    doc.close()
+    os.remove(output_path)
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        _child(sys.argv[2], int(sys.argv[3]), int(sys.argv[4]))
+        sys.exit(0)
+
+    args = sys.argv[1:]
+    options = {"--dpi": 300, "--band-height": 512, "--max-growth": 150, "--max-height-delta": 16}
+    for flag in list(options):
+        if flag in args:
+            i = args.index(flag)
+            options[flag] = int(args[i + 1])
+            args = args[:i] + args[i + 2:]
+    compare = "--compare" in args
+
+    work_dir = tempfile.mkdtemp(prefix="render_memory_")
+    failed = False
+    try:
+        cases = {"A0": A0, "A0 x2 height": (A0[0], A0[1] * 2)}
+        growth = {}
+        print(f"=== band rendering @ {options['--dpi']} DPI, band height {options['--band-height']}px ===\n")
+        for name, (width, height) in cases.items():
+            pdf_path = os.path.join(work_dir, f"{name.replace(' ', '_')}.pdf")
+            make_poster_pdf(pdf_path, width, height)
+            result = measure(pdf_path, options["--dpi"], options["--band-height"])
+            growth[name] = result["growth_mb"]
+            full_mb = result["width"] * result["height"] * 3 / 1024 / 1024
+            line = (f"  {name:14}{result['width']}x{result['height']}px, {result['bands']} bands, "
+                    f"peak +{result['growth_mb']:.0f}MB (full pixmap {full_mb:.0f}MB)")
+            if compare:
+                line += f", unbanded +{measure(pdf_path, options['--dpi'], 0)['growth_mb']:.0f}MB"
+            print(line)
+
+        for name, value in growth.items():
+            if value > options["--max-growth"]:
+                print(f"[FAIL] {name}: peak RSS growth {value:.0f}MB exceeds {options['--max-growth']}MB")
+                failed = True
+
+        delta = abs(growth["A0 x2 height"] - growth["A0"])
+        if delta > options["--max-height-delta"]:
+            print(f"[FAIL] Peak RSS grows with page height: +{delta:.0f}MB for 2x height "
+                  f"(limit {options['--max-height-delta']}MB)")
+            failed = True
+
+        if not failed:
+            print(f"\n[OK] Peak RSS bounded (2x height: {delta:+.0f}MB)")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    sys.exit(2 if failed else 0)
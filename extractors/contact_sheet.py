@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Contact Sheet Generator
+렌더링된 페이지로 썸네일과 페이지 번호가 표시된 contact sheet 생성
+
+- image_curator가 논문 전체를 1-2장의 이미지로 먼저 훑어본 뒤 후보 페이지만 원본 해상도로 확인
+- 썸네일은 원본 페이지보다 새로우면 재사용 (렌더링 캐시 기준)
+- {pdf_name}_pages.json이 있으면 Figure/Table 언급 페이지를 라벨에 표시
+
+Usage:
+    python contact_sheet.py <pdf_name> [pages_dir] [--columns 4] [--rows 3] [--width 360]
+"""
+
+import os
+import re
+import json
+from pathlib import Path
+from typing import Dict, List
+
+from PIL import Image, ImageDraw, ImageFont
+
+
+THUMB_WIDTH = 360
+LABEL_HEIGHT = 28
+GAP = 8
+BACKGROUND = (235, 235, 235)
+HIGHLIGHT = (214, 69, 65)
+
+
+def list_rendered_pages(pages_dir: str, pdf_name: str) -> List[Dict]:
+    """
+    렌더링된 페이지 목록 ({pdf_name}_pages.json 우선, 없으면 파일명에서 페이지 번호 추출)
+
+    Returns:
+        [{"page_number", "filepath", "has_figures"}, ...] (페이지 순)
+    """
+    metadata_path = os.path.join(pages_dir, f"{pdf_name}_pages.json")
+    if os.path.exists(metadata_path):
+        with open(metadata_path, "r", encoding="utf-8") as f:
+            pages = json.load(f)
+        return [
+            {
+                "page_number": p["page_number"],
+                "filepath": os.path.join(pages_dir, p["filename"]),
+                "has_figures": p.get("has_figures", False)
+            }
+            for p in pages
+        ]
+
+    pattern = re.compile(rf'^{re.escape(pdf_name)}_page_(\d+)\.png$')
+    pages = []
+    for filename in os.listdir(pages_dir):
+        match = pattern.match(filename)
+        if match:
+            pages.append({
+                "page_number": int(match.group(1)),
+                "filepath": os.path.join(pages_dir, filename),
+                "has_figures": False
+            })
+    return sorted(pages, key=lambda p: p["page_number"])
+
+
+def make_thumbnail(page_path: str, thumb_path: str, width: int = THUMB_WIDTH) -> str:
+    """페이지 썸네일 생성 (이미 있고 원본보다 새로우면 재사용)"""
+    if os.path.exists(thumb_path) and os.path.getmtime(thumb_path) >= os.path.getmtime(page_path):
+        return thumb_path
+
+    with Image.open(page_path) as img:
+        img = img.convert("RGB")
+        img.thumbnail((width, width * 4), Image.Resampling.LANCZOS)
+        img.save(thumb_path, "PNG", optimize=True)
+    return thumb_path
+
+
+def _label_font(size: int = 18):
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:  # Pillow < 10.1
+        return ImageFont.load_default()
+
+
+def make_contact_sheets(
+    pdf_name: str,
+    pages_dir: str = "output/images/pages",
+    output_dir: str = None,
+    columns: int = 4,
+    rows: int = 3,
+    width: int = THUMB_WIDTH
+) -> List[str]:
+    """
+    페이지 썸네일을 격자로 배치한 contact sheet 생성
+
+    Args:
+        pdf_name: PDF 파일명 (확장자 제외, 렌더링 파일 prefix)
+        pages_dir: 렌더링된 페이지 디렉토리
+        output_dir: 출력 디렉토리 (기본: pages_dir/contact)
+        columns, rows: sheet 한 장의 격자 크기
+        width: 썸네일 너비 (px)
+
+    Returns:
+        생성된 sheet 경로 리스트
+    """
+    pages = list_rendered_pages(pages_dir, pdf_name)
+    if not pages:
+        print(f"  [FAIL] No rendered pages for {pdf_name} in {pages_dir}")
+        return []
+
+    output_dir = output_dir or os.path.join(pages_dir, "contact")
+    thumb_dir = os.path.join(output_dir, "thumbs")
+    os.makedirs(thumb_dir, exist_ok=True)
+
+    thumbs = []
+    for page in pages:
+        thumb_path = os.path.join(thumb_dir, f"{pdf_name}_page_{page['page_number']}_thumb.png")
+        thumbs.append((page, make_thumbnail(page["filepath"], thumb_path, width)))
+
+    font = _label_font()
+    per_sheet = columns * rows
+    sheets = []
+
+    for sheet_index in range(0, len(thumbs), per_sheet):
+        batch = thumbs[sheet_index:sheet_index + per_sheet]
+        images = [Image.open(path) for _, path in batch]
+        cell_height = max(img.height for img in images) + LABEL_HEIGHT
+        used_rows = (len(batch) + columns - 1) // columns
+
+        sheet = Image.new(
+            "RGB",
+            (columns * (width + GAP) + GAP, used_rows * (cell_height + GAP) + GAP),
+            BACKGROUND
+        )
+        draw = ImageDraw.Draw(sheet)
+
+        for i, ((page, _), img) in enumerate(zip(batch, images)):
+            x = GAP + (i % columns) * (width + GAP)
+            y = GAP + (i // columns) * (cell_height + GAP)
+            label = f"p.{page['page_number']}" + ("  * Fig/Table" if page["has_figures"] else "")
+            draw.text((x + 4, y + 4), label, fill=HIGHLIGHT if page["has_figures"] else (0, 0, 0), font=font)
+            sheet.paste(img, (x, y + LABEL_HEIGHT))
+            img.close()
+
+        sheet_path = os.path.join(output_dir, f"{pdf_name}_sheet_{sheet_index // per_sheet + 1}.png")
+        sheet.save(sheet_path, "PNG", optimize=True)
+        sheets.append(sheet_path)
+
+        first, last = batch[0][0]["page_number"], batch[-1][0]["page_number"]
+        print(f"  [OK] Sheet {len(sheets)}: pages {first}-{last} ({sheet.width}x{sheet.height}px) -> {sheet_path}")
+
+    return sheets
+
+
+if __name__ == "__main__":
+    import sys
+
+    args = sys.argv[1:]
+    options = {"--columns": 4, "--rows": 3, "--width": THUMB_WIDTH}
+    for flag in list(options):
+        if flag in args:
+            i = args.index(flag)
+            options[flag] = int(args[i + 1])
+            args = args[:i] + args[i + 2:]
+
+    if not args:
+        print("Usage: python contact_sheet.py <pdf_name> [pages_dir] [--columns 4] [--rows 3] [--width 360]")
+        sys.exit(1)
+
+    pdf_name = Path(args[0]).stem if args[0].lower().endswith(".pdf") else args[0]
+    pages_dir = args[1] if len(args) > 1 else "output/images/pages"
+
+    sheets = make_contact_sheets(
+        pdf_name, pages_dir, columns=options["--columns"], rows=options["--rows"], width=options["--width"]
+    )
+    print(f"\nCreated {len(sheets)} contact sheets")
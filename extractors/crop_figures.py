@@ -2,10 +2,21 @@
 """
 Figure Cropper
 렌더링된 페이지에서 Figure 영역만 크롭하여 저장
+
+논문별 crop_figures_[논문ID].py는 figures 목록만 정의하고 crop_figure_list()로 실행한다
+(--trim 처리, 크롭, crop_manifest.json 기록이 모든 스크립트에서 같게 동작).
+
+Usage:
+    python crop_figures.py [--trim]   # --trim: 내용 영역 + 캡션에 맞춰 crop_box 자동 보정
 """
 
 from PIL import Image
 import os
+import sys
+import json
+from typing import Dict, List
+
+from crop_trim import trim_figures
 
 
 def crop_and_save(input_path: str, output_path: str, crop_box: tuple, figure_name: str):
@@ -25,10 +36,95 @@ def crop_and_save(input_path: str, output_path: str, crop_box: tuple, figure_nam
     return cropped.size
 
 
+def crop_figure_list(
+    figures: List[Dict],
+    prefix: str,
+    base_dir: str = "output/images/pages",
+    output_dir: str = "output/images/selected",
+    trim: bool = False
+) -> List[Dict]:
+    """
+    figures 목록을 렌더링된 페이지에서 크롭
+
+    Args:
+        figures: [{"page", "figure_id", "name", "crop_box"}, ...]
+        prefix: 페이지 이미지 파일명 prefix ({prefix}_page_{N}.png)
+        base_dir: 페이지 이미지 디렉토리
+        output_dir: 크롭 결과 디렉토리
+        trim: 내용 영역 + "Fig. N" 캡션에 맞춰 crop_box 자동 보정 ({prefix}_text.bin이 있으면 캡션 포함)
+
+    Returns:
+        실제 사용한 crop_box가 담긴 figures (trim 시 original_box 포함)
+
+    output_dir/crop_manifest.json에 실제 crop_box를 기록한다 (crop_review.py 검증 루프용).
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
+    def page_path(page: int) -> str:
+        return os.path.join(base_dir, f"{prefix}_page_{page}.png")
+
+    if trim:
+        text_store_path = os.path.join(base_dir, f"{prefix}_text.bin")
+        text_store = None
+        if os.path.exists(text_store_path):
+            from text_extractor import PageTextStore
+            text_store = PageTextStore(text_store_path)
+
+        # 페이지 이미지가 없는 Figure는 보정하지 않음 (아래에서 [FAIL] 출력)
+        available = [fig for fig in figures if os.path.exists(page_path(fig["page"]))]
+        trimmed = {fig["figure_id"]: fig for fig in trim_figures(available, page_path, text_store=text_store)}
+        figures = [trimmed.get(fig["figure_id"], fig) for fig in figures]
+        for fig in figures:
+            if "original_box" in fig:
+                print(f"  [TRIM] {fig['name']}: {fig['original_box']} -> {fig['crop_box']}")
+        print()
+
+    print(f"Cropping {len(figures)} figures...\n")
+
+    for fig in figures:
+        input_path = page_path(fig["page"])
+        output_path = os.path.join(output_dir, f"{fig['figure_id']}.png")
+
+        if not os.path.exists(input_path):
+            print(f"  [FAIL] Page {fig['page']} not found: {input_path}")
+            continue
+
+        crop_and_save(input_path, output_path, fig["crop_box"], fig["name"])
+
+    manifest_path = write_crop_manifest(figures, prefix, base_dir, output_dir)
+    print(f"\nCrop manifest: {manifest_path}")
+
+    return figures
+
+
+def write_crop_manifest(figures: List[Dict], prefix: str, base_dir: str, output_dir: str) -> str:
+    """
+    검증 루프용 crop manifest 저장 (crop_review.py 입력)
+
+    Args:
+        figures: 실제 사용한 crop_box가 담긴 figures
+        prefix: 페이지 이미지 파일명 prefix
+        base_dir: 페이지 이미지 디렉토리
+        output_dir: 크롭 결과 디렉토리
+
+    Returns:
+        저장된 manifest 경로
+    """
+    manifest_path = os.path.join(output_dir, "crop_manifest.json")
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "pdf_name": prefix,
+            "pages_dir": base_dir,
+            "figures": [
+                {key: fig[key] for key in ("page", "figure_id", "name", "crop_box")} for fig in figures
+            ]
+        }, f, ensure_ascii=False, indent=2)
+    return manifest_path
+
+
 def main():
     base_dir = "output/images/pages"
     output_dir = "output/images/selected"
-    os.makedirs(output_dir, exist_ok=True)
 
     # 파일명 prefix
     prefix = "2020_EJO_Treatment outcome with orthodontic aligners"
@@ -63,17 +159,7 @@ def main():
         },
     ]
 
-    print(f"Cropping {len(figures)} figures...\n")
-
-    for fig in figures:
-        input_path = os.path.join(base_dir, f"{prefix}_page_{fig['page']}.png")
-        output_path = os.path.join(output_dir, f"{fig['figure_id']}.png")
-
-        if not os.path.exists(input_path):
-            print(f"  [FAIL] Page {fig['page']} not found: {input_path}")
-            continue
-
-        crop_and_save(input_path, output_path, fig["crop_box"], fig["name"])
+    crop_figure_list(figures, prefix, base_dir, output_dir, trim="--trim" in sys.argv)
 
     print(f"\nDone! Cropped figures saved to: {output_dir}/")
 
@@ -4,27 +4,19 @@ Figure Cropper for 2025 IJOS Expert Consensus Paper
 렌더링된 페이지에서 Figure 영역만 크롭하여 저장
 
 페이지 크기: 1241x1648px
-"""
 
-from PIL import Image
-import os
+Usage:
+    python crop_figures_2025_ijos.py [--trim]
+"""
 
+import sys
 
-def crop_and_save(input_path: str, output_path: str, crop_box: tuple, figure_name: str):
-    """
-    이미지에서 지정된 영역을 크롭하여 저장
-    """
-    img = Image.open(input_path)
-    cropped = img.crop(crop_box)
-    cropped.save(output_path, quality=95)
-    print(f"  [OK] {figure_name}: {cropped.size[0]}x{cropped.size[1]}px -> {output_path}")
-    return cropped.size
+from crop_figures import crop_figure_list
 
 
 def main():
     base_dir = "output/images/pages"
     output_dir = "output/images/selected"
-    os.makedirs(output_dir, exist_ok=True)
 
     prefix = "2025. IJOS.  Expert consensus on the clinical strategies for orthodontic treatment with clear aligners"
 
@@ -118,17 +110,7 @@ def main():
         },
     ]
 
-    print(f"Cropping {len(figures)} figures from 2025 IJOS paper...\n")
-
-    for fig in figures:
-        input_path = os.path.join(base_dir, f"{prefix}_page_{fig['page']}.png")
-        output_path = os.path.join(output_dir, f"{fig['figure_id']}.png")
-
-        if not os.path.exists(input_path):
-            print(f"  [FAIL] Page {fig['page']} not found: {input_path}")
-            continue
-
-        crop_and_save(input_path, output_path, fig["crop_box"], fig["name"])
+    crop_figure_list(figures, prefix, base_dir, output_dir, trim="--trim" in sys.argv)
 
     print(f"\nDone! Cropped figures saved to: {output_dir}/")
 
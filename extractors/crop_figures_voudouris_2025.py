@@ -1,8 +1,12 @@
 """
 Figure Cropper for Voudouris et al. 2025 - Aligner MA Guidelines
+
+Usage:
+    python crop_figures_voudouris_2025.py [--trim]
 """
-from PIL import Image
-import os
+import sys
+
+from crop_figures import crop_figure_list
 
 # 크롭할 Figure 정의
 figures = [
@@ -41,27 +45,8 @@ figures = [
 def crop_figures():
     input_dir = "output/images/pages"
     output_dir = "output/images/cropped"
-    os.makedirs(output_dir, exist_ok=True)
-
-    for fig in figures:
-        page_file = f"paper_gdrive_page_{fig['page']}.png"
-        input_path = os.path.join(input_dir, page_file)
-        output_path = os.path.join(output_dir, f"{fig['figure_id']}.png")
-
-        if not os.path.exists(input_path):
-            print(f"File not found: {input_path}")
-            continue
-
-        img = Image.open(input_path)
-        cropped = img.crop(fig['crop_box'])
-        cropped.save(output_path, quality=95)
 
-        print(f"Cropped: {fig['name']}")
-        print(f"  Input: {input_path}")
-        print(f"  Output: {output_path}")
-        print(f"  Crop box: {fig['crop_box']}")
-        print(f"  Size: {cropped.size}")
-        print()
+    crop_figure_list(figures, "paper_gdrive", input_dir, output_dir, trim="--trim" in sys.argv)
 
 if __name__ == "__main__":
     crop_figures()
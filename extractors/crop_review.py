@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Crop Review
+크롭 검증 루프 보조 도구 - crop manifest의 박스를 페이지 위에 표시하고 반복 간 변경만 비교
+
+- overlay: 페이지(축소)에 모든 crop_box를 라벨과 함께 그림 (이전 반복 박스는 회색)
+- diff: 이전 반복 대비 박스가 바뀐 Figure만 추가(초록)/제외(빨강) 영역을 표시
+  바뀐 영역에 내용 픽셀이 없으면 (여백만 변경) 재검증 불필요로 표시
+- 반복 기록: {manifest}.history.json
+
+crop manifest (모든 crop_figures_*.py가 crop_figure_list()로 크롭 결과 디렉토리에 crop_manifest.json 저장):
+    {"pdf_name": "...", "pages_dir": "output/images/pages", "figures": [{"page", "figure_id", "name", "crop_box"}, ...]}
+
+Usage:
+    python crop_review.py <crop_manifest.json> [--scale 0.5]
+"""
+
+import os
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+
+BOX_COLORS = [(214, 69, 65), (46, 134, 222), (39, 174, 96), (243, 156, 18), (142, 68, 173)]
+PREVIOUS_COLOR = (150, 150, 150)
+ADDED_COLOR = np.array([39, 174, 96], dtype=np.float32)
+REMOVED_COLOR = np.array([214, 69, 65], dtype=np.float32)
+
+# 배경과 이만큼 다르면 내용 픽셀
+CONTENT_THRESHOLD = 24
+
+
+def load_manifest(manifest_path: str) -> Dict:
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if isinstance(manifest, list):
+        manifest = {"figures": manifest}
+    manifest.setdefault("pages_dir", "output/images/pages")
+    return manifest
+
+
+def _history_path(manifest_path: str) -> Path:
+    return Path(manifest_path).with_suffix(".history.json")
+
+
+def record_iteration(manifest_path: str, manifest: Dict) -> List[Dict]:
+    """
+    현재 박스를 반복 기록에 추가 (직전 반복과 같으면 추가하지 않음)
+
+    Returns:
+        전체 반복 기록 [{"iteration", "saved_at", "boxes": {figure_id: {"page", "crop_box"}}}, ...]
+    """
+    path = _history_path(manifest_path)
+    history = []
+    if path.exists():
+        with open(path, "r", encoding="utf-8") as f:
+            history = json.load(f)
+
+    boxes = {
+        fig["figure_id"]: {"page": fig["page"], "crop_box": list(fig["crop_box"])}
+        for fig in manifest["figures"]
+    }
+    if not history or history[-1]["boxes"] != boxes:
+        history.append({
+            "iteration": len(history) + 1,
+            "saved_at": datetime.now().isoformat(timespec="seconds"),
+            "boxes": boxes
+        })
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(history, f, ensure_ascii=False, indent=2)
+
+    return history
+
+
+def _page_path(manifest: Dict, page_number: int) -> str:
+    return os.path.join(manifest["pages_dir"], f"{manifest['pdf_name']}_page_{page_number}.png")
+
+
+def _font(size: int):
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:  # Pillow < 10.1
+        return ImageFont.load_default()
+
+
+def render_overlays(
+    manifest: Dict,
+    output_dir: str,
+    previous: Optional[Dict] = None,
+    scale: float = 0.5
+) -> List[str]:
+    """
+    페이지별 crop_box overlay 이미지 생성
+
+    Args:
+        manifest: load_manifest() 결과
+        output_dir: 출력 디렉토리
+        previous: 직전 반복의 boxes (회색으로 함께 표시)
+        scale: 페이지 축소 비율
+
+    Returns:
+        생성된 overlay 경로 리스트
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    font = _font(max(12, int(28 * scale)))
+    by_page: Dict[int, List[Dict]] = {}
+    for fig in manifest["figures"]:
+        by_page.setdefault(fig["page"], []).append(fig)
+
+    paths = []
+    for page_number, figures in sorted(by_page.items()):
+        with Image.open(_page_path(manifest, page_number)) as img:
+            page = img.convert("RGB")
+        page = page.resize((int(page.width * scale), int(page.height * scale)), Image.Resampling.BILINEAR)
+        draw = ImageDraw.Draw(page)
+
+        for i, fig in enumerate(figures):
+            old = (previous or {}).get(fig["figure_id"])
+            if old and old["page"] == page_number and list(old["crop_box"]) != list(fig["crop_box"]):
+                draw.rectangle([v * scale for v in old["crop_box"]], outline=PREVIOUS_COLOR, width=2)
+
+            color = BOX_COLORS[i % len(BOX_COLORS)]
+            box = [v * scale for v in fig["crop_box"]]
+            draw.rectangle(box, outline=color, width=3)
+            draw.text((box[0] + 4, box[1] + 4), fig["figure_id"], fill=color, font=font)
+
+        path = os.path.join(output_dir, f"{manifest['pdf_name']}_page_{page_number}_overlay.png")
+        page.save(path, "PNG", optimize=True)
+        paths.append(path)
+
+    return paths
+
+
+def page_background(gray: np.ndarray) -> float:
+    """페이지 배경 밝기 (가장 많은 grayscale 값)"""
+    return float(np.bincount(gray.astype(np.uint8).ravel(), minlength=256).argmax())
+
+
+def diff_crop(gray: np.ndarray, rgb: np.ndarray, old_box, new_box, background: float = None) -> Dict:
+    """
+    두 crop_box의 차이 (페이지 좌표계)
+
+    Args:
+        background: 페이지 배경 밝기 (기본: page_background(gray))
+
+    Returns:
+        {"box": 합집합 box, "image": 차이 표시 배열,
+         "added_px", "removed_px", "content_changed_px"}
+    """
+    height, width = gray.shape
+    left = max(0, min(old_box[0], new_box[0]))
+    top = max(0, min(old_box[1], new_box[1]))
+    right = min(width, max(old_box[2], new_box[2]))
+    bottom = min(height, max(old_box[3], new_box[3]))
+
+    ys, xs = np.mgrid[top:bottom, left:right]
+
+    def inside(box):
+        return (xs >= box[0]) & (xs < box[2]) & (ys >= box[1]) & (ys < box[3])
+
+    in_old, in_new = inside(old_box), inside(new_box)
+    added, removed = in_new & ~in_old, in_old & ~in_new
+
+    if background is None:
+        background = page_background(gray)
+    region = gray[top:bottom, left:right].astype(np.float32)
+    content = np.abs(region - background) > CONTENT_THRESHOLD
+
+    # 변경 없는 영역은 흐리게, 추가/제외 영역은 색으로 강조
+    image = rgb[top:bottom, left:right].astype(np.float32)
+    image[~(added | removed)] = image[~(added | removed)] * 0.35 + 255 * 0.65
+    image[added] = image[added] * 0.6 + ADDED_COLOR * 0.4
+    image[removed] = image[removed] * 0.6 + REMOVED_COLOR * 0.4
+
+    return {
+        "box": (left, top, right, bottom),
+        "image": image.astype(np.uint8),
+        "added_px": int(added.sum()),
+        "removed_px": int(removed.sum()),
+        "content_changed_px": int((content & (added | removed)).sum())
+    }
+
+
+def diff_iterations(manifest: Dict, history: List[Dict], output_dir: str) -> List[Dict]:
+    """
+    마지막 두 반복 사이에 박스가 바뀐 Figure의 차이 이미지 생성
+
+    Returns:
+        [{"figure_id", "old_box", "new_box", "added_px", "removed_px",
+          "content_changed_px", "needs_review", "diff_path"}, ...]
+    """
+    if len(history) < 2:
+        return []
+
+    os.makedirs(output_dir, exist_ok=True)
+    previous, current = history[-2]["boxes"], history[-1]["boxes"]
+    iteration = history[-1]["iteration"]
+    pages: Dict[int, tuple] = {}
+    report = []
+
+    for figure_id, new in current.items():
+        old = previous.get(figure_id)
+        if old is None or old["page"] != new["page"]:
+            # 새 Figure 또는 다른 페이지로 이동 -> 전체 검증
+            report.append({"figure_id": figure_id, "new_box": new["crop_box"], "needs_review": True})
+            continue
+        if old == new:
+            continue
+
+        page_number = new["page"]
+        if page_number not in pages:
+            with Image.open(_page_path(manifest, page_number)) as img:
+                rgb = np.asarray(img.convert("RGB"))
+            gray = rgb.mean(axis=2)
+            pages = {page_number: (gray, rgb, page_background(gray))}
+        gray, rgb, background = pages[page_number]
+
+        diff = diff_crop(gray, rgb, old["crop_box"], new["crop_box"], background)
+        diff_path = os.path.join(output_dir, f"{figure_id}_diff_iter{iteration}.png")
+        Image.fromarray(diff["image"]).save(diff_path, "PNG", optimize=True)
+
+        report.append({
+            "figure_id": figure_id,
+            "old_box": old["crop_box"],
+            "new_box": new["crop_box"],
+            "added_px": diff["added_px"],
+            "removed_px": diff["removed_px"],
+            "content_changed_px": diff["content_changed_px"],
+            "needs_review": diff["content_changed_px"] > 0,
+            "diff_path": diff_path
+        })
+
+    return report
+
+
+def review_manifest(manifest_path: str, scale: float = 0.5) -> Dict:
+    """
+    반복 기록 + overlay + 변경 diff를 한 번에 생성
+
+    Returns:
+        {"iteration", "overlays", "changes", "report_path"}
+    """
+    manifest = load_manifest(manifest_path)
+    history = record_iteration(manifest_path, manifest)
+    iteration = history[-1]["iteration"]
+    output_dir = os.path.join(manifest["pages_dir"], "review")
+
+    previous = history[-2]["boxes"] if len(history) > 1 else None
+    overlays = render_overlays(manifest, output_dir, previous, scale)
+    changes = diff_iterations(manifest, history, output_dir)
+
+    report = {"iteration": iteration, "overlays": overlays, "changes": changes}
+    report_path = os.path.join(output_dir, f"{manifest['pdf_name']}_review_iter{iteration}.json")
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    report["report_path"] = report_path
+    return report
+
+
+if __name__ == "__main__":
+    import sys
+
+    args = sys.argv[1:]
+    scale = 0.5
+    if "--scale" in args:
+        i = args.index("--scale")
+        scale = float(args[i + 1])
+        args = args[:i] + args[i + 2:]
+
+    if not args:
+        print("Usage: python crop_review.py <crop_manifest.json> [--scale 0.5]")
+        sys.exit(1)
+
+    report = review_manifest(args[0], scale)
+
+    print(f"Iteration {report['iteration']}")
+    for path in report["overlays"]:
+        print(f"  [OVERLAY] {path}")
+    for change in report["changes"]:
+        status = "REVIEW" if change["needs_review"] else "SKIP"
+        detail = f"{change['content_changed_px']} content px changed" if "content_changed_px" in change else "new/moved"
+        print(f"  [{status}] {change['figure_id']}: {detail}" + (f" -> {change['diff_path']}" if change.get("diff_path") else ""))
+    print(f"\nReport: {report['report_path']}")
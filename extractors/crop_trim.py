@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Crop Trimmer
+고정 여백으로 잡은 crop_box를 실제 내용 영역에 맞춰 자동으로 좁힘
+
+- 행/열 분산(variance)과 배경색 차이를 NumPy로 한 번에 계산하여 내용 bbox 탐색
+- 구조화 텍스트 캐시(*_text.bin)의 "Fig. N" 캡션 블록까지 포함하도록 확장
+- 같은 페이지의 crop은 페이지 이미지를 한 번만 로드
+
+Usage:
+    python crop_trim.py <page.png> <left,top,right,bottom> [--padding 8] [--text-store paper_text.bin --page 3 --figure 2]
+"""
+
+import re
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+
+CAPTION_PATTERN = re.compile(r'^\s*(?:Fig\.?|Figure)\s*(\d+)', re.IGNORECASE)
+
+# 배경과 구분되는 최소 행/열 분산, 평균 밝기 차이
+VARIANCE_THRESHOLD = 20.0
+MEAN_THRESHOLD = 8.0
+
+# 내용 bbox와 캡션 사이 최대 거리 (px)
+CAPTION_MAX_GAP = 80
+
+
+def content_bbox(gray: np.ndarray) -> Optional[Tuple[int, int, int, int]]:
+    """
+    grayscale 배열에서 내용 영역 bbox
+
+    배경은 테두리 픽셀의 중앙값. 분산이 크거나 평균이 배경과 다른 행/열을 내용으로 본다.
+
+    Returns:
+        (left, top, right, bottom) - 내용이 없으면 None
+    """
+    if gray.size == 0:
+        return None
+    gray = gray.astype(np.float32)
+    border = np.concatenate([gray[0], gray[-1], gray[:, 0], gray[:, -1]])
+    background = float(np.median(border))
+
+    rows = (gray.var(axis=1) > VARIANCE_THRESHOLD) | (np.abs(gray.mean(axis=1) - background) > MEAN_THRESHOLD)
+    cols = (gray.var(axis=0) > VARIANCE_THRESHOLD) | (np.abs(gray.mean(axis=0) - background) > MEAN_THRESHOLD)
+    if not rows.any() or not cols.any():
+        return None
+
+    top, bottom = np.flatnonzero(rows)[[0, -1]]
+    left, right = np.flatnonzero(cols)[[0, -1]]
+    return int(left), int(top), int(right) + 1, int(bottom) + 1
+
+
+def load_caption_boxes(text_store, page_number: int, dpi: int = 150) -> List[Dict]:
+    """
+    text_extractor.PageTextStore에서 페이지의 "Fig. N" 캡션 블록 (픽셀 좌표)
+
+    Returns:
+        [{"figure": N, "box": (left, top, right, bottom), "text"}, ...]
+    """
+    page = text_store.page(page_number)
+    spans = page["spans"]
+    zoom = dpi / 72
+
+    texts: Dict[int, str] = {}
+    for text, block in zip(spans["text"], spans["block"]):
+        texts[block] = texts.get(block, "") + text
+
+    captions = []
+    for block, text in texts.items():
+        match = CAPTION_PATTERN.match(text)
+        if match:
+            x0, y0, x1, y1 = page["blocks"]["bbox"][block]
+            captions.append({
+                "figure": int(match.group(1)),
+                "box": (int(x0 * zoom), int(y0 * zoom), int(np.ceil(x1 * zoom)), int(np.ceil(y1 * zoom))),
+                "text": text.strip()
+            })
+    return captions
+
+
+def snap_to_caption(
+    box: Tuple[int, int, int, int],
+    captions: List[Dict],
+    figure_number: int = None,
+    max_gap: int = CAPTION_MAX_GAP
+) -> Tuple[Tuple[int, int, int, int], Optional[Dict]]:
+    """
+    box 아래(우선) 또는 위의 가장 가까운 캡션을 포함하도록 확장
+
+    Args:
+        figure_number: 지정하면 해당 번호 캡션만 사용
+
+    Returns:
+        (확장된 box, 사용한 캡션 또는 None)
+    """
+    left, top, right, bottom = box
+    best, best_gap = None, max_gap
+
+    for caption in captions:
+        if figure_number is not None and caption["figure"] != figure_number:
+            continue
+        cl, ct, cr, cb = caption["box"]
+        if cr < left or cl > right:
+            continue
+        if ct >= bottom - 2:
+            gap = ct - bottom
+        elif cb <= top + 2:
+            gap = top - cb + max_gap / 4  # 위 캡션은 후순위
+        else:
+            gap = 0  # 이미 box와 겹침
+        if gap < best_gap:
+            best, best_gap = caption, gap
+
+    if best is None:
+        return box, None
+    cl, ct, cr, cb = best["box"]
+    return (min(left, cl), min(top, ct), max(right, cr), max(bottom, cb)), best
+
+
+def tighten_crop(
+    gray: np.ndarray,
+    crop_box: Tuple[int, int, int, int],
+    padding: int = 8,
+    captions: List[Dict] = None,
+    figure_number: int = None
+) -> Dict:
+    """
+    crop_box를 내용 영역 + 캡션으로 좁힘
+
+    Args:
+        gray: 페이지 전체 grayscale 배열
+        crop_box: 원래 (left, top, right, bottom)
+        padding: 결과 box 바깥 여백 (px)
+        captions: load_caption_boxes() 결과 (없으면 캡션 스냅 생략)
+        figure_number: 스냅할 Figure 번호
+
+    Returns:
+        {"crop_box", "original_box", "caption"}
+    """
+    height, width = gray.shape
+    left, top, right, bottom = crop_box
+    left, top = max(0, left), max(0, top)
+    right, bottom = min(width, right), min(height, bottom)
+
+    bbox = content_bbox(gray[top:bottom, left:right])
+    if bbox is None:
+        return {"crop_box": tuple(crop_box), "original_box": tuple(crop_box), "caption": None}
+
+    box = (left + bbox[0], top + bbox[1], left + bbox[2], top + bbox[3])
+    caption = None
+    if captions:
+        box, caption = snap_to_caption(box, captions, figure_number)
+
+    box = (
+        max(0, box[0] - padding), max(0, box[1] - padding),
+        min(width, box[2] + padding), min(height, box[3] + padding)
+    )
+    return {"crop_box": box, "original_box": tuple(crop_box), "caption": caption["text"] if caption else None}
+
+
+def figure_number_of(name: str) -> Optional[int]:
+    """'Fig. 3 - ...' / 'Figure 3 - ...' 형식 이름에서 번호 추출"""
+    match = CAPTION_PATTERN.match(name or "")
+    return int(match.group(1)) if match else None
+
+
+def trim_figures(
+    figures: List[Dict],
+    page_path_for,
+    padding: int = 8,
+    text_store=None,
+    dpi: int = 150
+) -> List[Dict]:
+    """
+    crop_figures_*.py 형식 figures 목록의 crop_box 일괄 보정
+
+    Args:
+        figures: [{"page", "figure_id", "name", "crop_box"}, ...]
+        page_path_for: 페이지 번호 -> 렌더링된 페이지 이미지 경로 함수
+        padding: 여백 (px)
+        text_store: PageTextStore (있으면 캡션 스냅)
+        dpi: 페이지 렌더링 DPI
+
+    Returns:
+        crop_box가 보정된 figures 사본 (original_box, caption 포함)
+    """
+    results: List[Optional[Dict]] = [None] * len(figures)
+    pages: Dict[int, np.ndarray] = {}
+    page_captions: Dict[int, List[Dict]] = {}
+
+    for index in sorted(range(len(figures)), key=lambda i: figures[i]["page"]):
+        fig = figures[index]
+        page_number = fig["page"]
+        if page_number not in pages:
+            # 페이지별로 한 번만 로드 (이전 페이지 배열은 해제)
+            pages = {page_number: np.asarray(Image.open(page_path_for(page_number)).convert("L"))}
+            page_captions = {page_number: load_caption_boxes(text_store, page_number, dpi) if text_store else []}
+
+        trimmed = tighten_crop(
+            pages[page_number], fig["crop_box"], padding,
+            page_captions[page_number], figure_number_of(fig.get("name"))
+        )
+        results[index] = {**fig, **trimmed}
+
+    return results
+
+
+if __name__ == "__main__":
+    import sys
+
+    args = sys.argv[1:]
+    options = {}
+    for flag in ("--padding", "--text-store", "--page", "--figure"):
+        if flag in args:
+            i = args.index(flag)
+            options[flag] = args[i + 1]
+            args = args[:i] + args[i + 2:]
+
+    if len(args) < 2:
+        print("Usage: python crop_trim.py <page.png> <left,top,right,bottom> [--padding 8]")
+        print("       [--text-store paper_text.bin --page 3 --figure 2]")
+        sys.exit(1)
+
+    gray = np.asarray(Image.open(args[0]).convert("L"))
+    crop_box = tuple(int(v) for v in args[1].split(","))
+
+    captions = None
+    if "--text-store" in options:
+        from text_extractor import PageTextStore
+        captions = load_caption_boxes(PageTextStore(options["--text-store"]), int(options.get("--page", 1)))
+
+    result = tighten_crop(
+        gray, crop_box, int(options.get("--padding", 8)), captions,
+        int(options["--figure"]) if "--figure" in options else None
+    )
+    print(f"Original: {result['original_box']}")
+    print(f"Trimmed:  {result['crop_box']}")
+    if result["caption"]:
+        print(f"Caption:  {result['caption'][:80]}")
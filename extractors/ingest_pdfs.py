@@ -0,0 +1,471 @@
+#!/usr/bin/env python3
+"""
+Bulk PDF Ingestion
+input/*.pdf를 일괄 처리 (렌더링 → 텍스트 추출 → 섹션 분할 → Figure 언급 스캔 → 메타데이터)
+
+- 파일 해시(SHA-256)로 중복 PDF 제거, (경로, 해시) 기준으로 처리 여부 판단 (같은 경로의 PDF가 바뀌면 새 작업)
+- 디스크 기반 작업 큐 (state/ingest_queue.db) - 중단 후 재실행 시 남은 단계부터 이어서 처리
+- 단계별 작업을 제한된 프로세스 풀에서 병렬 실행 (워커가 죽으면 진행 중 작업을 실패로 기록하고 풀 재생성)
+- 재시도 한도(MAX_ATTEMPTS)를 넘은 failed 작업은 --retry-failed로 실패한 단계부터 다시 대기열에 추가
+- 문서별 상태를 state/session_template.yaml 형식으로 기록 (state/sessions/<pdf>.yaml)
+
+Usage:
+    python ingest_pdfs.py [input_dir] [--workers N] [--dpi 150] [--watch] [--retry-failed]
+    python ingest_pdfs.py --status
+"""
+
+import os
+import sys
+import json
+import time
+import sqlite3
+import hashlib
+import argparse
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from pdf_page_renderer import render_page_images, scan_page_mentions, write_pages_metadata
+from text_extractor import extract_pdf_text
+from section_segmenter import load_or_segment
+
+
+PROJECT_DIR = Path(__file__).parent.parent
+DEFAULT_QUEUE_DB = PROJECT_DIR / "state" / "ingest_queue.db"
+DEFAULT_SESSIONS_DIR = PROJECT_DIR / "state" / "sessions"
+SESSION_TEMPLATE = PROJECT_DIR / "state" / "session_template.yaml"
+
+# 처리 단계 (순서대로 실행)
+STAGES = ["render", "text_extract", "segment", "mention_scan", "metadata"]
+MAX_ATTEMPTS = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    file_hash TEXT PRIMARY KEY,
+    pdf_path TEXT NOT NULL,
+    status TEXT NOT NULL,          -- pending, running, completed, failed
+    next_stage TEXT,               -- 다음에 실행할 단계 (완료 시 NULL)
+    pages TEXT,                    -- 단계 간 전달되는 페이지 정보 (JSON)
+    attempts INTEGER DEFAULT 0,
+    error TEXT,
+    session_file TEXT,
+    queued_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS duplicates (
+    pdf_path TEXT PRIMARY KEY,
+    file_hash TEXT NOT NULL
+);
+"""
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
+
+def file_sha256(path: Path) -> str:
+    """PDF 내용 해시 (파일명이 달라도 같은 논문이면 동일)"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# ============================================================
+# 단계 실행 (프로세스 풀 워커)
+# ============================================================
+
+def run_stage(stage: str, pdf_path: str, output_dir: str, dpi: int, pages: Optional[List[Dict]]) -> List[Dict]:
+    """
+    단계 하나 실행 (워커 프로세스에서 호출)
+
+    Returns:
+        다음 단계로 전달할 페이지 정보
+    """
+    if stage == "render":
+        return render_page_images(pdf_path, output_dir, dpi)
+    if stage == "text_extract":
+        extract_pdf_text(pdf_path, output_dir)
+        return pages
+    if stage == "segment":
+        load_or_segment(os.path.join(output_dir, f"{Path(pdf_path).stem}_text.bin"))
+        return pages
+    if stage == "mention_scan":
+        return scan_page_mentions(pdf_path, pages)
+    if stage == "metadata":
+        write_pages_metadata(pages, output_dir, Path(pdf_path).stem)
+        return pages
+    raise ValueError(f"Unknown stage: {stage}")
+
+
+# ============================================================
+# 작업 큐
+# ============================================================
+
+class IngestQueue:
+    """SQLite 기반 영속 작업 큐"""
+
+    def __init__(self, db_path: str = None, sessions_dir: str = None):
+        self.db_path = Path(db_path or DEFAULT_QUEUE_DB)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.sessions_dir = Path(sessions_dir or DEFAULT_SESSIONS_DIR)
+        self.sessions_dir.mkdir(parents=True, exist_ok=True)
+
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+
+        # --watch 재스캔 시 바뀌지 않은 파일은 다시 해시하지 않음 {경로: (크기, mtime_ns, 해시)}
+        self._hash_cache = {}
+
+        # 이전 실행 중 중단된 작업은 다시 대기 상태로
+        with self.conn:
+            self.conn.execute(
+                "UPDATE jobs SET status = 'pending', updated_at = ? WHERE status = 'running'", (_now(),)
+            )
+
+    def scan(self, input_dir: str) -> int:
+        """
+        입력 디렉토리의 PDF를 큐에 추가 (해시 중복은 duplicates에 기록)
+
+        Returns:
+            새로 추가된 작업 수
+        """
+        added = 0
+        for pdf_path in sorted(Path(input_dir).glob("*.pdf")):
+            pdf_key = str(pdf_path)
+            file_hash = self._file_hash(pdf_path)
+            known = self.conn.execute(
+                "SELECT 1 FROM jobs WHERE pdf_path = ? AND file_hash = ? "
+                "UNION SELECT 1 FROM duplicates WHERE pdf_path = ? AND file_hash = ?",
+                (pdf_key, file_hash, pdf_key, file_hash)
+            ).fetchone()
+            if known:
+                continue
+
+            existing = self.conn.execute(
+                "SELECT pdf_path FROM jobs WHERE file_hash = ?", (file_hash,)
+            ).fetchone()
+
+            with self.conn:
+                if existing:
+                    self.conn.execute(
+                        "INSERT OR REPLACE INTO duplicates (pdf_path, file_hash) VALUES (?, ?)", (pdf_key, file_hash)
+                    )
+                    print(f"  [DUP] {pdf_path.name} = {Path(existing['pdf_path']).name}")
+                    continue
+
+                # 같은 경로의 이전 내용은 기존 작업/세션으로 남기고 새 작업 추가
+                self.conn.execute("DELETE FROM duplicates WHERE pdf_path = ?", (pdf_key,))
+                session_file = self.sessions_dir / f"{pdf_path.stem}.yaml"
+                if session_file.exists():
+                    session_file = self.sessions_dir / f"{pdf_path.stem}-{file_hash[:8]}.yaml"
+                self.conn.execute(
+                    "INSERT INTO jobs (file_hash, pdf_path, status, next_stage, queued_at, updated_at, session_file) "
+                    "VALUES (?, ?, 'pending', ?, ?, ?, ?)",
+                    (file_hash, pdf_key, STAGES[0], _now(), _now(), str(session_file))
+                )
+            write_session_state(session_file, pdf_key, file_hash, "initialized", {})
+            added += 1
+
+        return added
+
+    def _file_hash(self, pdf_path: Path) -> str:
+        stat = pdf_path.stat()
+        cached = self._hash_cache.get(str(pdf_path))
+        if cached and cached[:2] == (stat.st_size, stat.st_mtime_ns):
+            return cached[2]
+        file_hash = file_sha256(pdf_path)
+        self._hash_cache[str(pdf_path)] = (stat.st_size, stat.st_mtime_ns, file_hash)
+        return file_hash
+
+    def requeue_failed(self) -> List[sqlite3.Row]:
+        """
+        failed 작업을 실패한 단계부터 다시 대기 상태로 (시도 횟수 초기화)
+
+        Returns:
+            다시 대기열에 넣은 작업
+        """
+        jobs = self.conn.execute("SELECT * FROM jobs WHERE status = 'failed'").fetchall()
+        with self.conn:
+            self.conn.execute(
+                "UPDATE jobs SET status = 'pending', attempts = 0, error = NULL, updated_at = ? "
+                "WHERE status = 'failed'", (_now(),)
+            )
+        return jobs
+
+    def next_jobs(self, limit: int, exclude: List[str]) -> List[sqlite3.Row]:
+        placeholders = ",".join("?" * len(exclude)) or "''"
+        return self.conn.execute(
+            f"SELECT * FROM jobs WHERE status = 'pending' AND file_hash NOT IN ({placeholders}) "
+            "ORDER BY queued_at LIMIT ?",
+            (*exclude, limit)
+        ).fetchall()
+
+    def mark_running(self, file_hash: str):
+        with self.conn:
+            self.conn.execute(
+                "UPDATE jobs SET status = 'running', updated_at = ? WHERE file_hash = ?", (_now(), file_hash)
+            )
+
+    def complete_stage(self, job: sqlite3.Row, stage: str, pages: List[Dict]):
+        index = STAGES.index(stage)
+        next_stage = STAGES[index + 1] if index + 1 < len(STAGES) else None
+        with self.conn:
+            self.conn.execute(
+                "UPDATE jobs SET status = ?, next_stage = ?, pages = ?, attempts = 0, error = NULL, updated_at = ? "
+                "WHERE file_hash = ?",
+                ("completed" if next_stage is None else "pending", next_stage,
+                 json.dumps(pages, ensure_ascii=False), _now(), job["file_hash"])
+            )
+
+    def fail_stage(self, job: sqlite3.Row, error: str) -> bool:
+        """실패 기록, 재시도 한도를 넘으면 failed (True 반환)"""
+        attempts = job["attempts"] + 1
+        failed = attempts >= MAX_ATTEMPTS
+        with self.conn:
+            self.conn.execute(
+                "UPDATE jobs SET status = ?, attempts = ?, error = ?, updated_at = ? WHERE file_hash = ?",
+                ("failed" if failed else "pending", attempts, error, _now(), job["file_hash"])
+            )
+        return failed
+
+    def get(self, file_hash: str) -> sqlite3.Row:
+        return self.conn.execute("SELECT * FROM jobs WHERE file_hash = ?", (file_hash,)).fetchone()
+
+    def summary(self) -> Dict[str, int]:
+        rows = self.conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        result = {row["status"]: row["n"] for row in rows}
+        result["duplicates"] = self.conn.execute("SELECT COUNT(*) FROM duplicates").fetchone()[0]
+        return result
+
+
+# ============================================================
+# 세션 상태 (state/session_template.yaml 형식)
+# ============================================================
+
+def write_session_state(
+    session_file: Path,
+    pdf_path: str,
+    file_hash: str,
+    status: str,
+    stage_states: Dict,
+    pages: Optional[List[Dict]] = None,
+    metadata_file: Optional[str] = None,
+    error: Optional[str] = None
+):
+    """
+    문서별 세션 상태 파일 갱신
+
+    session_template.yaml을 기반으로 하고, 단계별 상태는 ingestion.stages에 기록한다.
+    """
+    import yaml
+
+    session_file = Path(session_file)
+    if session_file.exists():
+        with open(session_file, "r", encoding="utf-8") as f:
+            state = yaml.safe_load(f) or {}
+    else:
+        with open(SESSION_TEMPLATE, "r", encoding="utf-8") as f:
+            state = yaml.safe_load(f) or {}
+        state["session_id"] = f"{datetime.now():%Y-%m-%d}-{file_hash[:8]}"
+        state["paper_file"] = pdf_path
+        state["started_at"] = _now()
+
+    state["status"] = {"initialized": "initialized", "completed": "completed", "failed": "failed"}.get(
+        status, "in_progress"
+    )
+    state["current_phase"] = "ingestion"
+
+    ingestion = state.setdefault("ingestion", {"file_hash": file_hash, "stages": {}})
+    for stage, stage_state in stage_states.items():
+        ingestion["stages"].setdefault(stage, {}).update(stage_state)
+
+    if pages is not None:
+        curator = state.setdefault("agent_states", {}).setdefault("image_curator", {})
+        curator["pages_rendered"] = len(pages)
+        curator["output_file"] = metadata_file
+
+    if error:
+        state["errors"] = (state.get("errors") or []) + [{
+            "timestamp": _now(),
+            "agent": "ingestion",
+            "error": error,
+            "recovered": False
+        }]
+
+    tmp_file = session_file.with_suffix(".yaml.tmp")
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        yaml.safe_dump(state, f, allow_unicode=True, sort_keys=False)
+    os.replace(tmp_file, session_file)
+
+
+# ============================================================
+# 실행
+# ============================================================
+
+def run_ingestion(
+    input_dir: str = "input",
+    output_dir: str = "output/images/pages",
+    workers: int = None,
+    dpi: int = 150,
+    queue: IngestQueue = None
+) -> Dict[str, int]:
+    """
+    큐에 있는 모든 작업을 처리
+
+    Args:
+        input_dir: PDF 입력 디렉토리
+        output_dir: 페이지 이미지/메타데이터 출력 디렉토리
+        workers: 프로세스 수 (기본: CPU 수)
+        dpi: 렌더링 해상도
+
+    Returns:
+        상태별 작업 수
+    """
+    queue = queue or IngestQueue()
+    added = queue.scan(input_dir)
+    print(f"Queued {added} new PDFs from {input_dir}")
+
+    workers = workers or os.cpu_count() or 2
+    in_flight = {}  # future -> (file_hash, stage, started_at)
+    # 풀이 깨졌을 때 진행 중이던 작업 - 원인을 가리기 위해 하나씩만 실행 (다른 작업이 재시도 한도를 소모하지 않도록)
+    suspects = set()
+
+    def record_failure(file_hash: str, stage: str, error: str, pool_broken: bool = False):
+        job = queue.get(file_hash)
+        failed = queue.fail_stage(job, f"{stage}: {error}")
+        if failed:
+            suspects.discard(file_hash)
+        elif pool_broken:
+            suspects.add(file_hash)
+        write_session_state(
+            job["session_file"], job["pdf_path"], file_hash,
+            "failed" if failed else "pending",
+            {stage: {"status": "failed", "completed_at": _now()}},
+            error=f"{stage}: {error}"
+        )
+        print(f"  [FAIL] {Path(job['pdf_path']).name} ({stage}): {error}")
+
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        while True:
+            broken = False
+            running = [info[0] for info in in_flight.values()]
+            limit = (1 if suspects else workers) - len(in_flight)
+            jobs = queue.next_jobs(workers, running) if limit > 0 else []
+            jobs = sorted(jobs, key=lambda job: job["file_hash"] not in suspects)[:max(0, limit)]
+            for job in jobs:
+                stage = job["next_stage"]
+                pages = json.loads(job["pages"]) if job["pages"] else None
+                queue.mark_running(job["file_hash"])
+                write_session_state(
+                    job["session_file"], job["pdf_path"], job["file_hash"], "running",
+                    {stage: {"status": "running", "started_at": _now()}}
+                )
+                try:
+                    future = executor.submit(run_stage, stage, job["pdf_path"], output_dir, dpi, pages)
+                except BrokenProcessPool as e:
+                    record_failure(job["file_hash"], stage, f"worker pool broken: {e}", pool_broken=True)
+                    broken = True
+                    break
+                in_flight[future] = (job["file_hash"], stage, time.monotonic())
+
+            if not in_flight and not broken:
+                break
+
+            done = set()
+            if in_flight and not broken:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                file_hash, stage, started = in_flight.pop(future)
+                job = queue.get(file_hash)
+                name = Path(job["pdf_path"]).name
+                duration = round(time.monotonic() - started, 2)
+
+                try:
+                    pages = future.result()
+                except BrokenProcessPool as e:
+                    # 워커 프로세스 비정상 종료 (OOM 등) - 원인 작업을 알 수 없으므로 진행 중 작업 모두 실패 처리
+                    record_failure(file_hash, stage, f"worker process died: {e}", pool_broken=True)
+                    broken = True
+                    continue
+                except Exception as e:
+                    record_failure(file_hash, stage, str(e))
+                    continue
+
+                queue.complete_stage(job, stage, pages)
+                suspects.discard(file_hash)
+                job = queue.get(file_hash)
+                stage_state = {stage: {"status": "completed", "completed_at": _now(), "duration_seconds": duration}}
+                if stage == "metadata":
+                    metadata_file = os.path.join(output_dir, f"{Path(job['pdf_path']).stem}_pages.json")
+                    write_session_state(
+                        job["session_file"], job["pdf_path"], file_hash, job["status"], stage_state,
+                        pages=pages, metadata_file=metadata_file
+                    )
+                else:
+                    write_session_state(
+                        job["session_file"], job["pdf_path"], file_hash, job["status"], stage_state
+                    )
+                print(f"  [OK] {name}: {stage} ({duration}s)")
+
+            if broken:
+                # 남은 진행 중 작업도 같은 풀에서 실행 중이었으므로 실패로 기록 (재시도 횟수에 포함)
+                for file_hash, stage, _ in in_flight.values():
+                    record_failure(file_hash, stage, "worker pool broken", pool_broken=True)
+                in_flight.clear()
+                executor.shutdown(wait=False, cancel_futures=True)
+                print("  [WARN] Worker pool broken, restarting")
+                executor = ProcessPoolExecutor(max_workers=workers)
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+    return queue.summary()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk ingest input/*.pdf")
+    parser.add_argument("input_dir", nargs="?", default="input", help="PDF directory (default: input)")
+    parser.add_argument("--output-dir", default="output/images/pages", help="Rendered page directory")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument("--dpi", type=int, default=150, help="Render DPI (default: 150)")
+    parser.add_argument("--watch", action="store_true", help="Keep scanning input_dir for new PDFs")
+    parser.add_argument("--interval", type=int, default=30, help="Watch scan interval in seconds")
+    parser.add_argument("--status", action="store_true", help="Show queue status only")
+    parser.add_argument("--retry-failed", action="store_true",
+                        help="Requeue failed jobs from their failed stage before processing")
+
+    args = parser.parse_args()
+    queue = IngestQueue()
+
+    if args.status:
+        for status, count in queue.summary().items():
+            print(f"{status}: {count}")
+        return
+
+    if args.retry_failed:
+        for job in queue.requeue_failed():
+            write_session_state(
+                job["session_file"], job["pdf_path"], job["file_hash"], "pending",
+                {job["next_stage"]: {"status": "pending"}}
+            )
+            print(f"  [RETRY] {Path(job['pdf_path']).name} ({job['next_stage']}): {job['error']}")
+
+    while True:
+        summary = run_ingestion(args.input_dir, args.output_dir, args.workers, args.dpi, queue)
+        print(f"\nQueue: {summary}")
+        if not args.watch:
+            break
+        time.sleep(args.interval)
+
+    sys.exit(1 if summary.get("failed") else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,20 +4,30 @@ PDF Page Renderer
 PDF 페이지를 고해상도 이미지로 렌더링하여 저장
 - 기존 get_images() 방식의 한계 극복
 - 벡터 그래픽 Figure도 캡처 가능
+- Figure 영역이 임베디드 JPEG 이미지 하나로만 채워져 있으면 원본 바이트를 그대로 추출 (디코드/재인코딩 없음)
+- 큰 페이지/고해상도는 가로 띠(band) 단위로 렌더링하여 PNG로 스트리밍 저장 (메모리 상한 고정)
 """
 
 import fitz  # PyMuPDF
 import os
 import json
+import zlib
+import struct
+
+import numpy as np
+from PIL import Image
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Optional
+
+from text_extractor import extract_pdf_text
 
 
 def render_pdf_pages(
     pdf_path: str,
     output_dir: str = "output/images",
     dpi: int = 150,
-    skip_first_page: bool = False
+    skip_first_page: bool = False,
+    band_height: int = None
 ) -> List[Dict]:
     """
     PDF의 각 페이지를 고해상도 이미지로 렌더링
@@ -27,10 +37,139 @@ def render_pdf_pages(
         output_dir: 출력 디렉토리
         dpi: 해상도 (150 권장 - 품질과 파일 크기 균형)
         skip_first_page: 첫 페이지(표지) 스킵 여부
+        band_height: band 렌더링 높이 (render_page_images 참고)
 
     Returns:
         렌더링된 페이지 정보 리스트
     """
+    pages = render_page_images(pdf_path, output_dir, dpi, skip_first_page, band_height)
+    pages = scan_page_mentions(pdf_path, pages)
+    write_pages_metadata(pages, output_dir, Path(pdf_path).stem)
+
+    # 에이전트용 구조화 텍스트 (text_extractor.PageTextStore로 페이지 단위 로드)
+    text_store = extract_pdf_text(pdf_path, output_dir)
+    print(f"  Extracted text: {text_store}")
+
+    return pages
+
+
+# 한 장의 pixmap이 이 크기(바이트)를 넘으면 band 렌더링 (RGB 기준 약 64MB)
+BANDED_PIXMAP_LIMIT = 64 * 1024 * 1024
+DEFAULT_BAND_HEIGHT = 512
+# band 위아래로 더 렌더링했다가 잘라내는 행 수 (clip 경계의 anti-aliasing 차이 제거)
+BAND_OVERLAP = 4
+
+
+class PngStreamWriter:
+    """
+    행 단위로 받아 IDAT를 바로 압축/기록하는 PNG writer (8-bit RGB)
+
+    전체 이미지를 메모리에 두지 않으므로 메모리 사용량은 band 크기에만 비례한다.
+    """
+
+    def __init__(self, path: str, width: int, height: int, level: int = 6):
+        self.width = width
+        self.height = height
+        self.rows_written = 0
+        self._file = open(path, "wb")
+        self._compressor = zlib.compressobj(level)
+
+        self._file.write(b"\x89PNG\r\n\x1a\n")
+        self._chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+
+    def _chunk(self, chunk_type: bytes, data: bytes):
+        self._file.write(struct.pack(">I", len(data)))
+        self._file.write(chunk_type)
+        self._file.write(data)
+        self._file.write(struct.pack(">I", zlib.crc32(chunk_type + data) & 0xFFFFFFFF))
+
+    def write_rows(self, rows: np.ndarray):
+        """rows: (n, width * 3) uint8 배열"""
+        # Sub 필터 (왼쪽 픽셀과의 차이) - 필터 없음보다 압축률이 좋음
+        filtered = np.empty((rows.shape[0], rows.shape[1] + 1), dtype=np.uint8)
+        filtered[:, 0] = 1
+        filtered[:, 1:4] = rows[:, :3]
+        filtered[:, 4:] = rows[:, 3:] - rows[:, :-3]
+
+        data = self._compressor.compress(filtered.tobytes())
+        if data:
+            self._chunk(b"IDAT", data)
+        self.rows_written += rows.shape[0]
+
+    def abort(self):
+        """실패 시 불완전한 파일 삭제"""
+        self._file.close()
+        os.remove(self._file.name)
+
+    def close(self):
+        self._chunk(b"IDAT", self._compressor.flush())
+        self._chunk(b"IEND", b"")
+        self._file.close()
+        if self.rows_written != self.height:
+            raise ValueError(f"PNG row count mismatch: {self.rows_written} != {self.height}")
+
+
+def render_page_banded(page: fitz.Page, matrix: fitz.Matrix, filepath: str, band_height: int = DEFAULT_BAND_HEIGHT) -> Dict:
+    """
+    페이지를 가로 띠 단위로 렌더링하여 PNG로 스트리밍 저장
+
+    페이지 내용은 display list로 한 번만 해석하고, band마다 clip rect로 래스터화한다.
+    band는 위아래 BAND_OVERLAP 행을 더 렌더링한 뒤 잘라내어 경계(seam)의 곡선/도형 차이를 없앤다.
+    결과는 전체 렌더링과 시각적으로 같지만 픽셀 단위로 동일하지는 않다:
+    여러 band에 걸친 긴 선(stroke)은 MuPDF anti-aliasing이 clip에 따라 달라져 일부 픽셀이 약간(수 단계) 다르다.
+    출력은 PNG만 (WebP 인코더는 전체 이미지가 필요해 스트리밍 불가). 메모리 회귀 검사: check_render_memory.py
+
+    Returns:
+        {"width", "height", "bands"}
+    """
+    zoom_y = matrix.d
+    irect = (page.rect * matrix).irect
+    width, height = irect.width, irect.height
+    display_list = page.get_displaylist()
+    writer = PngStreamWriter(filepath, width, height)
+    bands = 0
+
+    try:
+        for y0 in range(0, height, band_height):
+            y1 = min(height, y0 + band_height)
+            top, bottom = max(0, y0 - BAND_OVERLAP), min(height, y1 + BAND_OVERLAP)
+            clip = fitz.Rect(page.rect.x0, page.rect.y0 + top / zoom_y, page.rect.x1, page.rect.y0 + bottom / zoom_y)
+            pix = display_list.get_pixmap(matrix=matrix, clip=clip, alpha=False)
+
+            rows = np.frombuffer(pix.samples_mv, dtype=np.uint8).reshape(pix.height, pix.stride)[:, :width * 3]
+            # clip 반올림으로 band 위치/높이가 1px 다를 수 있으므로 필요한 행만 사용
+            start = y0 - (pix.y - irect.y0)
+            rows = rows[start:start + (y1 - y0)]
+            if rows.shape[1] < width * 3:
+                rows = np.pad(rows, ((0, 0), (0, width * 3 - rows.shape[1])), constant_values=255)
+            writer.write_rows(rows)
+            bands += 1
+            del rows, pix
+    except BaseException:
+        writer.abort()
+        raise
+    writer.close()
+
+    return {"width": width, "height": height, "bands": bands}
+
+
+def render_page_images(
+    pdf_path: str,
+    output_dir: str = "output/images",
+    dpi: int = 150,
+    skip_first_page: bool = False,
+    band_height: int = None
+) -> List[Dict]:
+    """
+    렌더링 단계: 페이지를 PNG로 저장
+
+    Args:
+        band_height: band 렌더링 높이(px). None이면 pixmap이 BANDED_PIXMAP_LIMIT를
+            넘는 페이지만 DEFAULT_BAND_HEIGHT로 band 렌더링, 0이면 사용 안 함
+
+    Returns:
+        페이지 정보 (page_number, filename, filepath, width, height)
+    """
 
     os.makedirs(output_dir, exist_ok=True)
 
@@ -47,41 +186,71 @@ def render_pdf_pages(
     for page_num in range(start_page, len(doc)):
         page = doc[page_num]
 
-        # 페이지를 이미지로 렌더링
-        pix = page.get_pixmap(matrix=matrix)
-
         # 파일명 생성
         filename = f"{pdf_name}_page_{page_num + 1}.png"
         filepath = os.path.join(output_dir, filename)
 
-        # 이미지 저장
-        pix.save(filepath)
-
-        # 페이지 텍스트에서 Figure/Table 언급 찾기
-        text = page.get_text()
-        figure_mentions = find_figure_mentions(text)
+        irect = (page.rect * matrix).irect
+        banded = band_height if band_height is not None else (
+            DEFAULT_BAND_HEIGHT if irect.width * irect.height * 3 > BANDED_PIXMAP_LIMIT else 0
+        )
+
+        if banded:
+            # 큰 페이지: band 단위 렌더링 + 스트리밍 저장
+            result = render_page_banded(page, matrix, filepath, banded)
+            width, height = result["width"], result["height"]
+        else:
+            # 페이지를 이미지로 렌더링 후 저장
+            pix = page.get_pixmap(matrix=matrix)
+            pix.save(filepath)
+            width, height = pix.width, pix.height
+            pix = None
 
         pages.append({
             "page_number": page_num + 1,
             "filename": filename,
             "filepath": filepath,
-            "width": pix.width,
-            "height": pix.height,
-            "has_figures": len(figure_mentions) > 0,
-            "figure_mentions": figure_mentions,
-            "text_preview": text[:500] if text else ""
+            "width": width,
+            "height": height
         })
 
-        print(f"  Rendered page {page_num + 1}/{len(doc)}: {filename}")
+        mode = f" ({result['bands']} bands)" if banded else ""
+        print(f"  Rendered page {page_num + 1}/{len(doc)}: {filename}{mode}")
+
+    doc.close()
+    return pages
+
+
+def scan_page_mentions(pdf_path: str, pages: List[Dict]) -> List[Dict]:
+    """
+    언급 스캔 단계: 페이지 텍스트에서 Figure/Table 언급 찾기
+    """
+    doc = fitz.open(pdf_path)
+
+    for page_info in pages:
+        text = doc[page_info["page_number"] - 1].get_text()
+        figure_mentions = find_figure_mentions(text)
+
+        page_info["has_figures"] = len(figure_mentions) > 0
+        page_info["figure_mentions"] = figure_mentions
+        page_info["text_preview"] = text[:500] if text else ""
 
     doc.close()
+    return pages
+
+
+def write_pages_metadata(pages: List[Dict], output_dir: str, pdf_name: str) -> str:
+    """
+    메타데이터 단계: {pdf_name}_pages.json 저장
 
-    # 메타데이터 저장
+    Returns:
+        메타데이터 파일 경로
+    """
     metadata_path = os.path.join(output_dir, f"{pdf_name}_pages.json")
     with open(metadata_path, "w", encoding="utf-8") as f:
         json.dump(pages, f, ensure_ascii=False, indent=2)
 
-    return pages
+    return metadata_path
 
 
 def find_figure_mentions(text: str) -> List[str]:
@@ -105,6 +274,160 @@ def find_figure_mentions(text: str) -> List[str]:
     return list(set(mentions))
 
 
+# 원본 바이트를 그대로 쓸 수 있는 이미지 형식 (DCT 스트림만 재인코딩 없이 추출됨,
+# Flate 등은 extract_image가 PNG로 다시 인코딩하므로 clip 렌더링과 차이 없음)
+PASSTHROUGH_EXTENSIONS = ("jpeg", "jpg")
+
+# 영역 대비 이미지 면적 비율 (이보다 작으면 캡션/여백/다른 패널이 함께 있는 영역)
+EMBEDDED_COVERAGE = 0.95
+
+
+def find_single_embedded_image(page: fitz.Page, rect: fitz.Rect) -> Optional[Dict]:
+    """
+    영역이 임베디드 이미지 하나로 이루어져 있으면 그 이미지 정보 반환
+
+    조건:
+    - 영역과 겹치는 이미지가 하나이고 95% 이상이 영역 안에 있음
+    - 이미지가 영역의 95% 이상을 덮음 (캡션, 벡터 패널 등 이미지 밖 내용이 들어갈 공간 없음)
+    - 영역 안에 벡터 그림/텍스트(화살표, 라벨, 캡션 등)가 없음 (이미지 위/밖 모두)
+    - 회전/반전 없이 배치되고 DCT(JPEG) 스트림임
+    """
+    images = [
+        info for info in page.get_image_info(xrefs=True)
+        if info["xref"] and fitz.Rect(info["bbox"]).intersects(rect)
+    ]
+    if len(images) != 1:
+        return None
+
+    info = images[0]
+    bbox = fitz.Rect(info["bbox"])
+    overlap = abs(bbox & rect)
+    if bbox.is_empty or overlap < abs(bbox) * EMBEDDED_COVERAGE or overlap < abs(rect) * EMBEDDED_COVERAGE:
+        return None
+
+    a, b, c, d, _, _ = info["transform"]
+    if b != 0 or c != 0 or a <= 0 or d <= 0:
+        return None
+
+    # 경계에 걸친 선/글자는 무시 (crop_box 여유분)
+    inner = rect + (2, 2, -2, -2)
+    if any(fitz.Rect(drawing["rect"]).intersects(inner) for drawing in page.get_drawings()):
+        return None
+    if page.get_text("text", clip=inner).strip():
+        return None
+
+    if "DCTDecode" not in page.parent.xref_get_key(info["xref"], "Filter")[1]:
+        return None
+
+    return info
+
+
+# tools/image_processor.convert_png_to_webp와 같은 설정
+WEBP_QUALITY = 85
+WEBP_METHOD = 6
+
+
+def pixmap_to_image(pix: fitz.Pixmap) -> Image.Image:
+    """Pixmap samples를 복사 없이 참조하는 PIL 이미지 (pix가 살아 있는 동안만 유효)"""
+    mode = "RGBA" if pix.alpha else "RGB"
+    return Image.frombuffer(mode, (pix.width, pix.height), pix.samples_mv, "raw", mode, pix.stride, 1)
+
+
+def extract_figure_region(
+    doc: fitz.Document,
+    page_number: int,
+    crop_box: tuple,
+    output_stem: str,
+    dpi: int = 150,
+    webp: bool = False,
+    archive_png: bool = False
+) -> Dict:
+    """
+    Figure 영역 추출 (임베디드 이미지 fast path, 아니면 clip 렌더링)
+
+    Args:
+        doc: 열린 PDF 문서
+        page_number: 페이지 번호 (1부터)
+        crop_box: 렌더링된 페이지 기준 (left, top, right, bottom) 픽셀 좌표
+        output_stem: 확장자 없는 출력 경로 (형식에 따라 .jpeg/.png 추가)
+        dpi: crop_box 좌표의 기준 DPI
+        webp: clip 렌더링 결과를 PNG 없이 바로 {출력 디렉토리}/webp/*.webp로 저장
+        archive_png: webp일 때도 PNG를 보관용으로 함께 저장
+
+    Returns:
+        {"method": "embedded" | "rendered", "path", "width", "height"}
+    """
+    page = doc[page_number - 1]
+    zoom = dpi / 72
+    rect = fitz.Rect(crop_box) / zoom
+
+    info = find_single_embedded_image(page, rect)
+    if info is not None:
+        image = doc.extract_image(info["xref"])
+        # 투명 마스크/CMYK는 원본 바이트만으로 표시 불가 -> 렌더링
+        if image["ext"] in PASSTHROUGH_EXTENSIONS and not image["smask"] and image["colorspace"] != 4:
+            path = f"{output_stem}.{image['ext']}"
+            with open(path, "wb") as f:
+                f.write(image["image"])
+            return {"method": "embedded", "path": path, "width": image["width"], "height": image["height"]}
+
+    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), clip=rect)
+    result = {"method": "rendered", "width": pix.width, "height": pix.height}
+
+    if archive_png or not webp:
+        result["path"] = f"{output_stem}.png"
+        pix.save(result["path"])
+
+    if webp:
+        # 발행 파이프라인의 WebP 디렉토리(selected/webp)에 바로 저장
+        webp_dir = Path(output_stem).parent / "webp"
+        webp_dir.mkdir(parents=True, exist_ok=True)
+        webp_path = str(webp_dir / f"{Path(output_stem).name}.webp")
+        pixmap_to_image(pix).save(webp_path, "WEBP", quality=WEBP_QUALITY, method=WEBP_METHOD)
+        result["webp_path"] = webp_path
+        result.setdefault("path", webp_path)
+
+    return result
+
+
+def extract_figures(
+    pdf_path: str,
+    figures: List[Dict],
+    output_dir: str,
+    dpi: int = 150,
+    webp: bool = False,
+    archive_png: bool = False
+) -> List[Dict]:
+    """
+    crop_figures_*.py 형식의 figures 목록을 PDF에서 직접 추출
+
+    Args:
+        pdf_path: PDF 파일 경로
+        figures: [{"page", "figure_id", "name", "crop_box"}, ...]
+        output_dir: 출력 디렉토리
+        dpi: crop_box 좌표의 기준 DPI (페이지 렌더링과 동일)
+        webp: 렌더링 Figure를 PNG 없이 WebP로 바로 저장 (extract_figure_region 참고)
+        archive_png: webp일 때도 PNG 보관
+
+    Returns:
+        figures 항목에 추출 결과(method, path, width, height)를 더한 리스트
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    doc = fitz.open(pdf_path)
+    results = []
+
+    for fig in figures:
+        result = extract_figure_region(
+            doc, fig["page"], fig["crop_box"], os.path.join(output_dir, fig["figure_id"]), dpi,
+            webp, archive_png
+        )
+        results.append({**fig, **result})
+        print(f"  [OK] {fig['name']}: {result['width']}x{result['height']}px ({result['method']}) -> {result['path']}")
+
+    doc.close()
+    return results
+
+
 def get_pages_with_figures(pages: List[Dict]) -> List[Dict]:
     """
     Figure가 포함된 페이지만 필터링
@@ -115,10 +438,35 @@ def get_pages_with_figures(pages: List[Dict]) -> List[Dict]:
 if __name__ == "__main__":
     import sys
 
+    args = sys.argv[1:]
+    options = {}
+    for flag in ("--band-height", "--max-rss"):
+        if flag in args:
+            i = args.index(flag)
+            options[flag] = int(args[i + 1])
+            args = args[:i] + args[i + 2:]
+    sys.argv = sys.argv[:1] + args
+
     if len(sys.argv) < 2:
-        print("Usage: python pdf_page_renderer.py <pdf_path> [output_dir] [dpi]")
+        print("Usage: python pdf_page_renderer.py <pdf_path> [output_dir] [dpi] [--band-height PX] [--max-rss MB]")
+        print("       python pdf_page_renderer.py extract <pdf_path> <figures.json> [output_dir] [dpi] [--webp] [--archive-png]")
         sys.exit(1)
 
+    if sys.argv[1] == "extract":
+        webp = "--webp" in sys.argv
+        archive_png = "--archive-png" in sys.argv
+        sys.argv = [a for a in sys.argv if a not in ("--webp", "--archive-png")]
+        with open(sys.argv[3], "r", encoding="utf-8") as f:
+            figures = json.load(f)
+        if isinstance(figures, dict):
+            figures = figures["figures"]  # crop_manifest.json
+        output_dir = sys.argv[4] if len(sys.argv) > 4 else "output/images/selected"
+        dpi = int(sys.argv[5]) if len(sys.argv) > 5 else 150
+        results = extract_figures(sys.argv[2], figures, output_dir, dpi, webp, archive_png)
+        embedded = sum(1 for r in results if r["method"] == "embedded")
+        print(f"\nExtracted {len(results)} figures ({embedded} embedded, {len(results) - embedded} rendered)")
+        sys.exit(0)
+
     pdf_path = sys.argv[1]
     output_dir = sys.argv[2] if len(sys.argv) > 2 else "output/images"
     dpi = int(sys.argv[3]) if len(sys.argv) > 3 else 150
@@ -128,10 +476,20 @@ if __name__ == "__main__":
     print(f"DPI: {dpi}")
     print()
 
-    pages = render_pdf_pages(pdf_path, output_dir, dpi)
+    pages = render_pdf_pages(pdf_path, output_dir, dpi, band_height=options.get("--band-height"))
 
     print(f"\nRendered {len(pages)} pages")
 
+    # 최대 메모리 확인 (CI에서 --max-rss로 상한 검사)
+    import resource
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    if sys.platform == "darwin":
+        peak_mb /= 1024
+    print(f"Peak RSS: {peak_mb:.0f}MB")
+    if "--max-rss" in options and peak_mb > options["--max-rss"]:
+        print(f"[FAIL] Peak RSS {peak_mb:.0f}MB exceeds {options['--max-rss']}MB")
+        sys.exit(2)
+
     figure_pages = get_pages_with_figures(pages)
     print(f"Pages with figure mentions: {len(figure_pages)}")
     for p in figure_pages:
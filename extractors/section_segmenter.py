@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Section Segmenter
+구조화 텍스트(text_extractor)에서 논문 섹션 트리와 참고문헌 목록 추출
+
+- 본문 폰트 크기(문자 수 가중 최빈값) 대비 큰 글씨/굵은 글씨 + 표준 섹션명/번호로 제목 판단
+- 여러 페이지에 반복되는 머리말/꼬리말은 제외
+- References 섹션은 번호 또는 저자명 패턴으로 항목 분리, DOI/연도 파싱
+- 결과는 {pdf_name}_sections.json에 캐시 (텍스트 캐시보다 새로우면 재사용)
+
+Usage:
+    python section_segmenter.py <pdf_or_text.bin> [output_dir]
+    python section_segmenter.py <pdf_or_text.bin> --section Methods
+"""
+
+import re
+import json
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from text_extractor import PageTextStore, extract_pdf_text
+
+
+# 표준 섹션명 (소문자, 번호 제거 후 비교)
+KNOWN_HEADINGS = {
+    "abstract", "introduction", "background", "materials and methods", "material and methods",
+    "methods", "methodology", "patients and methods", "subjects and methods", "results",
+    "discussion", "conclusion", "conclusions", "limitations", "clinical implications",
+    "references", "bibliography", "literature cited", "acknowledgements", "acknowledgments",
+    "funding", "conflict of interest", "conflicts of interest", "supplementary material",
+    "data availability", "author contributions", "ethics statement",
+}
+REFERENCE_HEADINGS = {"references", "bibliography", "literature cited"}
+
+NUMBERED_HEADING = re.compile(r'^(\d+(?:\.\d+)*)\.?\s+(\S.*)$')
+NUMBERED_REFERENCE = re.compile(r'^\s*\[?(\d{1,3})[\].)]?\s+(\S.*)$')
+AUTHOR_REFERENCE = re.compile(r"^[A-Z][A-Za-z'\-]+,?\s+(?:[A-Z]\.?\s?){1,3}[,.]")
+DOI_PATTERN = re.compile(r'10\.\d{4,9}/[^\s"<>]+', re.IGNORECASE)
+YEAR_PATTERN = re.compile(r'\b(19[5-9]\d|20[0-4]\d)\b')
+
+BOLD_FLAG = 16
+
+
+def _page_lines(store: PageTextStore, page_number: int) -> List[Dict]:
+    """span 컬럼을 line 단위로 묶기"""
+    page = store.page(page_number)
+    columns = page["spans"]
+    margin = page["height"] * 0.08
+    lines: Dict[int, Dict] = {}
+
+    for i, line_id in enumerate(columns["line"]):
+        text = columns["text"][i]
+        size = columns["size"][i]
+        bold = bool(columns["flags"][i] & BOLD_FLAG) or "bold" in store.fonts[columns["font"][i]].lower()
+        line = lines.get(line_id)
+        if line is None:
+            line = lines[line_id] = {
+                "text": "", "size": 0.0, "bold_chars": 0, "chars": 0,
+                "x0": columns["bbox"][i][0], "y0": columns["bbox"][i][1],
+                "block": columns["block"][i], "page": page_number,
+                "in_margin": not (margin < columns["bbox"][i][1] < page["height"] - margin)
+            }
+        line["text"] += text
+        line["size"] = max(line["size"], size) if text.strip() else line["size"]
+        line["chars"] += len(text.strip())
+        line["bold_chars"] += len(text.strip()) if bold else 0
+
+    result = []
+    for line in lines.values():
+        line["text"] = line["text"].strip()
+        if line["text"]:
+            line["bold"] = line["chars"] > 0 and line["bold_chars"] / line["chars"] > 0.8
+            result.append(line)
+    return result
+
+
+def _body_font_size(lines: List[Dict]) -> float:
+    sizes = Counter()
+    for line in lines:
+        sizes[round(line["size"], 1)] += line["chars"]
+    return sizes.most_common(1)[0][0] if sizes else 10.0
+
+
+def _repeated_lines(lines: List[Dict], page_count: int) -> set:
+    """머리말/꼬리말 (위/아래 여백에서 숫자 제외 동일 텍스트가 여러 페이지에 반복)"""
+    if page_count < 3:
+        return set()
+    pages_by_text: Dict[str, set] = {}
+    for line in lines:
+        if not line["in_margin"]:
+            continue
+        key = re.sub(r'\d+', '#', line["text"].lower())
+        pages_by_text.setdefault(key, set()).add(line["page"])
+    threshold = max(3, page_count * 0.3)
+    return {key for key, pages in pages_by_text.items() if len(pages) >= threshold}
+
+
+def _heading_name(text: str) -> str:
+    match = NUMBERED_HEADING.match(text)
+    name = match.group(2) if match else text
+    return name.strip().rstrip(":").lower()
+
+
+def _is_heading(line: Dict, body_size: float) -> bool:
+    text = line["text"]
+    words = text.split()
+    if len(words) > 12 or len(text) > 100:
+        return False
+    if text.endswith((".", ",", ";")) and not NUMBERED_HEADING.match(text):
+        return False
+
+    name = _heading_name(text)
+    larger = line["size"] >= body_size * 1.15
+    if name in KNOWN_HEADINGS and (larger or line["bold"] or text.isupper()):
+        return True
+    if larger and line["bold"] and not text.isdigit():
+        return True
+    if line["bold"] and NUMBERED_HEADING.match(text) and line["size"] >= body_size:
+        return True
+    return False
+
+
+def parse_references(lines: List[Dict]) -> List[Dict]:
+    """
+    References 섹션 line들을 항목으로 분리
+
+    Returns:
+        [{"index", "text", "page", "doi", "year"}, ...]
+    """
+    numbered = sum(1 for line in lines if NUMBERED_REFERENCE.match(line["text"]))
+    use_numbers = numbered >= max(2, len(lines) * 0.15)
+
+    entries: List[Dict] = []
+    for line in lines:
+        text = line["text"]
+        starts_entry = (
+            NUMBERED_REFERENCE.match(text) if use_numbers else AUTHOR_REFERENCE.match(text)
+        )
+        if starts_entry or not entries:
+            entries.append({"text": text, "page": line["page"]})
+        else:
+            # 하이픈으로 끊긴 단어 연결
+            previous = entries[-1]["text"]
+            joiner = "" if previous.endswith("-") else " "
+            entries[-1]["text"] = (previous[:-1] if joiner == "" else previous) + joiner + text
+
+    references = []
+    for i, entry in enumerate(entries, 1):
+        text = entry["text"]
+        number = NUMBERED_REFERENCE.match(text) if use_numbers else None
+        doi = DOI_PATTERN.search(text)
+        year = YEAR_PATTERN.search(text)
+        references.append({
+            "index": int(number.group(1)) if number else i,
+            "text": number.group(2) if number else text,
+            "page": entry["page"],
+            "doi": doi.group(0).rstrip(".,;)").lower() if doi else None,
+            "year": int(year.group(1)) if year else None
+        })
+    return references
+
+
+def segment_paper(store: PageTextStore) -> Dict:
+    """
+    섹션 트리 + 참고문헌 추출 (페이지 한 번 순회)
+
+    Returns:
+        {"body_font_size", "sections": [...], "references": [...]}
+        sections: {"id", "title", "level", "parent", "page_start", "page_end", "text"}
+    """
+    lines = []
+    for page_number in range(1, store.page_count + 1):
+        lines.extend(_page_lines(store, page_number))
+
+    body_size = _body_font_size(lines)
+    repeated = _repeated_lines(lines, store.page_count)
+    lines = [
+        l for l in lines
+        if not (l["in_margin"] and re.sub(r'\d+', '#', l["text"].lower()) in repeated)
+    ]
+
+    # 제목 후보와 레벨 (번호 깊이 > 표준 섹션명 = 1 > 표준 섹션 크기 대비 글자 크기 순위)
+    heading_flags = [_is_heading(line, body_size) for line in lines]
+    headings = [l for l, h in zip(lines, heading_flags) if h]
+    heading_sizes = {round(l["size"], 1) for l in headings}
+    known_sizes = Counter(round(l["size"], 1) for l in headings if _heading_name(l["text"]) in KNOWN_HEADINGS)
+    top_size = known_sizes.most_common(1)[0][0] if known_sizes else max(heading_sizes, default=body_size)
+
+    def level_of(line: Dict) -> int:
+        match = NUMBERED_HEADING.match(line["text"])
+        if match:
+            return match.group(1).count(".") + 1
+        size = round(line["size"], 1)
+        if _heading_name(line["text"]) in KNOWN_HEADINGS or size >= top_size:
+            return 1
+        return 1 + sum(1 for s in heading_sizes if size < s <= top_size)
+
+    sections: List[Dict] = [{
+        "id": 0, "title": "Front matter", "level": 0, "parent": None,
+        "page_start": 1, "page_end": 1, "lines": []
+    }]
+    stack: List[Dict] = []
+
+    for line, is_heading in zip(lines, heading_flags):
+        if is_heading:
+            level = level_of(line)
+            while stack and stack[-1]["level"] >= level:
+                stack.pop()
+            section = {
+                "id": len(sections),
+                "title": line["text"],
+                "level": level,
+                "parent": stack[-1]["id"] if stack else None,
+                "page_start": line["page"],
+                "page_end": line["page"],
+                "lines": []
+            }
+            sections.append(section)
+            stack.append(section)
+        else:
+            current = sections[-1]
+            current["lines"].append(line)
+            current["page_end"] = line["page"]
+
+    references = []
+    for section in sections:
+        if _heading_name(section["title"]) in REFERENCE_HEADINGS:
+            references.extend(parse_references(section["lines"]))
+
+    for section in sections:
+        section["text"] = "\n".join(line["text"] for line in section.pop("lines"))
+
+    # 내용 없는 Front matter 제거
+    if not sections[0]["text"]:
+        sections = sections[1:]
+
+    return {
+        "source": store.header.get("source"),
+        "body_font_size": body_size,
+        "sections": sections,
+        "references": references
+    }
+
+
+def load_or_segment(path: str, output_dir: str = None) -> Dict:
+    """
+    섹션 캐시 로드 (없거나 텍스트 캐시보다 오래되면 새로 계산)
+
+    Args:
+        path: PDF 또는 *_text.bin 경로
+        output_dir: 캐시 디렉토리 (기본: path와 같은 디렉토리, PDF면 output/images)
+    """
+    path = Path(path)
+    if path.suffix.lower() == ".pdf":
+        output_dir = output_dir or "output/images"
+        pdf_name = path.stem
+        store_path = Path(output_dir) / f"{pdf_name}_text.bin"
+        if not store_path.exists() or store_path.stat().st_mtime < path.stat().st_mtime:
+            extract_pdf_text(str(path), output_dir)
+    else:
+        store_path = path
+        output_dir = output_dir or str(path.parent)
+        pdf_name = path.name[:-len("_text.bin")] if path.name.endswith("_text.bin") else path.stem
+
+    cache_path = Path(output_dir) / f"{pdf_name}_sections.json"
+    if cache_path.exists() and cache_path.stat().st_mtime >= store_path.stat().st_mtime:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    result = segment_paper(PageTextStore(str(store_path)))
+    with open(cache_path, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    return result
+
+
+def find_section(segments: Dict, name: str) -> Optional[Dict]:
+    """섹션명으로 찾기 (번호/대소문자 무시, 부분 일치 허용)"""
+    name = name.lower()
+    for section in segments["sections"]:
+        if _heading_name(section["title"]) == name:
+            return section
+    for section in segments["sections"]:
+        if name in _heading_name(section["title"]):
+            return section
+    return None
+
+
+if __name__ == "__main__":
+    import sys
+
+    args = sys.argv[1:]
+    section_name = None
+    if "--section" in args:
+        i = args.index("--section")
+        section_name = args[i + 1]
+        args = args[:i] + args[i + 2:]
+
+    if not args:
+        print("Usage: python section_segmenter.py <pdf_or_text.bin> [output_dir] [--section NAME]")
+        sys.exit(1)
+
+    segments = load_or_segment(args[0], args[1] if len(args) > 1 else None)
+
+    if section_name:
+        section = find_section(segments, section_name)
+        if section is None:
+            print(f"Section not found: {section_name}")
+            sys.exit(1)
+        print(f"=== {section['title']} (p.{section['page_start']}-{section['page_end']}) ===\n")
+        print(section["text"])
+        sys.exit(0)
+
+    print(f"Body font size: {segments['body_font_size']}\n")
+    for section in segments["sections"]:
+        indent = "  " * max(0, section["level"] - 1)
+        print(f"{indent}- {section['title']} (p.{section['page_start']}-{section['page_end']}, {len(section['text'])} chars)")
+    print(f"\nReferences: {len(segments['references'])}")
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Table Extractor
+PDF 표를 이미지 대신 구조화 데이터(CSV/JSON)로 추출
+
+- PyMuPDF find_tables()로 선(line) 기반 표 탐지 - 렌더링 없이 벡터/텍스트 정보만 사용
+- 괘선이 없는 표는 "Table N" 캡션 아래 영역에 한해 text 전략으로 재시도
+  - 캡션: "Table N." / "Table N:" / "Table N –" 형태이거나 굵은 글씨/짧은 제목 블록만
+    ("Table 2 summarizes ..." 같은 본문 문장 제외)
+  - 재시도 영역: 캡션이 있는 단(column) 폭, 아래쪽 본문 문단/다음 캡션 전까지 (최대 TEXT_TABLE_MAX_HEIGHT)
+  - 숫자가 거의 없고 여러 단어 문장 셀이 대부분인 결과는 표가 아닌 본문으로 보고 제외
+- 출력: {pdf_name}_table_{n}.csv / .json, 전체 목록 {pdf_name}_tables.json
+- 블로그에는 table_to_markdown()으로 네이티브 표 삽입 가능
+
+Usage:
+    python table_extractor.py <pdf_path> [output_dir] [--pages 2,5]
+"""
+
+import os
+import re
+import csv
+import json
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import fitz  # PyMuPDF
+
+
+CAPTION_LABEL = re.compile(r'^\s*Table\s+(\d+|[IVX]+)\b', re.IGNORECASE)
+CAPTION_PATTERN = re.compile(r'^\s*Table\s+(\d+|[IVX]+)\s*[.:|\-\u2013\u2014]', re.IGNORECASE)
+
+FIGURE_LABEL = re.compile(r'^\s*(Fig\.?|Figure)\s*\d+', re.IGNORECASE)
+
+# 캡션과 표 사이 최대 거리 (pt)
+CAPTION_MAX_GAP = 60
+# 구두점 있는 캡션 최대 단어 수 (굵은 글씨면 제한 없음), 구두점 없는 제목형 캡션 최대 단어 수
+CAPTION_MAX_WORDS = 40
+CAPTION_TITLE_MAX_WORDS = 15
+
+# text 전략 재시도 영역 최대 높이 (pt)
+TEXT_TABLE_MAX_HEIGHT = 400
+# 이 단어 수 이상이고 숫자가 드문 블록은 본문 문단
+PROSE_MIN_WORDS = 25
+# text 전략 결과 중 여러 단어(3+) 셀 비율이 이보다 높고 숫자 셀 비율이 PROSE_MAX_NUMERIC 미만이면 본문
+PROSE_CELL_SHARE = 0.5
+PROSE_MAX_NUMERIC = 0.2
+
+
+def _clean_cell(value: Optional[str]) -> str:
+    if value is None:
+        return ""
+    return re.sub(r'\s+', ' ', value.replace("-\n", "")).strip()
+
+
+def _numeric_share(words: List[str]) -> float:
+    return sum(1 for w in words if re.search(r'\d', w)) / max(1, len(words))
+
+
+def _is_prose(text: str) -> bool:
+    """숫자가 드문 긴 본문 문단인지"""
+    words = text.split()
+    return len(words) >= PROSE_MIN_WORDS and _numeric_share(words) < PROSE_MAX_NUMERIC
+
+
+def is_caption(text: str, bold: bool = False) -> bool:
+    """
+    블록이 표 캡션 형태인지
+
+    "Table N" 다음에 소문자로 이어지는 블록("Table 2 summarizes ...")은 본문 문장으로 보고 제외한다.
+
+    Args:
+        text: 블록 텍스트
+        bold: "Table N" 라벨이 굵은 글씨인지
+    """
+    match = CAPTION_LABEL.match(text)
+    if not match:
+        return False
+    rest = _clean_cell(text[match.end():]).lstrip(".:|-\u2013\u2014 ")
+    if rest[:1].islower():
+        return False
+    words = len(text.split())
+    if CAPTION_PATTERN.match(text):
+        return bold or words <= CAPTION_MAX_WORDS
+    return bold or (words <= CAPTION_TITLE_MAX_WORDS and rest[:1].isupper())
+
+
+def _text_blocks(page: fitz.Page) -> List[Dict]:
+    """텍스트 블록 (bbox, text, 첫 span 굵은 글씨 여부)"""
+    blocks = []
+    for block in page.get_text("dict")["blocks"]:
+        if block.get("type") != 0:
+            continue
+        spans = [span for line in block["lines"] for span in line["spans"] if span["text"].strip()]
+        if not spans:
+            continue
+        text = "\n".join("".join(span["text"] for span in line["spans"]) for line in block["lines"])
+        bold = bool(spans[0]["flags"] & 16) or "bold" in spans[0]["font"].lower()
+        blocks.append({"bbox": fitz.Rect(block["bbox"]), "text": text, "bold": bold})
+    return blocks
+
+
+def _caption_blocks(page: fitz.Page, blocks: List[Dict] = None) -> List[Dict]:
+    """페이지의 "Table N" 캡션 블록"""
+    return [
+        {"bbox": block["bbox"], "text": _clean_cell(block["text"])}
+        for block in (blocks if blocks is not None else _text_blocks(page))
+        if is_caption(block["text"], block["bold"])
+    ]
+
+
+def _text_table_clip(page: fitz.Page, caption: Dict, blocks: List[Dict]) -> fitz.Rect:
+    """
+    괘선 없는 표를 찾을 캡션 아래 영역
+
+    옆 단(column)의 본문 문단이 있으면 그 앞까지만, 아래로는 같은 단의 다음 본문 문단이나
+    다른 캡션 전까지 (최대 TEXT_TABLE_MAX_HEIGHT)
+    """
+    rect = caption["bbox"]
+    x0, x1 = max(page.rect.x0, rect.x0 - 2), page.rect.x1
+    y0 = rect.y1
+    y1 = min(page.rect.y1, rect.y1 + TEXT_TABLE_MAX_HEIGHT)
+
+    # 캡션 오른쪽 단의 본문 -> 캡션 단 폭으로 제한
+    for block in blocks:
+        bbox = block["bbox"]
+        if bbox.x0 >= rect.x1 and bbox.y1 > y0 and bbox.y0 < y1 and _is_prose(block["text"]):
+            x1 = min(x1, bbox.x0 - 2)
+
+    # 같은 단에서 캡션 아래 첫 본문 문단/다른 캡션까지
+    for block in blocks:
+        bbox = block["bbox"]
+        if bbox.y0 < rect.y1 or bbox.x1 <= x0 or bbox.x0 >= x1 or bbox == rect:
+            continue
+        if _is_prose(block["text"]) or CAPTION_LABEL.match(block["text"]) or FIGURE_LABEL.match(block["text"]):
+            y1 = min(y1, bbox.y0 - 1)
+
+    return fitz.Rect(x0, y0, x1, max(y0, y1))
+
+
+def _is_prose_table(rows: List[List[str]]) -> bool:
+    """text 전략 결과가 표가 아니라 본문 문단을 잘게 나눈 것인지"""
+    cells = [cell for row in rows for cell in row if cell]
+    if not cells:
+        return True
+    multi_word = sum(1 for cell in cells if len(cell.split()) >= 3) / len(cells)
+    return multi_word > PROSE_CELL_SHARE and _numeric_share(cells) < PROSE_MAX_NUMERIC
+
+
+def _nearest_caption(bbox: fitz.Rect, captions: List[Dict]) -> Optional[Dict]:
+    """표 위(우선) 또는 아래에 가장 가까운 캡션"""
+    best, best_gap = None, CAPTION_MAX_GAP
+    for caption in captions:
+        rect = caption["bbox"]
+        if rect.x1 < bbox.x0 or rect.x0 > bbox.x1:
+            continue
+        if rect.y1 <= bbox.y0 + 2:
+            gap = max(0, bbox.y0 - rect.y1)
+        else:
+            # 아래 캡션은 위 캡션보다 후순위
+            gap = rect.y0 - bbox.y1 + CAPTION_MAX_GAP / 2
+        if 0 <= gap < best_gap:
+            best, best_gap = caption, gap
+    return best
+
+
+def _table_record(table, page: fitz.Page, captions: List[Dict], strategy: str) -> Optional[Dict]:
+    rows = [[_clean_cell(cell) for cell in row] for row in table.extract()]
+    rows = [row for row in rows if any(row)]
+    if len(rows) < 2 or table.col_count < 2:
+        return None
+
+    header = [_clean_cell(name) for name in table.header.names]
+    if table.header.external and CAPTION_LABEL.match(" ".join(header)):
+        # 표 위 캡션 줄이 외부 header로 잡힌 경우 -> 첫 행을 header로
+        header = rows[0]
+    # 내부 header는 extract() 첫 행과 같음
+    if rows and rows[0] == header:
+        rows = rows[1:]
+
+    bbox = fitz.Rect(table.bbox)
+    caption = _nearest_caption(bbox, captions)
+    return {
+        "page": page.number + 1,
+        "bbox": [round(v, 2) for v in bbox],
+        "caption": caption["text"] if caption else None,
+        "strategy": strategy,
+        "header": header,
+        "rows": rows
+    }
+
+
+def find_page_tables(page: fitz.Page) -> List[Dict]:
+    """
+    한 페이지의 표 추출
+
+    Returns:
+        [{"page", "bbox", "caption", "strategy", "header", "rows"}, ...]
+    """
+    blocks = _text_blocks(page)
+    captions = _caption_blocks(page, blocks)
+    tables = []
+
+    for table in page.find_tables(strategy="lines").tables:
+        record = _table_record(table, page, captions, "lines")
+        if record:
+            tables.append(record)
+
+    # 괘선 없는 표: 탐지되지 않은 캡션 아래 영역만 text 전략으로 재시도
+    used = {t["caption"] for t in tables if t["caption"]}
+    for caption in captions:
+        if caption["text"] in used:
+            continue
+        clip = _text_table_clip(page, caption, blocks)
+        if clip.is_empty:
+            continue
+        for table in page.find_tables(clip=clip, strategy="text").tables:
+            record = _table_record(table, page, [caption], "text")
+            if record and record["caption"] and not _is_prose_table([record["header"]] + record["rows"]):
+                tables.append(record)
+                break
+
+    return tables
+
+
+def table_to_markdown(table: Dict) -> str:
+    """표 데이터를 Markdown 표로 변환 (md_to_html의 tables 확장으로 HTML 표가 됨)"""
+    def line(cells):
+        return "| " + " | ".join(c.replace("|", "\\|") for c in cells) + " |"
+
+    width = len(table["header"])
+    lines = [line(table["header"]), "|" + "---|" * width]
+    for row in table["rows"]:
+        lines.append(line((row + [""] * width)[:width]))
+    if table.get("caption"):
+        lines.append("")
+        lines.append(f"*{table['caption']}*")
+    return "\n".join(lines)
+
+
+def extract_tables(pdf_path: str, output_dir: str = "output/tables", pages: List[int] = None) -> List[Dict]:
+    """
+    PDF의 표를 CSV/JSON으로 저장
+
+    Args:
+        pdf_path: PDF 파일 경로
+        output_dir: 출력 디렉토리
+        pages: 대상 페이지 번호 목록 (1부터, 기본: 전체)
+
+    Returns:
+        표 정보 리스트 (csv_path, json_path 포함)
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    pdf_name = Path(pdf_path).stem
+
+    doc = fitz.open(pdf_path)
+    tables = []
+    for page_number in pages or range(1, len(doc) + 1):
+        tables.extend(find_page_tables(doc[page_number - 1]))
+    doc.close()
+
+    for number, table in enumerate(tables, 1):
+        base = os.path.join(output_dir, f"{pdf_name}_table_{number}")
+        table["csv_path"] = base + ".csv"
+        table["json_path"] = base + ".json"
+
+        with open(table["csv_path"], "w", encoding="utf-8-sig", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(table["header"])
+            writer.writerows(table["rows"])
+        with open(table["json_path"], "w", encoding="utf-8") as f:
+            json.dump(table, f, ensure_ascii=False, indent=2)
+
+        label = table["caption"] or f"page {table['page']}"
+        print(f"  [OK] {label[:60]}: {len(table['rows'])}x{len(table['header'])} -> {table['csv_path']}")
+
+    with open(os.path.join(output_dir, f"{pdf_name}_tables.json"), "w", encoding="utf-8") as f:
+        json.dump(tables, f, ensure_ascii=False, indent=2)
+
+    return tables
+
+
+if __name__ == "__main__":
+    import sys
+
+    args = sys.argv[1:]
+    pages = None
+    if "--pages" in args:
+        i = args.index("--pages")
+        pages = [int(p) for p in args[i + 1].split(",")]
+        args = args[:i] + args[i + 2:]
+
+    if not args:
+        print("Usage: python table_extractor.py <pdf_path> [output_dir] [--pages 2,5]")
+        sys.exit(1)
+
+    pdf_path = args[0]
+    output_dir = args[1] if len(args) > 1 else "output/tables"
+
+    tables = extract_tables(pdf_path, output_dir, pages)
+    print(f"\nExtracted {len(tables)} tables -> {output_dir}/")
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+PDF Text Extractor
+PDF의 구조화 텍스트(block, line, span, font, bbox)를 한 번만 추출하여 캐시
+
+- page.get_text("dict") 결과를 페이지별 컬럼 형식으로 저장 (font는 테이블 인덱스)
+- 파일: {pdf_name}_text.bin (페이지 렌더링 결과와 같은 디렉토리)
+  [MAGIC][header 길이 8바이트][header JSON][페이지별 zlib 압축 JSON ...]
+- header에 페이지별 offset이 있어 필요한 페이지만 읽어 압축 해제 (lazy loading)
+
+Usage:
+    python text_extractor.py <pdf_path> [output_dir]
+    python text_extractor.py show <text.bin> [page_number]
+"""
+
+import os
+import json
+import zlib
+import struct
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import fitz  # PyMuPDF
+
+
+MAGIC = b"PTXT1\n"
+FORMAT_VERSION = 1
+
+# 이미지 바이트는 제외하고 텍스트/이미지 블록 위치만 저장
+TEXT_FLAGS = fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES
+
+
+def _round_bbox(bbox) -> List[float]:
+    return [round(v, 2) for v in bbox]
+
+
+def extract_page_columns(page: fitz.Page, font_table: Dict[str, int]) -> Dict:
+    """
+    한 페이지의 get_text("dict") 결과를 컬럼 형식으로 변환
+
+    Returns:
+        {"width", "height", "blocks": {...}, "spans": {...}}
+    """
+    data = page.get_text("dict", flags=TEXT_FLAGS)
+
+    blocks = {"type": [], "bbox": []}
+    spans = {
+        "text": [], "font": [], "size": [], "flags": [], "color": [],
+        "bbox": [], "block": [], "line": []
+    }
+
+    line_index = 0
+    for block_index, block in enumerate(data["blocks"]):
+        blocks["type"].append(block["type"])
+        blocks["bbox"].append(_round_bbox(block["bbox"]))
+
+        for line in block.get("lines", []):
+            for span in line["spans"]:
+                font_id = font_table.setdefault(span["font"], len(font_table))
+                spans["text"].append(span["text"])
+                spans["font"].append(font_id)
+                spans["size"].append(round(span["size"], 2))
+                spans["flags"].append(span["flags"])
+                spans["color"].append(span["color"])
+                spans["bbox"].append(_round_bbox(span["bbox"]))
+                spans["block"].append(block_index)
+                spans["line"].append(line_index)
+            line_index += 1
+
+    return {
+        "width": round(data["width"], 2),
+        "height": round(data["height"], 2),
+        "blocks": blocks,
+        "spans": spans
+    }
+
+
+def extract_pdf_text(pdf_path: str, output_dir: str = "output/images") -> str:
+    """
+    PDF 전체 페이지의 구조화 텍스트를 추출하여 저장
+
+    Args:
+        pdf_path: PDF 파일 경로
+        output_dir: 출력 디렉토리 (페이지 렌더링과 동일 권장)
+
+    Returns:
+        저장된 파일 경로
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    pdf_name = Path(pdf_path).stem
+    store_path = os.path.join(output_dir, f"{pdf_name}_text.bin")
+
+    doc = fitz.open(pdf_path)
+    font_table = {}
+    payloads = []
+
+    for page in doc:
+        columns = extract_page_columns(page, font_table)
+        payloads.append(zlib.compress(
+            json.dumps(columns, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), 6
+        ))
+
+    page_count = len(doc)
+    doc.close()
+
+    # header의 offset은 payload 영역 시작 기준
+    offset = 0
+    pages = []
+    for number, payload in enumerate(payloads, 1):
+        pages.append({"page_number": number, "offset": offset, "length": len(payload)})
+        offset += len(payload)
+
+    header = json.dumps({
+        "version": FORMAT_VERSION,
+        "source": str(pdf_path),
+        "page_count": page_count,
+        "fonts": sorted(font_table, key=font_table.get),
+        "pages": pages
+    }, ensure_ascii=False).encode("utf-8")
+
+    tmp_path = store_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack(">Q", len(header)))
+        f.write(header)
+        for payload in payloads:
+            f.write(payload)
+    os.replace(tmp_path, store_path)
+
+    return store_path
+
+
+class PageTextStore:
+    """
+    extract_pdf_text()로 저장된 파일 리더 (페이지 단위 lazy loading)
+
+    Example:
+        store = PageTextStore("output/images/paper_text.bin")
+        print(store.page_text(3))
+        for span in store.spans(3):
+            if span["size"] > 11: ...
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._cache: Dict[int, Dict] = {}
+
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"Not a text store: {path}")
+            (header_length,) = struct.unpack(">Q", f.read(8))
+            self.header = json.loads(f.read(header_length).decode("utf-8"))
+            self._data_start = len(MAGIC) + 8 + header_length
+
+        self.fonts: List[str] = self.header["fonts"]
+        self._pages = {p["page_number"]: p for p in self.header["pages"]}
+
+    @property
+    def page_count(self) -> int:
+        return self.header["page_count"]
+
+    def page(self, page_number: int) -> Dict:
+        """페이지 컬럼 데이터 (1부터 시작, 한 번 읽은 페이지는 메모리에 유지)"""
+        if page_number not in self._cache:
+            entry = self._pages[page_number]
+            with open(self.path, "rb") as f:
+                f.seek(self._data_start + entry["offset"])
+                payload = f.read(entry["length"])
+            self._cache[page_number] = json.loads(zlib.decompress(payload).decode("utf-8"))
+        return self._cache[page_number]
+
+    def spans(self, page_number: int) -> List[Dict]:
+        """span 목록 (font 이름 복원)"""
+        columns = self.page(page_number)["spans"]
+        return [
+            {
+                "text": columns["text"][i],
+                "font": self.fonts[columns["font"][i]],
+                "size": columns["size"][i],
+                "flags": columns["flags"][i],
+                "color": columns["color"][i],
+                "bbox": columns["bbox"][i],
+                "block": columns["block"][i],
+                "line": columns["line"][i]
+            }
+            for i in range(len(columns["text"]))
+        ]
+
+    def page_text(self, page_number: int) -> str:
+        """페이지 평문 (line 단위 줄바꿈, block 사이 빈 줄)"""
+        columns = self.page(page_number)["spans"]
+        lines: List[str] = []
+        current_line: Optional[int] = None
+        current_block: Optional[int] = None
+
+        for text, block, line in zip(columns["text"], columns["block"], columns["line"]):
+            if line != current_line:
+                if current_block is not None and block != current_block:
+                    lines.append("")
+                lines.append(text)
+                current_line, current_block = line, block
+            else:
+                lines[-1] += text
+
+        return "\n".join(lines)
+
+    def text(self) -> str:
+        """전체 문서 평문"""
+        return "\n\n".join(self.page_text(n) for n in range(1, self.page_count + 1))
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 2:
+        print("Usage: python text_extractor.py <pdf_path> [output_dir]")
+        print("       python text_extractor.py show <text.bin> [page_number]")
+        sys.exit(1)
+
+    if sys.argv[1] == "show":
+        store = PageTextStore(sys.argv[2])
+        if len(sys.argv) > 3:
+            print(store.page_text(int(sys.argv[3])))
+        else:
+            print(store.text())
+        sys.exit(0)
+
+    pdf_path = sys.argv[1]
+    output_dir = sys.argv[2] if len(sys.argv) > 2 else "output/images"
+
+    store_path = extract_pdf_text(pdf_path, output_dir)
+    store = PageTextStore(store_path)
+    print(f"Extracted {store.page_count} pages, {len(store.fonts)} fonts -> {store_path}")
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Asset Registry
+프로젝트 전체에서 공유하는 이미지 자산 레지스트리 (SQLite, state/assets.db)
+
+(content_hash, variant) -> URL, 크기, 해상도
+- content_hash: 파일 바이트의 SHA-256
+- variant: 원본에서 만든 파생본 또는 업로드 위치
+    "webp-q85"  PNG/JPEG -> WebP 변환 결과 (output_hash = 변환된 파일의 content_hash)
+    "gdrive"    해당 바이트 그대로 Google Drive에 업로드한 URL
+- 글마다 따로 있던 webp/gdrive_urls.json 대신, 같은 로고/표지/다이어그램은
+  다른 글에서도 변환·업로드 없이 URL 재사용
+- 조회는 primary key 한 번(변환본은 두 번), 네트워크 요청 없음
+
+Usage:
+    python asset_registry.py lookup <image_file> [host]   # 업로드 URL 조회
+    python asset_registry.py import <webp_dir>            # 기존 gdrive_urls.json 등록
+    python asset_registry.py stats
+"""
+
+import os
+import json
+import hashlib
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+
+DEFAULT_DB_PATH = Path(__file__).parent.parent / "state" / "assets.db"
+
+DEFAULT_HOST = "gdrive"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS assets (
+    content_hash TEXT NOT NULL,
+    variant TEXT NOT NULL,
+    url TEXT,
+    output_hash TEXT,
+    file_name TEXT,
+    size_bytes INTEGER,
+    width INTEGER,
+    height INTEGER,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (content_hash, variant)
+) WITHOUT ROWID;
+"""
+
+
+def webp_variant(quality: int = 85) -> str:
+    """WebP 변환 variant 이름"""
+    return f"webp-q{quality}"
+
+
+def file_content_hash(path: str) -> str:
+    """파일 바이트의 SHA-256 (1MB 단위로 읽음)"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class AssetRegistry:
+    """content hash + variant 기반 자산 레지스트리"""
+
+    def __init__(self, db_path: str = None):
+        self.db_path = Path(db_path or os.environ.get("ASSET_REGISTRY_DB") or DEFAULT_DB_PATH)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def lookup(self, content_hash: str, variant: str) -> Optional[Dict]:
+        """
+        (content_hash, variant) 레코드
+
+        Returns:
+            {"content_hash", "variant", "url", "output_hash", "file_name",
+             "size_bytes", "width", "height", "updated_at"} 또는 None
+        """
+        row = self.conn.execute(
+            "SELECT * FROM assets WHERE content_hash = ? AND variant = ?",
+            (content_hash, variant)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def register(
+        self,
+        content_hash: str,
+        variant: str,
+        url: str = None,
+        output_hash: str = None,
+        file_name: str = None,
+        size_bytes: int = None,
+        width: int = None,
+        height: int = None
+    ):
+        """
+        레코드 등록/갱신 (None인 필드는 기존 값 유지)
+
+        Args:
+            content_hash: 원본 바이트의 SHA-256
+            variant: "webp-q85", "gdrive" 등
+            url: 업로드된 URL (업로드 variant)
+            output_hash: 변환 결과 파일의 content_hash (변환 variant)
+            file_name, size_bytes, width, height: 결과 파일 정보
+        """
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO assets (content_hash, variant, url, output_hash, file_name, "
+                "size_bytes, width, height, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (content_hash, variant) DO UPDATE SET "
+                "url = COALESCE(excluded.url, url), "
+                "output_hash = COALESCE(excluded.output_hash, output_hash), "
+                "file_name = COALESCE(excluded.file_name, file_name), "
+                "size_bytes = COALESCE(excluded.size_bytes, size_bytes), "
+                "width = COALESCE(excluded.width, width), "
+                "height = COALESCE(excluded.height, height), "
+                "updated_at = excluded.updated_at",
+                (
+                    content_hash, variant, url, output_hash, file_name,
+                    size_bytes, width, height, datetime.now().isoformat(timespec="seconds")
+                )
+            )
+
+    def find_uploaded(
+        self,
+        content_hash: str,
+        host: str = DEFAULT_HOST,
+        variant: str = None
+    ) -> Optional[Dict]:
+        """
+        업로드된 URL 조회
+
+        content_hash 자체가 업로드됐으면 그 레코드, variant(예: webp-q85)를 지정하면
+        변환본(output_hash)의 업로드 레코드를 찾는다. 변환본 레코드의 width/height를 함께 반환.
+
+        Returns:
+            {"url", "file_name", "size_bytes", "width", "height", ...} 또는 None
+        """
+        record = self.lookup(content_hash, host)
+        if record and record["url"]:
+            return record
+        if variant is None:
+            return None
+
+        converted = self.lookup(content_hash, variant)
+        if not converted or not converted["output_hash"]:
+            return None
+        record = self.lookup(converted["output_hash"], host)
+        if not record or not record["url"]:
+            return None
+        for key in ("file_name", "size_bytes", "width", "height"):
+            record[key] = record[key] or converted[key]
+        return record
+
+    def register_upload(self, path: str, url: str, host: str = DEFAULT_HOST, content_hash: str = None):
+        """업로드한 파일을 (파일 hash, host) 레코드로 등록"""
+        from PIL import Image
+
+        width = height = None
+        try:
+            with Image.open(path) as img:
+                width, height = img.size
+        except OSError:
+            pass
+        self.register(
+            content_hash or file_content_hash(path), host, url=url,
+            file_name=Path(path).name, size_bytes=os.path.getsize(path),
+            width=width, height=height
+        )
+
+    def import_url_mapping(self, webp_dir: str, host: str = DEFAULT_HOST) -> int:
+        """
+        기존 글의 webp_dir/gdrive_urls.json 업로드 이력 등록
+
+        Returns:
+            등록한 파일 수
+        """
+        mapping_path = Path(webp_dir) / "gdrive_urls.json"
+        if not mapping_path.exists():
+            return 0
+        with open(mapping_path, "r", encoding="utf-8") as f:
+            mapping = json.load(f)
+
+        added = 0
+        for name, url in mapping.items():
+            path = Path(webp_dir) / name
+            if path.suffix.lower() != ".webp" or not path.exists():
+                continue
+            self.register_upload(str(path), url, host)
+            added += 1
+        return added
+
+    def stats(self) -> Dict[str, int]:
+        """variant별 레코드 수"""
+        rows = self.conn.execute("SELECT variant, COUNT(*) FROM assets GROUP BY variant").fetchall()
+        return {row[0]: row[1] for row in rows}
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 2 or sys.argv[1] not in ("lookup", "import", "stats"):
+        print("Usage: python asset_registry.py lookup <image_file> [host]")
+        print("       python asset_registry.py import <webp_dir>")
+        print("       python asset_registry.py stats")
+        sys.exit(1)
+
+    registry = AssetRegistry()
+
+    if sys.argv[1] == "stats":
+        for variant, count in sorted(registry.stats().items()):
+            print(f"{variant}: {count}")
+        sys.exit(0)
+
+    if sys.argv[1] == "import":
+        added = registry.import_url_mapping(sys.argv[2])
+        print(f"Registered {added} uploaded files from {sys.argv[2]}")
+        sys.exit(0)
+
+    path = sys.argv[2]
+    host = sys.argv[3] if len(sys.argv) > 3 else DEFAULT_HOST
+    content_hash = file_content_hash(path)
+    record = registry.find_uploaded(content_hash, host, webp_variant())
+    if record:
+        print(f"  [FOUND] {Path(path).name} -> {record['url']} ({record['width']}x{record['height']})")
+    else:
+        print(f"  [MISS] {Path(path).name} ({content_hash[:12]})")
+        sys.exit(1)
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Publish Benchmark
+로컬 fake 서버(fake_services.py)를 대상으로 발행 파이프라인 전체 처리량 측정
+
+- publish: 글 N개(각각 고유 이미지 M장)를 run_publish_pipeline으로 발행
+    WebP 변환 → 이미지 호스트 업로드 → 설정 생성 → WordPress 발행까지 실제 코드 그대로 실행
+- sonar: Perplexity chat completions 검색 N회 (캐시/인용 색인 없이, 동시 실행)
+
+fake 서버의 지연/오류 주입으로 네트워크 조건을 바꿔 재현 가능한 회귀 비교에 사용.
+자산 레지스트리/이미지 해시 DB는 임시 디렉토리를 사용하므로 state/는 건드리지 않는다.
+
+Usage:
+    python benchmark_publish.py [--posts 10] [--images 4] [--host gdrive|wordpress]
+                                [--latency-ms 20] [--error-rate 0.0] [--sonar 0] [--workers 3] [--seed 0]
+"""
+
+import os
+import sys
+import time
+import random
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Dict, List
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from fake_services import FakeConfig, start_fake_server, fake_env
+
+
+def _percentile(values: List[float], percent: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(percent / 100 * (len(ordered) - 1))))]
+
+
+def make_post(post_dir: Path, index: int, images: int, rng: random.Random) -> Path:
+    """
+    벤치마크용 글 생성 (post_dir/output/post.md + output/images/selected/*.png)
+
+    이미지는 글마다 다른 블록 노이즈 (중복 판정/레지스트리 재사용 없이 모두 업로드되도록)
+    """
+    selected_dir = post_dir / "output" / "images" / "selected"
+    selected_dir.mkdir(parents=True)
+
+    body = []
+    for i in range(1, images + 1):
+        noise = bytes(rng.getrandbits(8) for _ in range(32 * 24 * 3))
+        Image.frombytes("RGB", (32, 24), noise).resize((800, 600), Image.NEAREST).save(
+            selected_dir / f"figure_{i:02d}.png"
+        )
+        body.append(f"![Figure {i}](images/selected/figure_{i:02d}.png)\n\nFigure {i} 설명.\n")
+
+    md_file = post_dir / "output" / "post.md"
+    md_file.write_text(
+        "---\n"
+        f"title: \"벤치마크 글 {index}: 투명교정 치료결과\"\n"
+        f"excerpt: \"벤치마크 요약 {index}\"\n"
+        "tags: [투명교정, 벤치마크]\n"
+        "featured_image: images/selected/figure_01.png\n"
+        "---\n\n"
+        f"# 벤치마크 글 {index}\n\n" + "\n".join(body),
+        encoding="utf-8"
+    )
+    return md_file
+
+
+def benchmark_publish(posts: int, images: int, host: str, work_dir: str, seed: int = 0) -> Dict:
+    """글 posts개를 순서대로 발행하여 글당 시간과 성공 수 측정"""
+    from publish_blog import run_publish_pipeline
+
+    rng = random.Random(seed)
+    md_files = [make_post(Path(work_dir) / f"post_{i:03d}", i, images, rng) for i in range(posts)]
+
+    durations = []
+    failures = []
+    retries = 0
+    start = time.perf_counter()
+    for md_file in md_files:
+        post_start = time.perf_counter()
+        result = run_publish_pipeline(str(md_file), publish=True, image_host=host)
+        durations.append(time.perf_counter() - post_start)
+        retries += sum(stats["retries"] for stats in result.get("http", {}).values())
+        if result["errors"] or not result.get("post_id"):
+            failures.append(result["errors"])
+    total = time.perf_counter() - start
+
+    return {"total": total, "durations": durations, "failures": failures, "retries": retries}
+
+
+def benchmark_sonar(queries: int, workers: int) -> Dict:
+    """Sonar 검색 queries회를 workers개 스레드로 실행"""
+    from sonar_api import SonarAPI
+    from sonar_scheduler import SonarScheduler
+
+    api = SonarAPI(
+        use_cache=False,
+        use_index=False,
+        scheduler=SonarScheduler(requests_per_minute=1e6, max_concurrent=workers)
+    )
+
+    def run(i: int) -> float:
+        query_start = time.perf_counter()
+        api.search_academic(f"clear aligner outcomes benchmark query {i}")
+        return time.perf_counter() - query_start
+
+    durations = []
+    failures = []
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(run, i) for i in range(queries)]
+        for future in futures:
+            try:
+                durations.append(future.result())
+            except Exception as e:
+                failures.append(str(e))
+    total = time.perf_counter() - start
+
+    return {"total": total, "durations": durations, "failures": failures}
+
+
+def _report(name: str, count: int, unit: str, result: Dict):
+    durations = result["durations"]
+    print(f"{name}: {count - len(result['failures'])}/{count} succeeded in {result['total']:.2f}s "
+          f"({count / max(result['total'], 1e-9):.2f} {unit}/s)")
+    print(f"  p50 {_percentile(durations, 50) * 1000:.0f}ms, p95 {_percentile(durations, 95) * 1000:.0f}ms, "
+          f"max {max(durations, default=0) * 1000:.0f}ms"
+          + (f", {result['retries']} HTTP retries" if "retries" in result else ""))
+    for errors in result["failures"][:3]:
+        print(f"  [FAIL] {errors}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark the publish pipeline against local fake services")
+    parser.add_argument("--posts", type=int, default=10, help="Number of posts to publish (default: 10)")
+    parser.add_argument("--images", type=int, default=4, help="Images per post (default: 4)")
+    parser.add_argument("--host", choices=["gdrive", "wordpress"], default="gdrive", help="Image host")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Fake server latency per request")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Random extra latency per request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Injected error rate (0-1)")
+    parser.add_argument("--error-status", type=int, default=503, help="Injected error status")
+    parser.add_argument("--sonar", type=int, default=0, help="Number of Sonar queries to run (default: 0)")
+    parser.add_argument("--workers", type=int, default=3, help="Concurrent Sonar queries (default: 3)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for images and error injection")
+    args = parser.parse_args()
+
+    config = FakeConfig(
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+        error_status=args.error_status, seed=args.seed
+    )
+    server, base_url, state = start_fake_server(config=config)
+    work_dir = tempfile.mkdtemp(prefix="bench_publish_")
+    os.environ.update(fake_env(base_url))
+    os.environ["ASSET_REGISTRY_DB"] = os.path.join(work_dir, "assets.db")
+    os.environ["IMAGE_HASH_DB"] = os.path.join(work_dir, "image_hashes.db")
+    os.environ.pop("SONAR_SESSION_STATE", None)
+
+    # 파이프라인 로그는 측정 중 숨김
+    devnull = open(os.devnull, "w")
+    stdout, sys.stdout = sys.stdout, devnull
+    try:
+        publish_result = benchmark_publish(args.posts, args.images, args.host, work_dir, args.seed) if args.posts else None
+        sonar_result = benchmark_sonar(args.sonar, args.workers) if args.sonar else None
+    finally:
+        sys.stdout = stdout
+        devnull.close()
+        server.shutdown()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(f"=== fake services: latency {args.latency_ms:.0f}ms (+{args.jitter_ms:.0f}ms), "
+          f"error rate {args.error_rate:.0%} ({args.error_status}) ===\n")
+    if publish_result:
+        _report(f"publish ({args.host}, {args.images} images/post)", args.posts, "posts", publish_result)
+    if sonar_result:
+        _report(f"sonar ({args.workers} workers)", args.sonar, "queries", sonar_result)
+
+    summary = state.summary()
+    print(f"\nRequests: {sum(g['count'] for g in summary.values())} "
+          f"({sum(g['errors'] for g in summary.values())} errors)")
+    for key, group in sorted(summary.items()):
+        print(f"  {key:55}{group['count']:>6}{group['errors']:>6}")
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Citation Index
+Sonar 응답의 인용(citations, search_results)을 로컬 SQLite(FTS5)에 누적 저장
+
+- DOI 또는 정규화된 URL 기준으로 중복 제거
+  DOI는 URL 안에 있거나(doi.org/10.x, 출판사 URL) 인용/검색 결과 메타데이터의 doi 필드에 있을 때만
+  인식되므로, DOI 없는 출판사 URL과 doi.org URL은 같은 논문이라도 별개 항목으로 저장된다
+- citations 항목은 URL 문자열 또는 {"url", "title", "doi", ...} dict 모두 허용
+- 답변 본문에서 [n] 인용 주변 문장을 함께 저장하여 키워드 검색 가능
+- API 호출 없이 오프라인으로 BM25 순위 검색
+
+Usage:
+    python citation_index.py search "<keywords>" [limit]
+    python citation_index.py stats
+"""
+
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode, unquote
+
+
+DEFAULT_DB_PATH = Path(__file__).parent.parent / "state" / "citation_index.db"
+
+DOI_PATTERN = re.compile(r'10\.\d{4,9}/[^\s"<>?#]+', re.IGNORECASE)
+
+# URL 정규화 시 제거할 추적 파라미터
+TRACKING_PARAMS = ("utm_", "fbclid", "gclid")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS citations (
+    id INTEGER PRIMARY KEY,
+    key TEXT UNIQUE NOT NULL,      -- doi:<doi> 또는 url:<정규화 URL>
+    doi TEXT,
+    url TEXT NOT NULL,
+    title TEXT DEFAULT '',
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL,
+    seen_count INTEGER DEFAULT 1
+);
+CREATE TABLE IF NOT EXISTS citation_contexts (
+    citation_id INTEGER NOT NULL REFERENCES citations(id),
+    query TEXT NOT NULL,
+    context TEXT DEFAULT '',
+    seen_at TEXT NOT NULL,
+    UNIQUE (citation_id, query)
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS citations_fts USING fts5(
+    title, context, query, tokenize = 'unicode61'
+);
+"""
+
+
+def normalize_doi(text: str) -> Optional[str]:
+    """문자열(URL 포함)에서 DOI 추출 후 소문자 정규화"""
+    match = DOI_PATTERN.search(unquote(text or ""))
+    if not match:
+        return None
+    return match.group(0).rstrip(".,;)]").lower()
+
+
+def normalize_url(url: str) -> str:
+    """
+    URL 정규화 (중복 판단용)
+    - scheme/host 소문자, www. 제거, fragment/추적 파라미터 제거, 끝 슬래시 제거
+    """
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = urlencode([
+        (k, v) for k, v in parse_qsl(parts.query)
+        if not k.lower().startswith(TRACKING_PARAMS)
+    ])
+    path = parts.path.rstrip("/")
+    return urlunsplit(("https" if parts.scheme in ("http", "https") else parts.scheme, host, path, query, ""))
+
+
+def citation_key(url: str, doi: str = None) -> str:
+    """
+    중복 판단 키 (doi:<doi> 또는 url:<정규화 URL>)
+
+    Args:
+        url: 인용 URL
+        doi: 메타데이터의 DOI (없으면 URL 안의 DOI만 인식)
+    """
+    doi = normalize_doi(doi) or normalize_doi(url)
+    return f"doi:{doi}" if doi else f"url:{normalize_url(url)}"
+
+
+def citation_url(citation) -> Optional[str]:
+    """citations 항목(URL 문자열 또는 {"url": ...} dict)의 URL, 없으면 None"""
+    if isinstance(citation, dict):
+        citation = citation.get("url")
+    if isinstance(citation, str) and citation.strip():
+        return citation.strip()
+    return None
+
+
+def extract_citation_contexts(answer: str, n_citations: int) -> Dict[int, str]:
+    """
+    답변에서 [n] 인용 표시가 있는 문장 추출
+
+    Returns:
+        {citation 번호(1부터): 관련 문장들}
+    """
+    contexts = {i: [] for i in range(1, n_citations + 1)}
+    sentences = re.split(r'(?<=[.!?])\s+|\n+', answer or "")
+    for sentence in sentences:
+        for num in re.findall(r'\[(\d+)\]', sentence):
+            num = int(num)
+            if num in contexts:
+                contexts[num].append(re.sub(r'\s*\[\d+\]', '', sentence).strip())
+    return {i: " ".join(parts) for i, parts in contexts.items()}
+
+
+class CitationIndex:
+    """SQLite FTS5 기반 인용 색인"""
+
+    def __init__(self, db_path: str = None):
+        self.db_path = Path(db_path or os.environ.get("CITATION_INDEX_DB") or DEFAULT_DB_PATH)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # fan-out 스레드에서 함께 사용하므로 쓰기는 lock으로 직렬화
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def ingest_response(self, query: str, raw_response: Dict) -> int:
+        """
+        Sonar 원 응답의 citations / search_results 색인
+
+        Args:
+            query: 요청 쿼리
+            raw_response: chat completions 응답 JSON
+
+        Returns:
+            처리한 인용 수
+        """
+        answer = raw_response.get("choices", [{}])[0].get("message", {}).get("content", "")
+        citations = raw_response.get("citations") or []
+        search_results = raw_response.get("search_results") or []
+
+        search_results = [r for r in search_results if isinstance(r, dict) and citation_url(r)]
+        results_by_url = {citation_url(r): r for r in search_results}
+        contexts = extract_citation_contexts(answer, len(citations))
+
+        # [n] 번호는 citations 위치 기준이므로 URL 없는 항목도 번호는 유지
+        entries = []
+        cited = set()
+        for i, citation in enumerate(citations, 1):
+            url = citation_url(citation)
+            if url is None:
+                continue
+            metadata = {**results_by_url.get(url, {}), **(citation if isinstance(citation, dict) else {})}
+            entries.append((url, metadata.get("title") or "", contexts.get(i, ""), metadata.get("doi")))
+            cited.add(url)
+        for url, result in results_by_url.items():
+            if url not in cited:
+                entries.append((url, result.get("title") or "", result.get("snippet") or "", result.get("doi")))
+
+        now = datetime.now().isoformat(timespec="seconds")
+        with self._lock, self.conn:
+            for url, title, context, doi in entries:
+                self._upsert(url, title, context, query, now, doi)
+
+        return len(entries)
+
+    def _upsert(self, url: str, title: str, context: str, query: str, now: str, doi: str = None):
+        key = citation_key(url, doi)
+        row = self.conn.execute("SELECT id, title FROM citations WHERE key = ?", (key,)).fetchone()
+
+        if row is None:
+            cursor = self.conn.execute(
+                "INSERT INTO citations (key, doi, url, title, first_seen, last_seen) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, normalize_doi(doi) or normalize_doi(url), url, title, now, now)
+            )
+            citation_id = cursor.lastrowid
+        else:
+            citation_id = row["id"]
+            self.conn.execute(
+                "UPDATE citations SET last_seen = ?, seen_count = seen_count + 1, "
+                "title = CASE WHEN title = '' THEN ? ELSE title END WHERE id = ?",
+                (now, title, citation_id)
+            )
+
+        self.conn.execute(
+            "INSERT INTO citation_contexts (citation_id, query, context, seen_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (citation_id, query) DO UPDATE SET "
+            "context = CASE WHEN excluded.context != '' THEN excluded.context ELSE context END, "
+            "seen_at = excluded.seen_at",
+            (citation_id, query, context, now)
+        )
+        self._refresh_fts(citation_id)
+
+    def _refresh_fts(self, citation_id: int):
+        """FTS 행을 인용의 제목 + 모든 문맥/쿼리로 갱신"""
+        title = self.conn.execute("SELECT title FROM citations WHERE id = ?", (citation_id,)).fetchone()["title"]
+        rows = self.conn.execute(
+            "SELECT query, context FROM citation_contexts WHERE citation_id = ?", (citation_id,)
+        ).fetchall()
+        self.conn.execute("DELETE FROM citations_fts WHERE rowid = ?", (citation_id,))
+        self.conn.execute(
+            "INSERT INTO citations_fts (rowid, title, context, query) VALUES (?, ?, ?, ?)",
+            (
+                citation_id,
+                title,
+                " ".join(dict.fromkeys(r["context"] for r in rows if r["context"])),
+                " ".join(r["query"] for r in rows)
+            )
+        )
+
+    def search(self, query: str, limit: int = 10) -> List[Dict]:
+        """
+        키워드 검색 (BM25 순위, 제목 가중치 높음)
+
+        Args:
+            query: 검색 키워드 (공백 구분, 하나라도 포함되면 후보)
+            limit: 최대 결과 수
+
+        Returns:
+            [{"url", "doi", "title", "context", "seen_count", "score"}, ...]
+        """
+        terms = re.findall(r'\w+', query)
+        if not terms:
+            return []
+        match = " OR ".join(f'"{t}"' for t in terms)
+
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT c.url, c.doi, c.title, f.context, c.seen_count, "
+                "bm25(citations_fts, 5.0, 2.0, 1.0) AS score "
+                "FROM citations_fts f JOIN citations c ON c.id = f.rowid "
+                "WHERE citations_fts MATCH ? ORDER BY score LIMIT ?",
+                (match, limit)
+            ).fetchall()
+
+        return [dict(row) for row in rows]
+
+    def stats(self) -> Dict:
+        """색인 통계"""
+        return {
+            "citations": self.conn.execute("SELECT COUNT(*) FROM citations").fetchone()[0],
+            "with_doi": self.conn.execute("SELECT COUNT(*) FROM citations WHERE doi IS NOT NULL").fetchone()[0],
+            "queries": self.conn.execute("SELECT COUNT(DISTINCT query) FROM citation_contexts").fetchone()[0]
+        }
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 2 or sys.argv[1] not in ("search", "stats"):
+        print("Usage: python citation_index.py search <keywords> [limit]")
+        print("       python citation_index.py stats")
+        print("Example: python citation_index.py search 'IPR aligner'")
+        sys.exit(1)
+
+    index = CitationIndex()
+
+    if sys.argv[1] == "stats":
+        for name, value in index.stats().items():
+            print(f"{name}: {value}")
+        sys.exit(0)
+
+    keywords = sys.argv[2] if len(sys.argv) > 2 else ""
+    limit = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+
+    results = index.search(keywords, limit)
+    print(f"=== Local citations: {keywords} ({len(results)}) ===\n")
+    for i, r in enumerate(results, 1):
+        print(f"{i}. {r['title'] or r['url']}")
+        print(f"   {r['url']}" + (f"  (DOI: {r['doi']})" if r['doi'] else ""))
+        if r['context']:
+            print(f"   {r['context'][:200]}")
@@ -0,0 +1,681 @@
+#!/usr/bin/env python3
+"""
+Fake Services
+외부 서비스 없이 발행/검색 경로를 실행하고 성능을 측정하기 위한 로컬 fake 서버
+
+- Google OAuth    POST /token
+- Google Drive    POST /upload/drive/v3/files, POST /drive/v3/files/{id}/permissions
+- WordPress       /wp-json/wp/v2/users/me, categories, tags, posts, posts/{id}, media
+                  (media는 width/height + thumbnail/medium/large sizes 응답)
+- Perplexity      POST /chat/completions (일반 JSON + stream SSE)
+
+환경변수(GOOGLE_TOKEN_URL, GOOGLE_DRIVE_API_URL, WORDPRESS_URL, PERPLEXITY_API_URL ...)만
+fake 서버로 바꾸고 실제 클라이언트 코드(publish_blog, image_hosts, gdrive_uploader, sonar_api)를 그대로 실행한다.
+
+지연/오류 주입 (FakeConfig):
+    latency_ms + jitter_ms    모든 응답 전 대기
+    error_rate, error_status  해당 확률로 오류 응답 (429/503은 Retry-After 포함)
+    error_paths               오류 주입 대상 경로 prefix (기본: 전체)
+    stream_chunk_ms           SSE chunk 사이 대기 (chunk가 하나씩 도착하는 스트림)
+    stream_truncate           SSE를 finish_reason/[DONE] 없이 종료 (잘린 스트림)
+
+Usage:
+    python fake_services.py serve [--port 8765] [--latency-ms 50] [--error-rate 0.05] [--error-status 503]
+    python fake_services.py check [--only hosts|stream|cache]
+        hosts:  두 이미지 호스트 백엔드 업로드 확인
+        stream: Sonar SSE 스트리밍 (chunk 단위 도착, cancel_event 중단, 잘린 스트림, 비스트리밍 결과와 일치)
+        cache:  SonarCache (동시 동일 쿼리 병합, 만료 항목 재요청, 깨진 항목은 miss)
+"""
+
+import io
+import re
+import json
+import time
+import random
+import threading
+from dataclasses import dataclass, field
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, List, Tuple
+from urllib.parse import urlsplit, parse_qs
+
+from PIL import Image
+
+
+# WordPress 기본 중간 크기 (add_image_size 기본값)
+WP_SIZES = {"thumbnail": (150, 150, True), "medium": (300, 300, False), "large": (1024, 1024, False)}
+
+FAKE_ACCESS_TOKEN = "fake-access-token"
+
+# 요청 요약에서 /posts/12, /files/drive3 -> /{id}
+ID_SEGMENT = re.compile(r"/(drive)?\d+(?=/|$)")
+
+
+@dataclass
+class FakeConfig:
+    """지연/오류 주입 설정"""
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 503
+    error_paths: List[str] = field(default_factory=list)
+    retry_after: float = 0.0
+    seed: int = None
+    stream_chunk_ms: float = 0.0
+    stream_truncate: bool = False
+
+
+class FakeState:
+    """fake 서버 데이터 + 요청 기록"""
+
+    def __init__(self, config: FakeConfig = None):
+        self.config = config or FakeConfig()
+        self.random = random.Random(self.config.seed)
+        self.lock = threading.Lock()
+        self.next_id = 1
+        self.requests: List[Dict] = []
+        self.files = {}
+        self.categories: List[Dict] = []
+        self.tags: List[Dict] = []
+        self.posts: Dict[int, Dict] = {}
+
+    def new_id(self) -> int:
+        with self.lock:
+            value = self.next_id
+            self.next_id += 1
+            return value
+
+    def record(self, method: str, path: str, status: int, elapsed_ms: float):
+        with self.lock:
+            self.requests.append({"method": method, "path": path, "status": status, "elapsed_ms": elapsed_ms})
+
+    def should_fail(self, path: str) -> bool:
+        config = self.config
+        if config.error_rate <= 0:
+            return False
+        if config.error_paths and not any(path.startswith(prefix) for prefix in config.error_paths):
+            return False
+        with self.lock:
+            return self.random.random() < config.error_rate
+
+    def summary(self) -> Dict[str, Dict]:
+        """경로 그룹별 요청 수/오류 수 (/posts/12 -> /posts/{id})"""
+        groups: Dict[str, Dict] = {}
+        with self.lock:
+            requests = list(self.requests)
+        for request in requests:
+            key = f"{request['method']} {ID_SEGMENT.sub('/{id}', request['path'])}"
+            group = groups.setdefault(key, {"count": 0, "errors": 0})
+            group["count"] += 1
+            group["errors"] += request["status"] >= 400
+        return groups
+
+
+def _wp_sizes(base_url: str, file_name: str, width: int, height: int) -> Dict:
+    stem, _, ext = file_name.rpartition(".")
+    sizes = {}
+    for name, (max_w, max_h, crop) in WP_SIZES.items():
+        if crop:
+            w, h = max_w, max_h
+        else:
+            if width <= max_w and height <= max_h:
+                continue
+            scale = min(max_w / width, max_h / height)
+            w, h = round(width * scale), round(height * scale)
+        sizes[name] = {
+            "file": f"{stem}-{w}x{h}.{ext}",
+            "width": w,
+            "height": h,
+            "source_url": f"{base_url}/wp-content/uploads/{stem}-{w}x{h}.{ext}"
+        }
+    sizes["full"] = {
+        "file": file_name, "width": width, "height": height,
+        "source_url": f"{base_url}/wp-content/uploads/{file_name}"
+    }
+    return sizes
+
+
+def _sonar_response(query: str) -> Dict:
+    citations = [f"https://pubmed.ncbi.nlm.nih.gov/{30000000 + i}/" for i in range(3)]
+    return {
+        "id": "fake-completion",
+        "model": "sonar-deep-research",
+        "choices": [{
+            "index": 0,
+            "finish_reason": "stop",
+            "message": {"role": "assistant", "content": f"Fake answer for: {query[:80]} [1][2][3]"}
+        }],
+        "citations": citations,
+        "search_results": [
+            {"title": f"Fake study {i + 1}", "url": url, "snippet": "Randomized controlled trial."}
+            for i, url in enumerate(citations)
+        ],
+        "usage": {"prompt_tokens": 100, "completion_tokens": 50, "total_tokens": 150}
+    }
+
+
+class FakeHandler(BaseHTTPRequestHandler):
+    """Google OAuth/Drive + WordPress + Perplexity fake 핸들러"""
+
+    protocol_version = "HTTP/1.1"  # keep-alive (연결 재사용 측정)
+    disable_nagle_algorithm = True  # 헤더/본문 분할 전송 시 delayed ACK 지연(~40ms) 방지
+    state: FakeState = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+    def _json(self, status: int, payload, headers: Dict[str, str] = None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+        self._status = status
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.headers.get('Host')}"
+
+    def _dispatch(self, method: str):
+        start = time.perf_counter()
+        self._status = 200
+        url = urlsplit(self.path)
+        body = self._body() if method == "POST" else b""
+
+        config = self.state.config
+        delay = config.latency_ms + (self.state.random.uniform(0, config.jitter_ms) if config.jitter_ms else 0)
+        if delay:
+            time.sleep(delay / 1000)
+
+        try:
+            if self.state.should_fail(url.path):
+                headers = {}
+                if config.error_status in (429, 503):
+                    headers["Retry-After"] = str(config.retry_after)
+                self._json(config.error_status, {"code": "fake_injected_error"}, headers)
+            elif method == "GET":
+                self._handle_get(url.path, parse_qs(url.query))
+            else:
+                self._handle_post(url.path, body)
+        finally:
+            self.state.record(method, url.path, self._status, (time.perf_counter() - start) * 1000)
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def _wp_authorized(self) -> bool:
+        if (self.headers.get("Authorization") or "").startswith("Basic "):
+            return True
+        self._json(401, {"code": "rest_not_logged_in"})
+        return False
+
+    def _post_json(self, post: Dict) -> Dict:
+        return {
+            "id": post["id"],
+            "link": f"{self.base_url}/?p={post['id']}",
+            "status": post["status"],
+            "title": {"raw": post["title"], "rendered": post["title"]},
+            "content": {"raw": post["content"], "rendered": post["content"]},
+            "meta": post["meta"]
+        }
+
+    def _handle_get(self, path: str, query: Dict):
+        if not path.startswith("/wp-json/wp/v2/"):
+            return self._json(404, {"code": "rest_no_route"})
+        if not self._wp_authorized():
+            return
+
+        route = path[len("/wp-json/wp/v2"):]
+        if route == "/users/me":
+            return self._json(200, {"id": 1, "name": "Fake Author", "slug": "fake-author"})
+        if route == "/categories":
+            return self._json(200, self.state.categories)
+        if route == "/tags":
+            return self._json(200, self.state.tags)
+        if route == "/posts":
+            search = (query.get("search") or [""])[0]
+            posts = [p for p in self.state.posts.values() if search in p["content"] or search in p["title"]]
+            return self._json(200, [self._post_json(p) for p in posts[:10]])
+        match = re.fullmatch(r"/posts/(\d+)", route)
+        if match:
+            post = self.state.posts.get(int(match.group(1)))
+            if post is None:
+                return self._json(404, {"code": "rest_post_invalid_id"})
+            return self._json(200, self._post_json(post))
+        self._json(404, {"code": "rest_no_route"})
+
+    def _handle_post(self, path: str, body: bytes):
+        if path == "/token":
+            return self._json(200, {"access_token": FAKE_ACCESS_TOKEN, "expires_in": 3600})
+
+        if path == "/upload/drive/v3/files":
+            if self.headers.get("Authorization") != f"Bearer {FAKE_ACCESS_TOKEN}":
+                return self._json(401, {"error": "invalid token"})
+            message = BytesParser(policy=HTTP).parsebytes(
+                b"Content-Type: " + self.headers["Content-Type"].encode() + b"\r\n\r\n" + body
+            )
+            parts = {part.get_param("name", header="content-disposition"): part for part in message.iter_parts()}
+            metadata = json.loads(parts["metadata"].get_content())
+            file_id = f"drive{self.state.new_id()}"
+            self.state.files[file_id] = parts["file"].get_payload(decode=True)
+            return self._json(200, {
+                "id": file_id, "name": metadata["name"],
+                "webViewLink": f"{self.base_url}/file/d/{file_id}/view"
+            })
+
+        if re.fullmatch(r"/drive/v3/files/[^/]+/permissions", path):
+            return self._json(200, {"id": "anyoneWithLink", "role": "reader", "type": "anyone"})
+
+        if path == "/chat/completions":
+            return self._chat_completions(json.loads(body or b"{}"))
+
+        if not path.startswith("/wp-json/wp/v2/"):
+            return self._json(404, {"code": "rest_no_route"})
+        if not self._wp_authorized():
+            return
+
+        route = path[len("/wp-json/wp/v2"):]
+        if route == "/media":
+            match = re.search(r'filename="([^"]+)"', self.headers.get("Content-Disposition") or "")
+            if not match:
+                return self._json(400, {"code": "rest_upload_no_content_disposition"})
+            file_name = match.group(1)
+            with Image.open(io.BytesIO(body)) as img:
+                width, height = img.size
+            media_id = self.state.new_id()
+            self.state.files[media_id] = body
+            return self._json(201, {
+                "id": media_id,
+                "source_url": f"{self.base_url}/wp-content/uploads/{file_name}",
+                "mime_type": self.headers.get("Content-Type"),
+                "media_details": {
+                    "width": width, "height": height, "file": file_name,
+                    "sizes": _wp_sizes(self.base_url, file_name, width, height)
+                }
+            })
+        if re.fullmatch(r"/media/\d+", route):
+            return self._json(200, {"id": int(route.rsplit("/", 1)[1])})
+
+        data = json.loads(body or b"{}")
+        if route in ("/categories", "/tags"):
+            items = self.state.categories if route == "/categories" else self.state.tags
+            if any(item["name"] == data.get("name") for item in items):
+                return self._json(400, {"code": "term_exists"})
+            item = {"id": self.state.new_id(), "name": data.get("name")}
+            items.append(item)
+            return self._json(201, item)
+
+        if route == "/posts":
+            post = {
+                "id": self.state.new_id(),
+                "title": data.get("title", ""),
+                "content": data.get("content", ""),
+                "status": data.get("status", "draft"),
+                "meta": data.get("meta") or {}
+            }
+            self.state.posts[post["id"]] = post
+            return self._json(201, self._post_json(post))
+
+        match = re.fullmatch(r"/posts/(\d+)", route)
+        if match:
+            post = self.state.posts.get(int(match.group(1)))
+            if post is None:
+                return self._json(404, {"code": "rest_post_invalid_id"})
+            for key in ("title", "content", "status"):
+                if key in data:
+                    post[key] = data[key]
+            for key, value in (data.get("meta") or {}).items():
+                if value is None:
+                    post["meta"].pop(key, None)  # WordPress: null meta 값은 삭제
+                else:
+                    post["meta"][key] = value
+            return self._json(200, self._post_json(post))
+
+        self._json(404, {"code": "rest_no_route"})
+
+    def _chat_completions(self, payload: Dict):
+        if not (self.headers.get("Authorization") or "").startswith("Bearer "):
+            return self._json(401, {"error": {"message": "missing api key"}})
+        query = next((m["content"] for m in reversed(payload.get("messages", [])) if m["role"] == "user"), "")
+        response = _sonar_response(query)
+
+        if not payload.get("stream"):
+            return self._json(200, response)
+
+        # SSE (chunked): 단어 단위 delta, 마지막 chunk에 citations/usage
+        config = self.state.config
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        words = response["choices"][0]["message"]["content"].split(" ")
+        try:
+            for i, word in enumerate(words):
+                last = i == len(words) - 1
+                if last and config.stream_truncate:
+                    break
+                chunk = {"choices": [{"delta": {"content": word + ("" if last else " ")},
+                                      "finish_reason": "stop" if last else None}]}
+                if last:
+                    chunk.update({k: response[k] for k in ("citations", "search_results", "usage")})
+                self._write_chunk(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                if config.stream_chunk_ms:
+                    time.sleep(config.stream_chunk_ms / 1000)
+            if not config.stream_truncate:
+                self._write_chunk(b"data: [DONE]\n\n")
+            self._write_chunk(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # 클라이언트 취소
+        self.close_connection = True
+
+    def _write_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+
+def start_fake_server(port: int = 0, config: FakeConfig = None) -> Tuple[ThreadingHTTPServer, str, FakeState]:
+    """
+    fake 서버를 백그라운드 스레드로 시작
+
+    Returns:
+        (server, base_url, state) - 종료는 server.shutdown()
+    """
+    state = FakeState(config)
+    handler = type("BoundFakeHandler", (FakeHandler,), {"state": state})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}", state
+
+
+def fake_env(base_url: str) -> Dict[str, str]:
+    """fake 서버를 가리키는 환경변수"""
+    return {
+        "GOOGLE_CLIENT_ID": "fake-client",
+        "GOOGLE_CLIENT_SECRET": "fake-secret",
+        "GOOGLE_REFRESH_TOKEN": "fake-refresh",
+        "GOOGLE_TOKEN_URL": f"{base_url}/token",
+        "GOOGLE_DRIVE_API_URL": base_url,
+        "WORDPRESS_URL": base_url,
+        "WORDPRESS_USERNAME": "fake-user",
+        "WORDPRESS_APP_PASSWORD": "fake pass word",
+        "PERPLEXITY_API_KEY": "pplx-fake",
+        "PERPLEXITY_API_URL": f"{base_url}/chat/completions",
+    }
+
+
+def check_sonar_stream() -> bool:
+    """
+    Sonar SSE 스트리밍 확인
+
+    - chunk가 하나씩 도착 (첫 chunk가 스트림 끝보다 먼저)
+    - cancel_event로 중간 중단 (다음 chunk를 기다리지 않고 종료, 캐시 저장 없음)
+    - [DONE]/finish_reason 없이 끝난 스트림은 IncompleteStreamError (캐시 저장 없음)
+    - 마지막 chunk의 SonarResponse가 비스트리밍 search_academic 결과와 같음
+    """
+    import os
+    import tempfile
+    from sonar_api import SonarAPI, IncompleteStreamError
+    from sonar_cache import SonarCache
+    from sonar_scheduler import SonarScheduler
+
+    config = FakeConfig(stream_chunk_ms=50)
+    server, base_url, state = start_fake_server(config=config)
+    os.environ.update(fake_env(base_url))
+    ok = True
+
+    def report(passed: bool, message: str):
+        nonlocal ok
+        ok = ok and passed
+        print(f"  [{'OK' if passed else 'FAIL'}] {message}")
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        os.environ["SONAR_SESSION_STATE"] = os.path.join(work_dir, "session.yaml")
+        cache = SonarCache(os.path.join(work_dir, "cache"))
+        api = SonarAPI(
+            cache=cache, use_index=False,
+            scheduler=SonarScheduler(requests_per_minute=1e6, session_state_file=os.environ["SONAR_SESSION_STATE"])
+        )
+        cache_files = lambda: list(cache.cache_dir.glob("*.json"))
+
+        # chunk 단위 도착
+        start = time.perf_counter()
+        arrivals = []
+        chunks = []
+        for chunk in api.search_academic_stream("stream arrival check"):
+            arrivals.append(time.perf_counter() - start)
+            chunks.append(chunk)
+        final = chunks[-1]
+        deltas = [chunk for chunk in chunks if chunk.delta]
+        report(
+            len(deltas) > 1 and arrivals[0] < arrivals[-1] - config.stream_chunk_ms / 1000 * (len(deltas) - 2),
+            f"{len(deltas)} chunks arrived incrementally (first {arrivals[0] * 1000:.0f}ms, "
+            f"last {arrivals[-1] * 1000:.0f}ms)"
+        )
+
+        # 비스트리밍 결과와 일치 (캐시 없이 서버에서 다시 받음)
+        plain = SonarAPI(
+            use_cache=False, use_index=False, scheduler=api.scheduler
+        ).search_academic("stream arrival check")
+        report(
+            final.done and final.response is not None and final.response == plain,
+            "final streamed SonarResponse matches search_academic"
+        )
+
+        # cancel_event로 중단
+        config.stream_chunk_ms = 300
+        cancel = threading.Event()
+        cached_before = len(cache_files())
+        start = time.perf_counter()
+        chunks = []
+        for chunk in api.search_academic_stream("stream cancel check", cancel_event=cancel):
+            chunks.append(chunk)
+            if chunk.delta and not cancel.is_set():
+                cancel.set()
+                cancelled_at = time.perf_counter()
+        stopped = time.perf_counter() - cancelled_at
+        report(
+            chunks[-1].cancelled and stopped < config.stream_chunk_ms / 1000 + 0.2
+            and len(cache_files()) == cached_before,
+            f"cancel_event stopped the stream {stopped * 1000:.0f}ms after set, nothing cached"
+        )
+
+        # 잘린 스트림
+        config.stream_chunk_ms = 0
+        config.stream_truncate = True
+        try:
+            for _ in api.search_academic_stream("stream truncate check"):
+                pass
+            report(False, "truncated stream raised IncompleteStreamError")
+        except IncompleteStreamError:
+            report(len(cache_files()) == cached_before, "truncated stream raised IncompleteStreamError, nothing cached")
+        config.stream_truncate = False
+
+    server.shutdown()
+    return ok
+
+
+def check_sonar_cache() -> bool:
+    """
+    SonarCache 확인 (upstream 호출 수는 fake 서버의 POST /chat/completions 기록으로 셈)
+
+    - 공백/대소문자만 다른 동일 쿼리 N개를 동시에 보내면 upstream 호출 1회
+    - 다시 조회하면 cache hit (호출 없음)
+    - 만료된 항목은 다시 받아옴
+    - 깨진 항목 (키 누락, 숫자가 아닌 값, JSON 오류)은 miss로 처리하고 다시 받아옴
+    """
+    import os
+    import tempfile
+    from concurrent.futures import ThreadPoolExecutor
+    from sonar_api import SonarAPI
+    from sonar_cache import SonarCache
+    from sonar_scheduler import SonarScheduler
+
+    concurrency = 8
+    server, base_url, state = start_fake_server(config=FakeConfig(latency_ms=300))
+    os.environ.update(fake_env(base_url))
+    ok = True
+
+    def report(passed: bool, message: str):
+        nonlocal ok
+        ok = ok and passed
+        print(f"  [{'OK' if passed else 'FAIL'}] {message}")
+
+    def upstream_calls() -> int:
+        with state.lock:
+            return sum(1 for r in state.requests if r["path"] == "/chat/completions")
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        os.environ["SONAR_SESSION_STATE"] = os.path.join(work_dir, "session.yaml")
+        cache = SonarCache(os.path.join(work_dir, "cache"))
+        api = SonarAPI(
+            cache=cache, use_index=False,
+            scheduler=SonarScheduler(requests_per_minute=1e6, session_state_file=os.environ["SONAR_SESSION_STATE"])
+        )
+        queries = [
+            "Cache  coalescing check" if i % 2 else "cache coalescing CHECK "
+            for i in range(concurrency)
+        ]
+
+        # 동시 동일 쿼리 -> 1회 호출
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            answers = {r.answer for r in pool.map(api.search_academic, queries)}
+        calls = upstream_calls()
+        report(
+            calls == 1 and len(answers) == 1,
+            f"{concurrency} concurrent identical queries -> {calls} upstream call(s) "
+            f"(misses={cache.misses}, coalesced={cache.coalesced}, hits={cache.hits})"
+        )
+
+        # cache hit
+        api.search_academic(queries[0])
+        report(upstream_calls() == calls, "repeat query served from cache")
+
+        # 만료 항목 재요청
+        entries = list(cache.cache_dir.glob("*.json"))
+        path = entries[0]
+        entry = json.loads(path.read_text(encoding="utf-8"))
+        entry["created_at"] -= entry["ttl"] + 1
+        path.write_text(json.dumps(entry), encoding="utf-8")
+        api.search_academic(queries[0])
+        report(upstream_calls() == calls + 1, "expired entry refetched")
+
+        # 깨진 항목 -> miss
+        broken = {
+            "missing ttl": lambda e: e.pop("ttl"),
+            "missing response": lambda e: e.pop("response"),
+            "non-numeric created_at": lambda e: e.update(created_at="yesterday"),
+            "null ttl": lambda e: e.update(ttl=None),
+        }
+        for name, corrupt in broken.items():
+            entry = json.loads(path.read_text(encoding="utf-8"))
+            corrupt(entry)
+            path.write_text(json.dumps(entry), encoding="utf-8")
+            before = upstream_calls()
+            try:
+                api.search_academic(queries[0])
+                report(upstream_calls() == before + 1, f"malformed entry ({name}) treated as miss")
+            except Exception as e:
+                report(False, f"malformed entry ({name}) raised {type(e).__name__}: {e}")
+
+        path.write_text("{not json", encoding="utf-8")
+        before = upstream_calls()
+        api.search_academic(queries[0])
+        report(upstream_calls() == before + 1, "malformed entry (invalid JSON) treated as miss")
+
+    server.shutdown()
+    return ok
+
+
+def check_image_hosts() -> bool:
+    """gdrive/wordpress 두 백엔드로 같은 이미지를 업로드하여 URL, 해상도, 재실행 시 레지스트리 재사용 확인"""
+    import os
+    import tempfile
+    from image_hosts import IMAGE_HOSTS, get_image_host, upload_images, load_media_manifest
+    from asset_registry import AssetRegistry
+
+    server, base_url, state = start_fake_server()
+    os.environ.update(fake_env(base_url))
+    ok = True
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        Image.new("RGB", (1200, 800), (200, 220, 240)).save(os.path.join(work_dir, "fig1.webp"), "WEBP")
+        Image.new("RGB", (240, 180), (90, 60, 30)).save(os.path.join(work_dir, "fig2.webp"), "WEBP")
+        registry = AssetRegistry(os.path.join(work_dir, "assets.db"))
+
+        for name in IMAGE_HOSTS:
+            host = get_image_host(name)
+            mapping = upload_images(work_dir, host, registry=registry)
+            media = load_media_manifest(work_dir, name)
+            for file_name, (width, height) in (("fig1.webp", (1200, 800)), ("fig2.webp", (240, 180))):
+                entry = media.get(file_name, {})
+                passed = (
+                    bool(mapping.get(file_name)) and mapping.get(file_name) == entry.get("url")
+                    and (entry.get("width"), entry.get("height")) == (width, height)
+                )
+                ok = ok and passed
+                print(f"  [{'OK' if passed else 'FAIL'}] {name} {file_name}: {entry.get('width')}x{entry.get('height')} "
+                      f"sizes={sorted(entry.get('sizes', {}))}")
+
+            # 같은 호스트 재업로드는 레지스트리에서 해결되어 요청 없음
+            before = len(state.requests)
+            upload_images(work_dir, host, registry=registry)
+            passed = len(state.requests) == before
+            ok = ok and passed
+            print(f"  [{'OK' if passed else 'FAIL'}] {name} re-run served from registry")
+
+        registry.close()
+
+    server.shutdown()
+    return ok
+
+
+if __name__ == "__main__":
+    import sys
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Local fake Google/WordPress/Perplexity services")
+    parser.add_argument("command", choices=["serve", "check"])
+    parser.add_argument("--only", choices=["hosts", "stream", "cache"], help="check: run one check only")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--error-path", action="append", default=[], help="Inject errors only under this path prefix")
+    args = parser.parse_args()
+
+    if args.command == "check":
+        checks = {"hosts": check_image_hosts, "stream": check_sonar_stream, "cache": check_sonar_cache}
+        results = []
+        for name, check in checks.items():
+            if args.only in (None, name):
+                print(f"{name}:")
+                results.append(check())
+        sys.exit(0 if all(results) else 1)
+
+    config = FakeConfig(
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+        error_status=args.error_status, error_paths=args.error_path
+    )
+    server, base_url, state = start_fake_server(args.port, config)
+    print(f"Fake services running at {base_url}\n")
+    for key, value in fake_env(base_url).items():
+        print(f"export {key}='{value}'")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+        for key, group in sorted(state.summary().items()):
+            print(f"  {key}: {group['count']} requests, {group['errors']} errors")
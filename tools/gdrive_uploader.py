@@ -7,8 +7,11 @@ Google Drive Uploader
 import os
 import json
 from pathlib import Path
-from typing import List, Dict, Optional
-import requests
+from typing import List, Dict, Optional, Callable, Set
+
+from asset_registry import AssetRegistry
+from http_client import get_http_client
+from image_hosts import GDriveHost, upload_images
 
 # .env 파일 로드
 try:
@@ -34,16 +37,22 @@ class GDriveUploader:
         self.refresh_token = refresh_token or os.environ.get("GOOGLE_REFRESH_TOKEN")
         self.folder_id = folder_id or os.environ.get("GOOGLE_DRIVE_FOLDER_ID")
 
+        # GOOGLE_TOKEN_URL / GOOGLE_DRIVE_API_URL로 로컬 fake 서버 지정 가능 (테스트용)
+        self.token_url = os.environ.get("GOOGLE_TOKEN_URL", "https://oauth2.googleapis.com/token")
+        self.api_url = os.environ.get("GOOGLE_DRIVE_API_URL", "https://www.googleapis.com").rstrip("/")
+
         if not all([self.client_id, self.client_secret, self.refresh_token]):
             raise ValueError("Google Drive credentials required")
 
+        self.http = get_http_client()
         self.access_token = None
         self._refresh_access_token()
 
     def _refresh_access_token(self):
         """Access token 갱신"""
-        response = requests.post(
-            "https://oauth2.googleapis.com/token",
+        response = self.http.post(
+            self.token_url,
+            idempotent=True,
             data={
                 "client_id": self.client_id,
                 "client_secret": self.client_secret,
@@ -95,14 +104,16 @@ class GDriveUploader:
             "Authorization": f"Bearer {self.access_token}"
         }
 
-        # 메타데이터 파트
+        # 메타데이터 파트 (파일은 bytes로 읽어 재시도 시 다시 전송 가능하게)
+        with open(file_path, 'rb') as f:
+            content = f.read()
         files = {
             'metadata': ('metadata', json.dumps(metadata), 'application/json'),
-            'file': (file_name, open(file_path, 'rb'), mime_type)
+            'file': (file_name, content, mime_type)
         }
 
-        response = requests.post(
-            "https://www.googleapis.com/upload/drive/v3/files?uploadType=multipart&fields=id,name,webViewLink",
+        response = self.http.post(
+            f"{self.api_url}/upload/drive/v3/files?uploadType=multipart&fields=id,name,webViewLink",
             headers=headers,
             files=files
         )
@@ -134,9 +145,10 @@ class GDriveUploader:
             "Content-Type": "application/json"
         }
 
-        response = requests.post(
-            f"https://www.googleapis.com/drive/v3/files/{file_id}/permissions",
+        response = self.http.post(
+            f"{self.api_url}/drive/v3/files/{file_id}/permissions",
             headers=headers,
+            idempotent=True,
             json={
                 "role": "reader",
                 "type": "anyone"
@@ -171,7 +183,11 @@ class GDriveUploader:
 
 def upload_images_to_gdrive(
     image_dir: str,
-    pattern: str = "*.webp"
+    pattern: str = "*.webp",
+    uploaded: Dict[str, str] = None,
+    on_uploaded: Callable[[Path, Dict], None] = None,
+    skip: Set[str] = None,
+    registry: AssetRegistry = None
 ) -> Dict[str, str]:
     """
     이미지 디렉토리를 Google Drive에 업로드하고 URL 매핑 반환
@@ -179,32 +195,19 @@ def upload_images_to_gdrive(
     Args:
         image_dir: 이미지 디렉토리
         pattern: 파일 패턴
+        uploaded: 이미 업로드된 {파일명: URL} (체크포인트, 재업로드 스킵)
+        on_uploaded: 파일 하나 업로드 완료 시 호출 (file_path, image_hosts 결과 형식)
+        skip: 업로드하지 않을 파일명 (중복 이미지 - 호출한 쪽에서 URL 매핑)
+        registry: 지정하면 같은 바이트의 파일이 이전에 (다른 글에서라도) 업로드됐을 때 URL 재사용,
+            새로 업로드한 파일은 등록
 
     Returns:
         {원본파일명: Google Drive URL} 매핑
     """
-    uploader = GDriveUploader()
-    image_path = Path(image_dir)
-    files = list(image_path.glob(pattern))
-
-    print(f"Found {len(files)} files to upload")
-
-    url_mapping = {}
-    for file_path in files:
-        result = uploader.upload_file(str(file_path))
-        # 원본 PNG 이름으로 매핑 (확장자만 다름)
-        original_name = file_path.stem + ".png"
-        url_mapping[original_name] = result["direct_link"]
-        url_mapping[file_path.name] = result["direct_link"]
-        print(f"  {file_path.name} -> {result['direct_link']}")
-
-    # 매핑 저장
-    mapping_path = image_path / "gdrive_urls.json"
-    with open(mapping_path, "w", encoding="utf-8") as f:
-        json.dump(url_mapping, f, indent=2, ensure_ascii=False)
-
-    print(f"\nURL mapping saved to: {mapping_path}")
-    return url_mapping
+    return upload_images(
+        image_dir, GDriveHost(), pattern,
+        uploaded=uploaded, on_uploaded=on_uploaded, skip=skip, registry=registry
+    )
 
 
 if __name__ == "__main__":
@@ -218,5 +221,7 @@ if __name__ == "__main__":
     image_dir = sys.argv[1]
     pattern = sys.argv[2] if len(sys.argv) > 2 else "*.webp"
 
-    url_mapping = upload_images_to_gdrive(image_dir, pattern)
+    registry = AssetRegistry()
+    url_mapping = upload_images_to_gdrive(image_dir, pattern, registry=registry)
+    registry.close()
     print(f"\nUploaded {len(url_mapping)} files")
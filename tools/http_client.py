@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+HTTP Client
+외부 API 호출(WordPress, Google Drive/OAuth, Perplexity) 공통 HTTP 계층
+
+- 타임아웃: 모든 요청에 (connect, read) 타임아웃 (기본 5초 / 60초)
+- 재시도: 429/5xx, 연결 실패 시 지수 백오프 + jitter, Retry-After 헤더가 있으면 그 값을 따름
+    POST 등 비멱등 요청은 서버가 처리하지 않은 것이 확실한 경우(429/503, 연결 타임아웃)만 재시도
+    (idempotent=True로 지정한 요청은 GET과 같이 모든 일시적 오류에서 재시도)
+- 연결 재사용: 프로세스 전체에서 하나의 requests.Session (호스트별 연결 풀)
+- Circuit breaker: 호스트별 연속 실패가 임계값을 넘으면 일정 시간 요청을 바로 거부
+    (죽은 서버에 재시도를 반복하며 파이프라인이 멈추지 않도록), 이후 요청 1건으로 복구 확인
+- 메트릭: 호스트별 호출/시도/재시도/실패/차단 수와 응답 시간 (발행 결과 JSON에 기록)
+
+환경변수:
+    HTTP_CONNECT_TIMEOUT (5), HTTP_READ_TIMEOUT (60), HTTP_MAX_RETRIES (3),
+    HTTP_BACKOFF_BASE (1.0), HTTP_BACKOFF_MAX (30), HTTP_POOL_SIZE (8),
+    HTTP_CIRCUIT_FAILURES (5), HTTP_CIRCUIT_RESET (30)
+
+Usage:
+    from http_client import get_http_client
+
+    http = get_http_client()
+    response = http.get(url, headers=headers)
+    response = http.post(url, json=payload, idempotent=True)
+    http.metrics.snapshot()
+"""
+
+import os
+import time
+import random
+import threading
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# 서버가 요청을 처리하지 않았음을 뜻하는 응답 (비멱등 요청도 재시도 가능)
+NOT_PROCESSED_STATUS_CODES = (429, 503)
+
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+
+# Retry-After가 이보다 길면 기다리지 않고 실패 처리
+MAX_RETRY_AFTER = 120.0
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """호스트의 circuit이 열려 있어 요청하지 않음"""
+
+
+class CircuitBreaker:
+    """
+    호스트 하나의 circuit breaker
+
+    closed: 정상. 연속 실패가 failure_threshold에 도달하면 open
+    open: reset_timeout 동안 요청 거부
+    half_open: reset_timeout 후 요청 1건만 허용, 성공하면 closed / 실패하면 다시 open
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self.lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        with self.lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self.trial_in_flight:
+                self.trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_in_flight = False
+
+    def release_trial(self):
+        """half-open 시험 요청이 결과 없이 끝남 (요청 외 예외) - 다음 요청이 다시 시험할 수 있게"""
+        with self.lock:
+            self.trial_in_flight = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.trial_in_flight or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self.trial_in_flight = False
+
+
+class HTTPMetrics:
+    """호스트별 요청 메트릭 (스레드 안전)"""
+
+    FIELDS = ("calls", "attempts", "retries", "failures", "circuit_rejected", "backoff_seconds",
+              "latency_ms_total", "latency_ms_max")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.hosts: Dict[str, Dict[str, float]] = {}
+
+    def _host(self, host: str) -> Dict[str, float]:
+        return self.hosts.setdefault(host, {field: 0 for field in self.FIELDS})
+
+    def add(self, host: str, **values):
+        with self.lock:
+            stats = self._host(host)
+            for field, value in values.items():
+                stats[field] += value
+
+    def observe_latency(self, host: str, latency_ms: float):
+        with self.lock:
+            stats = self._host(host)
+            stats["latency_ms_total"] += latency_ms
+            stats["latency_ms_max"] = max(stats["latency_ms_max"], latency_ms)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self.lock:
+            return {host: dict(stats) for host, stats in self.hosts.items()}
+
+    def since(self, before: Dict[str, Dict[str, float]]) -> Dict[str, Dict]:
+        """
+        before 스냅샷 이후 증가분 (발행 한 번의 메트릭)
+
+        Returns:
+            {호스트: {"calls", "attempts", "retries", "failures", "circuit_rejected",
+                      "backoff_seconds", "latency_ms_avg"}}
+        """
+        result = {}
+        for host, stats in self.snapshot().items():
+            previous = before.get(host, {})
+            delta = {field: stats[field] - previous.get(field, 0) for field in self.FIELDS}
+            if not delta["attempts"] and not delta["circuit_rejected"]:
+                continue
+            result[host] = {
+                "calls": int(delta["calls"]),
+                "attempts": int(delta["attempts"]),
+                "retries": int(delta["retries"]),
+                "failures": int(delta["failures"]),
+                "circuit_rejected": int(delta["circuit_rejected"]),
+                "backoff_seconds": round(delta["backoff_seconds"], 2),
+                "latency_ms_avg": round(delta["latency_ms_total"] / max(delta["attempts"], 1), 1)
+            }
+        return result
+
+
+def retry_after_seconds(response: requests.Response) -> Optional[float]:
+    """Retry-After 헤더 (초 또는 HTTP 날짜) → 대기 시간 (초), 없으면 None"""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class HTTPClient:
+    """타임아웃 + 재시도/백오프 + 호스트별 circuit breaker + 메트릭을 적용한 requests.Session 래퍼"""
+
+    def __init__(
+        self,
+        connect_timeout: float = None,
+        read_timeout: float = None,
+        max_retries: int = None,
+        backoff_base: float = None,
+        backoff_max: float = None,
+        pool_size: int = None,
+        failure_threshold: int = None,
+        reset_timeout: float = None
+    ):
+        self.connect_timeout = connect_timeout or _env_float("HTTP_CONNECT_TIMEOUT", 5.0)
+        self.read_timeout = read_timeout or _env_float("HTTP_READ_TIMEOUT", 60.0)
+        self.max_retries = int(max_retries if max_retries is not None else _env_float("HTTP_MAX_RETRIES", 3))
+        self.backoff_base = backoff_base if backoff_base is not None else _env_float("HTTP_BACKOFF_BASE", 1.0)
+        self.backoff_max = backoff_max or _env_float("HTTP_BACKOFF_MAX", 30.0)
+        self.failure_threshold = int(failure_threshold or _env_float("HTTP_CIRCUIT_FAILURES", 5))
+        self.reset_timeout = reset_timeout if reset_timeout is not None else _env_float("HTTP_CIRCUIT_RESET", 30.0)
+
+        pool_size = int(pool_size or _env_float("HTTP_POOL_SIZE", 8))
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self.metrics = HTTPMetrics()
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.breakers_lock = threading.Lock()
+
+    def breaker(self, host: str) -> CircuitBreaker:
+        with self.breakers_lock:
+            if host not in self.breakers:
+                self.breakers[host] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            return self.breakers[host]
+
+    def _backoff(self, attempt: int) -> float:
+        # equal jitter: 절반은 고정, 절반은 무작위 (동시 재시도 분산)
+        delay = min(self.backoff_max, self.backoff_base * 2 ** attempt)
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        timeout: Union[float, Tuple[float, float]] = None,
+        idempotent: bool = None,
+        max_retries: int = None,
+        before_retry: Callable[[], None] = None,
+        retry_read_timeout: bool = True,
+        deadline: float = None,
+        **kwargs
+    ) -> requests.Response:
+        """
+        HTTP 요청 (재시도 후 마지막 응답 반환, 상태 코드 확인은 호출한 쪽에서)
+
+        Args:
+            method: HTTP 메서드
+            url: 요청 URL
+            timeout: read 타임아웃(초) 또는 (connect, read), None이면 기본값
+            idempotent: 모든 일시적 오류에서 재시도해도 되는 요청인지 (None이면 메서드로 판단)
+            max_retries: 최대 재시도 횟수 (None이면 기본값)
+            before_retry: 재시도 직전 호출 (속도 제한/예산 확인 등, 예외를 던지면 재시도 중단)
+            retry_read_timeout: False면 read 타임아웃은 재시도하지 않음
+                (서버가 이미 오래 처리한 비싼 요청을 처음부터 다시 실행하지 않도록)
+            deadline: 재시도와 대기를 합친 전체 시간 상한(초). 남은 시간이 부족하면 재시도하지 않고,
+                각 시도의 read 타임아웃도 남은 시간으로 줄인다
+            **kwargs: requests.Session.request 인자 (headers, json, data, params, stream ...)
+
+        Raises:
+            CircuitOpenError: 호스트 circuit이 열려 있음
+            requests.RequestException: 재시도 후에도 연결 실패/타임아웃
+        """
+        method = method.upper()
+        host = urlsplit(url).netloc
+        breaker = self.breaker(host)
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        if max_retries is None:
+            max_retries = self.max_retries
+        if timeout is None:
+            timeout = (self.connect_timeout, self.read_timeout)
+        elif not isinstance(timeout, tuple):
+            timeout = (min(self.connect_timeout, timeout), timeout)
+
+        self.metrics.add(host, calls=1)
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            if not breaker.allow():
+                self.metrics.add(host, circuit_rejected=1, failures=1)
+                raise CircuitOpenError(f"Circuit open for {host} (too many failures, retry later)")
+
+            attempt_timeout = timeout
+            if deadline is not None:
+                remaining = max(deadline - (time.monotonic() - started), 0.1)
+                attempt_timeout = (min(timeout[0], remaining), min(timeout[1], remaining))
+
+            self.metrics.add(host, attempts=1)
+            start = time.perf_counter()
+            response = None
+            error = None
+            try:
+                response = self.session.request(method, url, timeout=attempt_timeout, **kwargs)
+            except BaseException as e:
+                if not isinstance(e, requests.RequestException):
+                    # KeyboardInterrupt 등: half-open 시험 슬롯을 반환해야 circuit이 영구히 열려 있지 않음
+                    breaker.release_trial()
+                    raise
+                error = e
+                self.metrics.observe_latency(host, (time.perf_counter() - start) * 1000)
+                breaker.record_failure()
+                # 연결 타임아웃은 요청이 전달되지 않았으므로 항상 재시도 가능
+                retryable = isinstance(e, requests.ConnectTimeout) or (
+                    idempotent and isinstance(e, (requests.ConnectionError, requests.Timeout))
+                    and (retry_read_timeout or not isinstance(e, requests.ReadTimeout))
+                )
+                if not retryable or attempt >= max_retries:
+                    self.metrics.add(host, failures=1)
+                    raise
+                delay = self._backoff(attempt)
+                reason = type(e).__name__
+            else:
+                self.metrics.observe_latency(host, (time.perf_counter() - start) * 1000)
+                status = response.status_code
+                if status >= 500:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+
+                retryable = status in (RETRY_STATUS_CODES if idempotent else NOT_PROCESSED_STATUS_CODES)
+                if not retryable:
+                    return response
+                if attempt >= max_retries:
+                    self.metrics.add(host, failures=1)
+                    return response
+
+                delay = retry_after_seconds(response)
+                if delay is None:
+                    delay = self._backoff(attempt)
+                elif delay > MAX_RETRY_AFTER:
+                    self.metrics.add(host, failures=1)
+                    return response
+                reason = str(status)
+
+            if deadline is not None and time.monotonic() - started + delay >= deadline:
+                # 대기 후 남은 시간이 없으면 재시도하지 않고 마지막 결과 반환
+                self.metrics.add(host, failures=1)
+                if error is not None:
+                    raise error
+                return response
+            if response is not None:
+                response.close()
+
+            print(f"  HTTP {reason} from {host}, retrying in {delay:.1f}s ({attempt + 1}/{max_retries})...")
+            self.metrics.add(host, retries=1, backoff_seconds=delay)
+            time.sleep(delay)
+            if before_retry:
+                before_retry()
+            attempt += 1
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_http_client() -> HTTPClient:
+    """프로세스 공용 HTTPClient (연결 풀, circuit breaker, 메트릭 공유)"""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = HTTPClient()
+        return _default_client
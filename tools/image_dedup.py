@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Image Dedup
+perceptual hash(pHash + dHash)로 중복/유사 Figure를 찾아 기존 업로드 URL 재사용
+
+- 자동 재사용은 파일 내용(SHA-256)이 같은 완전 중복만
+- 유사 이미지(해시 거리 기준)는 fig1a/fig1b처럼 다른 Figure일 수 있으므로 보고만 하고 사용자가 확인
+  -> 같은 Figure면 publish_blog.py --reuse-near <이미지>로 승인해야 기존 URL 재사용
+- 색인은 유사 이미지 확인용 (권고). 완전 중복의 글 간 재사용은 자산 레지스트리(asset_registry.py)가 주로 담당
+
+- pHash: 32x32 grayscale DCT 저주파 8x8 (DC 제외 중앙값 기준) 64bit
+- dHash: 9x8 grayscale 인접 픽셀 밝기 비교 64bit
+- 색인: SQLite (state/image_hashes.db), pHash를 8bit씩 8개 band로 나눠 인덱스
+  -> 해밍 거리 7 이하는 최소 한 band가 일치하므로 band 조회로 후보를 찾음
+- 두 해시 거리와 가로세로 비율이 모두 가까워야 유사로 판단 (텍스트 페이지끼리의 오탐 방지)
+
+Usage:
+    python image_dedup.py scan <image_dir>          # 디렉토리 내/색인과의 중복 확인
+    python image_dedup.py import <webp_dir>         # 기존 gdrive_urls.json 업로드 이력 색인
+    python image_dedup.py stats
+"""
+
+import os
+import json
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+from PIL import Image
+
+from asset_registry import file_content_hash
+
+
+DEFAULT_DB_PATH = Path(__file__).parent.parent / "state" / "image_hashes.db"
+
+PHASH_THRESHOLD = 6
+DHASH_THRESHOLD = 10
+ASPECT_TOLERANCE = 0.05
+BANDS = 8
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS images (
+    id INTEGER PRIMARY KEY,
+    phash TEXT NOT NULL,
+    dhash TEXT NOT NULL,
+    width INTEGER,
+    height INTEGER,
+    file_name TEXT,
+    url TEXT UNIQUE NOT NULL,
+    host TEXT NOT NULL DEFAULT 'gdrive',
+    content_hash TEXT,
+    added_at TEXT NOT NULL,
+    b0 INTEGER, b1 INTEGER, b2 INTEGER, b3 INTEGER,
+    b4 INTEGER, b5 INTEGER, b6 INTEGER, b7 INTEGER
+);
+""" + "".join(f"CREATE INDEX IF NOT EXISTS idx_images_b{i} ON images (b{i});\n" for i in range(BANDS))
+
+
+def _dct_matrix(n: int) -> np.ndarray:
+    k = np.arange(n)[:, None]
+    x = np.arange(n)[None, :]
+    matrix = np.cos(np.pi * (2 * x + 1) * k / (2 * n)) * np.sqrt(2 / n)
+    matrix[0] /= np.sqrt(2)
+    return matrix
+
+
+_DCT32 = _dct_matrix(32)
+
+
+def _bits_to_int(bits: np.ndarray) -> int:
+    return int("".join("1" if b else "0" for b in bits.ravel()), 2)
+
+
+def phash(img: Image.Image) -> int:
+    """DCT 기반 perceptual hash (64bit)"""
+    pixels = np.asarray(img.convert("L").resize((32, 32), Image.Resampling.LANCZOS), dtype=np.float64)
+    low = (_DCT32 @ pixels @ _DCT32.T)[:8, :8]
+    median = np.median(low.ravel()[1:])
+    return _bits_to_int(low > median)
+
+
+def dhash(img: Image.Image) -> int:
+    """difference hash (64bit)"""
+    pixels = np.asarray(img.convert("L").resize((9, 8), Image.Resampling.LANCZOS), dtype=np.int16)
+    return _bits_to_int(pixels[:, 1:] > pixels[:, :-1])
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def image_hashes(path: str) -> Dict:
+    """
+    이미지 파일의 pHash/dHash, 크기, 파일 내용 hash
+
+    Returns:
+        {"phash": int, "dhash": int, "width", "height", "content_hash"}
+    """
+    with Image.open(path) as img:
+        width, height = img.size
+        img.draft("L", (128, 128))  # JPEG는 축소 디코딩
+        return {
+            "phash": phash(img), "dhash": dhash(img), "width": width, "height": height,
+            "content_hash": file_content_hash(path)
+        }
+
+
+def _bands(value: int) -> List[int]:
+    return [(value >> (8 * i)) & 0xFF for i in range(BANDS)]
+
+
+def is_exact_duplicate(a: Dict, b: Dict) -> bool:
+    """두 image_hashes() 결과의 파일 내용이 같은지 (URL 자동 재사용 기준)"""
+    return bool(a.get("content_hash")) and a.get("content_hash") == b.get("content_hash")
+
+
+def is_near_duplicate(a: Dict, b: Dict) -> bool:
+    """두 image_hashes() 결과가 같은 이미지로 볼 만큼 가까운지 (사용자 확인용 후보)"""
+    if hamming(a["phash"], b["phash"]) > PHASH_THRESHOLD:
+        return False
+    if hamming(a["dhash"], b["dhash"]) > DHASH_THRESHOLD:
+        return False
+    if a.get("width") and b.get("width"):
+        ratio_a = a["width"] / a["height"]
+        ratio_b = b["width"] / b["height"]
+        if abs(ratio_a - ratio_b) > ASPECT_TOLERANCE * max(ratio_a, ratio_b):
+            return False
+    return True
+
+
+def find_duplicates_in(hashes: Dict[str, Dict]) -> Dict[str, Dict]:
+    """
+    같은 배치 안의 중복/유사 이미지 (이름순으로 먼저 나온 이미지를 대표로)
+
+    Args:
+        hashes: {파일명: image_hashes()}
+
+    Returns:
+        {중복 파일명: {"of": 대표 파일명, "exact": 파일 내용까지 같은지}}
+        exact가 아닌 항목은 다른 Figure일 수 있으므로 자동 재사용하지 않는다
+    """
+    duplicates = {}
+    names = sorted(hashes)
+    for i, name in enumerate(names):
+        if name in duplicates:
+            continue
+        for other in names[i + 1:]:
+            if other in duplicates and duplicates[other]["exact"]:
+                continue
+            if is_exact_duplicate(hashes[name], hashes[other]):
+                duplicates[other] = {"of": name, "exact": True}
+            elif other not in duplicates and is_near_duplicate(hashes[name], hashes[other]):
+                duplicates[other] = {"of": name, "exact": False}
+    return duplicates
+
+
+class PerceptualIndex:
+    """업로드된 이미지의 perceptual hash 색인"""
+
+    def __init__(self, db_path: str = None):
+        self.db_path = Path(db_path or os.environ.get("IMAGE_HASH_DB") or DEFAULT_DB_PATH)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+        columns = {row["name"] for row in self.conn.execute("PRAGMA table_info(images)")}
+        if "host" not in columns:  # image_hosts 도입 이전 색인
+            self.conn.execute("ALTER TABLE images ADD COLUMN host TEXT NOT NULL DEFAULT 'gdrive'")
+        if "content_hash" not in columns:  # 완전 중복 판정 도입 이전 색인 (유사 후보로만 조회됨)
+            self.conn.execute("ALTER TABLE images ADD COLUMN content_hash TEXT")
+
+    def close(self):
+        self.conn.close()
+
+    def find(self, hashes: Dict, host: str = None) -> Optional[Dict]:
+        """
+        가장 가까운 중복 이미지 (완전 중복 우선, 없으면 가장 가까운 유사 이미지)
+
+        Args:
+            host: 지정하면 해당 이미지 호스트에 업로드된 이미지만
+
+        Returns:
+            {"url", "file_name", "distance", "exact"} 또는 None
+        """
+        bands = _bands(hashes["phash"])
+        where = "(" + " OR ".join(f"b{i} = ?" for i in range(BANDS)) + ")"
+        params = list(bands)
+        if host:
+            where += " AND host = ?"
+            params.append(host)
+        rows = self.conn.execute(f"SELECT * FROM images WHERE {where}", params).fetchall()
+
+        best = None
+        for row in rows:
+            candidate = {
+                "phash": int(row["phash"], 16), "dhash": int(row["dhash"], 16),
+                "width": row["width"], "height": row["height"], "content_hash": row["content_hash"]
+            }
+            exact = is_exact_duplicate(hashes, candidate)
+            if not exact and not is_near_duplicate(hashes, candidate):
+                continue
+            distance = hamming(hashes["phash"], candidate["phash"])
+            if best is None or (exact, -distance) > (best["exact"], -best["distance"]):
+                best = {"url": row["url"], "file_name": row["file_name"], "distance": distance, "exact": exact}
+        return best
+
+    def add(self, hashes: Dict, url: str, file_name: str = None, host: str = "gdrive"):
+        """업로드된 이미지 등록 (같은 URL은 갱신)"""
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO images (phash, dhash, width, height, file_name, url, host, content_hash, added_at, "
+                + ", ".join(f"b{i}" for i in range(BANDS)) + ") VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, "
+                + ", ".join("?" * BANDS) + ") "
+                "ON CONFLICT (url) DO UPDATE SET phash = excluded.phash, dhash = excluded.dhash, "
+                "content_hash = excluded.content_hash, "
+                + ", ".join(f"b{i} = excluded.b{i}" for i in range(BANDS)),
+                (
+                    f"{hashes['phash']:016x}", f"{hashes['dhash']:016x}",
+                    hashes.get("width"), hashes.get("height"), file_name, url, host, hashes.get("content_hash"),
+                    datetime.now().isoformat(timespec="seconds"), *_bands(hashes["phash"])
+                )
+            )
+
+    def import_url_mapping(self, webp_dir: str) -> int:
+        """
+        기존 업로드 이력(webp_dir/gdrive_urls.json + webp 파일) 색인
+
+        Returns:
+            등록한 이미지 수
+        """
+        mapping_path = Path(webp_dir) / "gdrive_urls.json"
+        if not mapping_path.exists():
+            return 0
+        with open(mapping_path, "r", encoding="utf-8") as f:
+            mapping = json.load(f)
+
+        added = 0
+        for name, url in mapping.items():
+            path = Path(webp_dir) / name
+            if path.suffix.lower() != ".webp" or not path.exists():
+                continue
+            self.add(image_hashes(str(path)), url, name)
+            added += 1
+        return added
+
+    def stats(self) -> Dict:
+        return {"images": self.conn.execute("SELECT COUNT(*) FROM images").fetchone()[0]}
+
+
+if __name__ == "__main__":
+    import sys
+    from image_processor import list_source_images
+
+    if len(sys.argv) < 2 or sys.argv[1] not in ("scan", "import", "stats"):
+        print("Usage: python image_dedup.py scan <image_dir>")
+        print("       python image_dedup.py import <webp_dir>")
+        print("       python image_dedup.py stats")
+        sys.exit(1)
+
+    index = PerceptualIndex()
+
+    if sys.argv[1] == "stats":
+        print(f"images: {index.stats()['images']}")
+        sys.exit(0)
+
+    if sys.argv[1] == "import":
+        added = index.import_url_mapping(sys.argv[2])
+        print(f"Indexed {added} uploaded images from {sys.argv[2]}")
+        sys.exit(0)
+
+    files = list_source_images(sys.argv[2]) + sorted(Path(sys.argv[2]).glob("*.webp"))
+    hashes = {f.name: image_hashes(str(f)) for f in files}
+
+    for duplicate, match in find_duplicates_in(hashes).items():
+        if match["exact"]:
+            print(f"  [DUP] {duplicate} = {match['of']}")
+        else:
+            print(f"  [NEAR] {duplicate} ~ {match['of']} (확인 필요)")
+    for name, value in hashes.items():
+        match = index.find(value)
+        if match:
+            label = "UPLOADED" if match["exact"] else "NEAR UPLOADED"
+            print(f"  [{label}] {name} ~ {match['file_name']} (distance {match['distance']}) -> {match['url']}")
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Image Hosts
+블로그 이미지 호스팅 백엔드 (설정으로 선택)
+
+- gdrive: Google Drive 업로드 + lh3.googleusercontent.com 직접 링크 (기존 방식)
+    해상도 정보가 없고 cross-origin 임베딩, 트래픽 제한 있음
+- wordpress: WordPress 미디어 라이브러리 (/wp-json/wp/v2/media)
+    블로그와 같은 origin, 원본 width/height와 WordPress가 생성한 sizes(thumbnail, medium, large ...) 반환
+    업로드는 공용 HTTP 클라이언트(http_client.py)로 연결 재사용, 타임아웃/재시도
+
+호스트 선택: get_image_host(name) > IMAGE_HOST 환경변수 > gdrive
+
+업로드 결과는 이미지 디렉토리에 저장:
+    {host}_urls.json   {파일명: URL} (gdrive는 기존 gdrive_urls.json 그대로)
+    {host}_media.json  {파일명: {"url", "width", "height", "sizes"}}
+
+Usage:
+    python image_hosts.py <image_dir> [--host gdrive|wordpress] [--pattern '*.webp']
+"""
+
+import os
+import json
+import base64
+import mimetypes
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, Callable, Set
+
+from PIL import Image
+
+from asset_registry import AssetRegistry, file_content_hash
+from http_client import get_http_client
+
+# .env 파일 로드
+try:
+    from dotenv import load_dotenv
+    env_path = Path(__file__).parent.parent / '.env'
+    load_dotenv(env_path)
+except ImportError:
+    pass
+
+
+DEFAULT_IMAGE_HOST = "gdrive"
+
+mimetypes.add_type("image/webp", ".webp")
+
+
+def _local_size(file_path: str):
+    try:
+        with Image.open(file_path) as img:
+            return img.size
+    except OSError:
+        return None, None
+
+
+class ImageHost(ABC):
+    """
+    이미지 호스트 인터페이스
+
+    upload()는 다음 형식을 반환한다:
+        {"file_id", "file_name", "url", "width", "height", "sizes": {이름: {"url", "width", "height"}}}
+    """
+
+    name = ""
+
+    @property
+    def mapping_file(self) -> str:
+        return f"{self.name}_urls.json"
+
+    @property
+    def media_file(self) -> str:
+        return f"{self.name}_media.json"
+
+    @abstractmethod
+    def upload(self, file_path: str) -> Dict:
+        """파일 하나를 업로드하고 위 형식의 결과 반환"""
+
+
+class GDriveHost(ImageHost):
+    """Google Drive (GDriveUploader, 첫 업로드 시 토큰 갱신)"""
+
+    name = "gdrive"
+
+    def __init__(self, folder_id: str = None):
+        self.folder_id = folder_id
+        self._uploader = None
+
+    def upload(self, file_path: str) -> Dict:
+        from gdrive_uploader import GDriveUploader
+
+        if self._uploader is None:
+            self._uploader = GDriveUploader(folder_id=self.folder_id)
+        result = self._uploader.upload_file(file_path)
+
+        # Drive는 해상도를 돌려주지 않으므로 로컬 파일에서 읽음
+        width, height = _local_size(file_path)
+        return {
+            **result,
+            "url": result["direct_link"],
+            "width": width,
+            "height": height,
+            "sizes": {}
+        }
+
+
+class WordPressMediaHost(ImageHost):
+    """WordPress 미디어 라이브러리 (/wp-json/wp/v2/media)"""
+
+    name = "wordpress"
+
+    def __init__(
+        self,
+        site_url: str = None,
+        username: str = None,
+        app_password: str = None
+    ):
+        self.site_url = (site_url or os.environ.get("WORDPRESS_URL") or "").rstrip('/')
+        self.username = username or os.environ.get("WORDPRESS_USERNAME")
+        self.app_password = app_password or os.environ.get("WORDPRESS_APP_PASSWORD")
+
+        if not all([self.site_url, self.username, self.app_password]):
+            raise ValueError("WordPress credentials required")
+
+        self.media_url = f"{self.site_url}/wp-json/wp/v2/media"
+
+        credentials = base64.b64encode(f"{self.username}:{self.app_password}".encode()).decode()
+        self.auth_header = f"Basic {credentials}"
+
+        # 연결 재사용 (이미지마다 TLS 핸드셰이크 반복 방지) + 타임아웃/재시도
+        self.http = get_http_client()
+
+    def upload(self, file_path: str, alt_text: str = None) -> Dict:
+        """
+        파일을 미디어 라이브러리에 업로드
+
+        Returns:
+            {"file_id", "file_name", "url", "width", "height", "sizes"}
+        """
+        file_name = Path(file_path).name
+        mime_type = mimetypes.guess_type(file_name)[0] or "application/octet-stream"
+
+        # bytes로 전송 (재시도 시 본문을 다시 보낼 수 있도록)
+        with open(file_path, "rb") as f:
+            content = f.read()
+        response = self.http.post(
+            self.media_url,
+            headers={
+                "Authorization": self.auth_header,
+                "Content-Type": mime_type,
+                "Content-Disposition": f'attachment; filename="{file_name}"'
+            },
+            data=content
+        )
+        response.raise_for_status()
+        media = response.json()
+
+        if alt_text:
+            self.http.post(
+                f"{self.media_url}/{media['id']}",
+                headers={"Authorization": self.auth_header},
+                json={"alt_text": alt_text},
+                idempotent=True
+            )
+
+        details = media.get("media_details") or {}
+        sizes = {
+            name: {"url": size["source_url"], "width": size.get("width"), "height": size.get("height")}
+            for name, size in (details.get("sizes") or {}).items()
+            if size.get("source_url")
+        }
+        width, height = details.get("width"), details.get("height")
+        if not width:
+            width, height = _local_size(file_path)
+
+        return {
+            "file_id": str(media["id"]),
+            "file_name": file_name,
+            "url": media["source_url"],
+            "width": width,
+            "height": height,
+            "sizes": sizes
+        }
+
+
+IMAGE_HOSTS = {
+    GDriveHost.name: GDriveHost,
+    WordPressMediaHost.name: WordPressMediaHost,
+}
+
+
+def get_image_host(name: str = None) -> ImageHost:
+    """
+    이름으로 이미지 호스트 생성 (None이면 IMAGE_HOST 환경변수, 기본 gdrive)
+    """
+    name = name or os.environ.get("IMAGE_HOST") or DEFAULT_IMAGE_HOST
+    if name not in IMAGE_HOSTS:
+        raise ValueError(f"Unknown image host: {name} (available: {', '.join(IMAGE_HOSTS)})")
+    return IMAGE_HOSTS[name]()
+
+
+def load_media_manifest(image_dir: str, host_name: str = None) -> Dict[str, Dict]:
+    """업로드된 이미지의 {파일명: {"url", "width", "height", "sizes"}} (없으면 빈 dict)"""
+    path = Path(image_dir) / f"{host_name or os.environ.get('IMAGE_HOST') or DEFAULT_IMAGE_HOST}_media.json"
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def upload_images(
+    image_dir: str,
+    host: ImageHost = None,
+    pattern: str = "*.webp",
+    uploaded: Dict[str, str] = None,
+    on_uploaded: Callable[[Path, Dict], None] = None,
+    skip: Set[str] = None,
+    registry: AssetRegistry = None
+) -> Dict[str, str]:
+    """
+    이미지 디렉토리를 호스트에 업로드하고 URL 매핑 반환
+
+    Args:
+        image_dir: 이미지 디렉토리
+        host: ImageHost (None이면 get_image_host())
+        pattern: 파일 패턴
+        uploaded: 이미 업로드된 {파일명: URL} (체크포인트, 재업로드 스킵)
+        on_uploaded: 파일 하나 업로드 완료 시 호출 (file_path, result)
+        skip: 업로드하지 않을 파일명 (중복 이미지 - 호출한 쪽에서 URL 매핑)
+        registry: 지정하면 같은 바이트의 파일이 같은 호스트에 (다른 글에서라도) 업로드됐을 때 URL 재사용,
+            새로 업로드한 파일은 등록
+
+    Returns:
+        {원본파일명: URL} 매핑
+    """
+    host = host or get_image_host()
+    uploaded = uploaded or {}
+    image_path = Path(image_dir)
+    files = sorted(f for f in image_path.glob(pattern) if f.name not in (skip or ()))
+    media = load_media_manifest(image_dir, host.name)
+
+    print(f"Found {len(files)} files to upload ({host.name})")
+
+    url_mapping = {}
+    for file_path in files:
+        if file_path.name in uploaded:
+            url = uploaded[file_path.name]
+            print(f"  {file_path.name} -> {url} (already uploaded)")
+        else:
+            content_hash = file_content_hash(str(file_path)) if registry else None
+            record = registry.lookup(content_hash, host.name) if registry else None
+            if record and record["url"]:
+                url = record["url"]
+                print(f"  {file_path.name} -> {url} (registry: {record['file_name']})")
+            else:
+                result = host.upload(str(file_path))
+                url = result["url"]
+                print(f"  {file_path.name} -> {url}")
+                if registry:
+                    registry.register_upload(str(file_path), url, host.name, content_hash)
+                if on_uploaded:
+                    on_uploaded(file_path, result)
+                record = result
+            media[file_path.name] = {
+                "url": url,
+                "width": record.get("width"),
+                "height": record.get("height"),
+                "sizes": record.get("sizes") or media.get(file_path.name, {}).get("sizes", {})
+            }
+
+        if file_path.name not in media:
+            width, height = _local_size(str(file_path))
+            media[file_path.name] = {"url": url, "width": width, "height": height, "sizes": {}}
+
+        # 원본 PNG 이름으로 매핑 (확장자만 다름)
+        original_name = file_path.stem + ".png"
+        url_mapping[original_name] = url
+        url_mapping[file_path.name] = url
+
+    # 매핑 저장
+    mapping_path = image_path / host.mapping_file
+    with open(mapping_path, "w", encoding="utf-8") as f:
+        json.dump(url_mapping, f, indent=2, ensure_ascii=False)
+    with open(image_path / host.media_file, "w", encoding="utf-8") as f:
+        json.dump(media, f, indent=2, ensure_ascii=False)
+
+    print(f"\nURL mapping saved to: {mapping_path}")
+    return url_mapping
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Upload images to the configured image host")
+    parser.add_argument("image_dir", help="Image directory (e.g. output/images/selected/webp)")
+    parser.add_argument("--host", choices=sorted(IMAGE_HOSTS), help="Image host (default: IMAGE_HOST or gdrive)")
+    parser.add_argument("--pattern", default="*.webp", help="File pattern (default: *.webp)")
+    args = parser.parse_args()
+
+    registry = AssetRegistry()
+    url_mapping = upload_images(args.image_dir, get_image_host(args.host), args.pattern, registry=registry)
+    registry.close()
+    print(f"\nUploaded {len(url_mapping) // 2} files")
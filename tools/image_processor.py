@@ -2,18 +2,96 @@
 """
 Image Processor
 PNG 이미지를 WebP로 변환하고 최적화
+
+변환 시 같은 디코딩 결과로 LQIP(low-quality image placeholder)도 생성
+- 약 20px 너비로 축소 + blur한 WebP를 base64 data URI로 (수백 byte)
+- 평균 색상 (#rrggbb)
+- 출력 디렉토리의 placeholders.json에 저장, 발행 시 <img> 배경으로 인라인
 """
 
+import io
 import os
+import json
+import base64
 from pathlib import Path
 from typing import List, Dict
-from PIL import Image
+from PIL import Image, ImageFilter
+
+from asset_registry import AssetRegistry, file_content_hash, webp_variant
+
+
+# 변환 대상 원본 (PNG 크롭 + PDF에서 그대로 추출한 JPEG)
+SOURCE_IMAGE_PATTERNS = ("*.png", "*.jpeg", "*.jpg")
+
+
+def list_source_images(input_dir: str) -> List[Path]:
+    """WebP 변환 대상 원본 이미지 목록 (이름순)"""
+    files = set()
+    for pattern in SOURCE_IMAGE_PATTERNS:
+        files.update(Path(input_dir).glob(pattern))
+    return sorted(files)
+
+
+LQIP_WIDTH = 20
+LQIP_QUALITY = 40
+PLACEHOLDERS_FILE = "placeholders.json"
+
+
+def make_placeholder(img: Image.Image, width: int = LQIP_WIDTH) -> Dict:
+    """
+    이미 디코딩된 이미지로 LQIP 생성
+
+    Returns:
+        {"lqip": "data:image/webp;base64,...", "color": "#rrggbb"}
+    """
+    if img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info):
+        rgba = img.convert("RGBA")
+        img = Image.new("RGB", rgba.size, (255, 255, 255))
+        img.paste(rgba, mask=rgba.getchannel("A"))
+    else:
+        img = img.convert("RGB")
+
+    height = max(1, round(img.height * width / img.width))
+    small = img.resize((width, height), Image.Resampling.BOX, reducing_gap=3.0)
+    red, green, blue = small.resize((1, 1), Image.Resampling.BOX).getpixel((0, 0))
+
+    buffer = io.BytesIO()
+    small.filter(ImageFilter.GaussianBlur(1)).save(buffer, "WEBP", quality=LQIP_QUALITY)
+    return {
+        "lqip": "data:image/webp;base64," + base64.b64encode(buffer.getvalue()).decode("ascii"),
+        "color": f"#{red:02x}{green:02x}{blue:02x}"
+    }
+
+
+def placeholder_for_file(path: str) -> Dict:
+    """변환 없이 placeholder만 필요할 때 (JPEG는 축소 디코딩)"""
+    with Image.open(path) as img:
+        img.draft("RGB", (LQIP_WIDTH * 8, LQIP_WIDTH * 8))
+        return make_placeholder(img)
+
+
+def load_placeholders(webp_dir: str) -> Dict[str, Dict]:
+    """webp_dir/placeholders.json ({webp 파일명: placeholder}, 없으면 빈 dict)"""
+    path = Path(webp_dir) / PLACEHOLDERS_FILE
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_placeholders(webp_dir: str, placeholders: Dict[str, Dict]):
+    """기존 placeholders.json에 병합 저장"""
+    merged = {**load_placeholders(webp_dir), **placeholders}
+    with open(Path(webp_dir) / PLACEHOLDERS_FILE, "w", encoding="utf-8") as f:
+        json.dump(merged, f, indent=2, ensure_ascii=False)
 
 
 def convert_png_to_webp(
     input_path: str,
     output_path: str = None,
-    quality: int = 85
+    quality: int = 85,
+    registry: AssetRegistry = None,
+    placeholder: bool = True
 ) -> Dict:
     """
     PNG 이미지를 WebP로 변환
@@ -22,6 +100,8 @@ def convert_png_to_webp(
         input_path: 입력 PNG 파일 경로
         output_path: 출력 WebP 파일 경로 (None이면 자동 생성)
         quality: WebP 품질 (0-100, 기본 85)
+        registry: 지정하면 (원본 hash, webp-q{quality}) -> 변환본 hash/크기 기록
+        placeholder: True면 같은 디코딩 결과로 LQIP 생성 (result["placeholder"])
 
     Returns:
         변환 결과 정보
@@ -38,7 +118,7 @@ def convert_png_to_webp(
     new_size = os.path.getsize(output_path)
     reduction = (1 - new_size / original_size) * 100
 
-    return {
+    result = {
         "input": input_path,
         "output": output_path,
         "original_size_kb": round(original_size / 1024, 1),
@@ -48,11 +128,26 @@ def convert_png_to_webp(
         "height": img.height
     }
 
+    if placeholder:
+        result["placeholder"] = make_placeholder(img)
+
+    if registry is not None:
+        result["content_hash"] = file_content_hash(input_path)
+        result["output_hash"] = file_content_hash(output_path)
+        registry.register(
+            result["content_hash"], webp_variant(quality),
+            output_hash=result["output_hash"], file_name=Path(output_path).name,
+            size_bytes=new_size, width=img.width, height=img.height
+        )
+
+    return result
+
 
 def batch_convert_to_webp(
     input_dir: str,
     output_dir: str = None,
-    quality: int = 85
+    quality: int = 85,
+    registry: AssetRegistry = None
 ) -> List[Dict]:
     """
     디렉토리의 모든 PNG를 WebP로 일괄 변환
@@ -61,6 +156,7 @@ def batch_convert_to_webp(
         input_dir: 입력 디렉토리
         output_dir: 출력 디렉토리 (None이면 input_dir/webp)
         quality: WebP 품질
+        registry: 변환 기록을 남길 AssetRegistry
 
     Returns:
         변환 결과 목록
@@ -75,16 +171,20 @@ def batch_convert_to_webp(
     output_path.mkdir(parents=True, exist_ok=True)
 
     results = []
-    png_files = list(input_path.glob("*.png"))
+    placeholders = {}
+    png_files = list_source_images(input_path)
 
-    print(f"Converting {len(png_files)} PNG files to WebP...")
+    print(f"Converting {len(png_files)} images to WebP...")
 
     for png_file in png_files:
         webp_file = output_path / f"{png_file.stem}.webp"
-        result = convert_png_to_webp(str(png_file), str(webp_file), quality)
+        result = convert_png_to_webp(str(png_file), str(webp_file), quality, registry)
         results.append(result)
+        placeholders[webp_file.name] = result["placeholder"]
         print(f"  {png_file.name} -> {webp_file.name} ({result['reduction_percent']}% smaller)")
 
+    save_placeholders(str(output_path), placeholders)
+
     total_original = sum(r['original_size_kb'] for r in results)
     total_new = sum(r['new_size_kb'] for r in results)
 
@@ -105,5 +205,7 @@ if __name__ == "__main__":
     output_dir = sys.argv[2] if len(sys.argv) > 2 else None
     quality = int(sys.argv[3]) if len(sys.argv) > 3 else 85
 
-    results = batch_convert_to_webp(input_dir, output_dir, quality)
+    registry = AssetRegistry()
+    results = batch_convert_to_webp(input_dir, output_dir, quality, registry)
+    registry.close()
     print(f"\nConverted {len(results)} images")
@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""
+Blog Preview Server
+WordPress draft 발행 없이 output/*.md를 로컬에서 HTML로 미리보기
+
+- 발행과 같은 변환 사용: replace_image_urls → md_to_html → add_image_attributes
+- 이미지는 원격 URL 대신 로컬 파일(/files/...)로 치환 (output/images 아래에서 파일명으로 탐색)
+- 파일 감시(mtime polling, 기본 50ms): 바뀐 글만 다시 렌더링 (수~수십 ms), 열려 있는 페이지는 자동 새로고침
+  이미지 디렉토리는 약 1초마다 확인
+- 렌더링 결과는 글별로 캐시 (요청 시 재빌드 없음)
+
+Usage:
+    python preview_server.py [output_dir] [--port 8000] [--interval 0.05]
+    -> http://127.0.0.1:8000/
+"""
+
+import re
+import sys
+import json
+import html
+import time
+import threading
+import mimetypes
+from pathlib import Path
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, List, Optional
+from urllib.parse import quote, unquote, urlsplit
+
+from PIL import Image
+
+# 현재 디렉토리를 path에 추가
+sys.path.insert(0, str(Path(__file__).parent))
+
+from wordpress_publisher import md_to_html, replace_image_urls, add_image_attributes, LOCAL_IMAGE_PATTERN
+from image_processor import load_placeholders
+
+
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".webp"}
+
+# 같은 파일명이 여러 곳에 있으면 앞의 디렉토리 우선
+IMAGE_DIR_PRIORITY = ["images/selected", "images/selected/webp", "images", "images/pages"]
+
+mimetypes.add_type("image/webp", ".webp")
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="ko">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{title} - preview</title>
+<style>
+body {{ max-width: 760px; margin: 2rem auto; padding: 0 1rem; font: 17px/1.75 -apple-system, "Noto Sans KR", sans-serif; color: #222; }}
+img {{ max-width: 100%; height: auto; }}
+table {{ border-collapse: collapse; }} td, th {{ border: 1px solid #ccc; padding: .3rem .6rem; }}
+blockquote {{ border-left: 4px solid #ddd; margin-left: 0; padding-left: 1rem; color: #555; }}
+.preview-bar {{ font-size: 13px; color: #888; border-bottom: 1px solid #eee; margin-bottom: 1.5rem; }}
+</style>
+</head>
+<body>
+<div class="preview-bar"><a href="/">posts</a> · {name} · built in {build_ms:.1f}ms{missing}</div>
+<h1>{title}</h1>
+{content}
+<script>
+(function() {{
+  var version = {version};
+  setInterval(function() {{
+    fetch("/version/{quoted_name}").then(function(r) {{ return r.json(); }}).then(function(d) {{
+      if (d.version !== version) location.reload();
+    }}).catch(function() {{}});
+  }}, 500);
+}})();
+</script>
+</body>
+</html>
+"""
+
+
+def build_image_mapping(output_dir: Path) -> Dict[str, str]:
+    """
+    output_dir 아래 이미지 파일명 -> 미리보기 URL(/files/...) 매핑
+
+    Returns:
+        {파일명: "/files/images/selected/fig_1.png", ...}
+    """
+    mapping: Dict[str, str] = {}
+    images_dir = output_dir / "images"
+    if not images_dir.is_dir():
+        return mapping
+
+    def priority(path: Path) -> int:
+        parent = path.parent.relative_to(output_dir).as_posix()
+        return IMAGE_DIR_PRIORITY.index(parent) if parent in IMAGE_DIR_PRIORITY else len(IMAGE_DIR_PRIORITY)
+
+    files = [p for p in images_dir.rglob("*") if p.suffix.lower() in IMAGE_EXTENSIONS]
+    for path in sorted(files, key=priority, reverse=True):
+        mapping[path.name] = "/files/" + quote(path.relative_to(output_dir).as_posix())
+    return mapping
+
+
+def _image_dirs_signature(output_dir: Path) -> tuple:
+    """이미지 디렉토리 mtime (파일 추가/삭제 감지용)"""
+    images_dir = output_dir / "images"
+    if not images_dir.is_dir():
+        return ()
+    dirs = [images_dir] + [p for p in images_dir.rglob("*") if p.is_dir()]
+    return tuple(sorted((str(d), d.stat().st_mtime_ns) for d in dirs))
+
+
+class PreviewBuilder:
+    """Markdown 글 렌더링 + 글별 캐시"""
+
+    def __init__(self, output_dir: str):
+        self.output_dir = Path(output_dir).resolve()
+        self.lock = threading.Lock()
+        self.cache: Dict[str, Dict] = {}
+        self.image_signature = None
+        self.image_mapping: Dict[str, str] = {}
+        self.placeholders: Dict[str, Dict] = {}
+        self.image_sizes: Dict[str, tuple] = {}
+
+    def posts(self) -> List[Path]:
+        return sorted(self.output_dir.glob("*.md"))
+
+    def _refresh_images(self) -> bool:
+        """이미지 디렉토리가 바뀌었으면 매핑 갱신 (바뀌었으면 True)"""
+        signature = _image_dirs_signature(self.output_dir)
+        if signature == self.image_signature:
+            return False
+        self.image_signature = signature
+        self.image_mapping = build_image_mapping(self.output_dir)
+        self.image_sizes = {}
+        self.placeholders = load_placeholders(str(self.output_dir / "images" / "selected" / "webp"))
+        return True
+
+    def _image_size(self, name: str) -> tuple:
+        if name not in self.image_sizes:
+            path = self.output_dir / unquote(self.image_mapping[name][len("/files/"):])
+            try:
+                with Image.open(path) as img:  # 헤더만 읽음
+                    self.image_sizes[name] = img.size
+            except OSError:
+                self.image_sizes[name] = (None, None)
+        return self.image_sizes[name]
+
+    def build(self, md_path: Path) -> Dict:
+        """글 하나 렌더링 (캐시 갱신)"""
+        start = time.perf_counter()
+        with open(md_path, "r", encoding="utf-8") as f:
+            md_content = f.read()
+
+        metadata = {}
+        if md_content.startswith("---"):
+            import yaml
+            parts = md_content.split("---", 2)
+            if len(parts) >= 3:
+                try:
+                    metadata = yaml.safe_load(parts[1]) or {}
+                except yaml.YAMLError:
+                    metadata = {}
+
+        # 글에서 참조하는 이미지만 치환 (페이지 렌더링이 많아도 재빌드 비용 일정)
+        stems = {Path(m.group(1) or m.group(2)).stem for m in LOCAL_IMAGE_PATTERN.finditer(md_content)}
+        mapping = {name: url for name, url in self.image_mapping.items() if Path(name).stem in stems}
+        md_content = replace_image_urls(md_content, mapping)
+
+        # 발행 시 {host}_media.json 대신 로컬 파일 크기로 width/height
+        media = {}
+        for name, url in mapping.items():
+            width, height = self._image_size(name)
+            media[name] = {"url": url, "width": width, "height": height}
+        content = add_image_attributes(md_to_html(md_content), media, self.placeholders)
+
+        # 로컬 파일로 치환되지 않은 이미지 (발행 시 누락될 이미지)
+        missing = sorted({
+            Path(urlsplit(src).path).name
+            for src in _img_sources(content)
+            if not src.startswith(("/files/", "http://", "https://", "data:"))
+        })
+
+        build_ms = (time.perf_counter() - start) * 1000
+        previous = self.cache.get(md_path.name, {})
+        entry = {
+            "mtime_ns": md_path.stat().st_mtime_ns,
+            "title": metadata.get("title") or md_path.stem,
+            "content": content,
+            "missing": missing,
+            "build_ms": build_ms,
+            "version": previous.get("version", 0) + 1
+        }
+        with self.lock:
+            self.cache[md_path.name] = entry
+        return entry
+
+    def get(self, name: str) -> Optional[Dict]:
+        """캐시된 렌더링 (없거나 파일이 바뀌었으면 빌드)"""
+        md_path = self.output_dir / name
+        if md_path.suffix != ".md" or md_path.parent != self.output_dir or not md_path.is_file():
+            return None
+        entry = self.cache.get(name)
+        if entry is None or entry["mtime_ns"] != md_path.stat().st_mtime_ns:
+            self._refresh_images()
+            entry = self.build(md_path)
+        return entry
+
+    def rebuild_changed(self, check_images: bool = True) -> List[Dict]:
+        """
+        열어본(캐시된) 글 중 변경된 글만 재빌드 (이미지 디렉토리가 바뀌면 캐시된 글 모두)
+
+        Args:
+            check_images: 이미지 디렉토리 변경도 확인 (디렉토리 순회라 매 주기마다 하지 않음)
+
+        Returns:
+            [{"name", "build_ms"}, ...]
+        """
+        images_changed = check_images and self._refresh_images()
+        rebuilt = []
+        for md_path in self.posts():
+            entry = self.cache.get(md_path.name)
+            if entry is None:
+                continue  # 아직 열어보지 않은 글은 요청 시 빌드
+            if images_changed or entry["mtime_ns"] != md_path.stat().st_mtime_ns:
+                built = self.build(md_path)
+                rebuilt.append({"name": md_path.name, "build_ms": built["build_ms"]})
+        for name in [n for n in self.cache if not (self.output_dir / n).exists()]:
+            with self.lock:
+                self.cache.pop(name, None)
+        return rebuilt
+
+    def render_page(self, name: str) -> Optional[str]:
+        entry = self.get(name)
+        if entry is None:
+            return None
+        missing = f" · <b>missing images: {html.escape(', '.join(entry['missing']))}</b>" if entry["missing"] else ""
+        return PAGE_TEMPLATE.format(
+            title=html.escape(str(entry["title"])),
+            name=html.escape(name),
+            quoted_name=quote(name),
+            build_ms=entry["build_ms"],
+            missing=missing,
+            content=entry["content"],
+            version=entry["version"]
+        )
+
+
+def _img_sources(content: str) -> List[str]:
+    return re.findall(r'<img\b[^>]*\ssrc="([^"]*)"', content)
+
+
+IMAGE_CHECK_INTERVAL = 1.0
+
+
+def watch(builder: PreviewBuilder, interval: float = 0.05, stop: threading.Event = None):
+    """interval마다 mtime을 확인하여 바뀐 글만 재빌드 (이미지 디렉토리는 IMAGE_CHECK_INTERVAL마다)"""
+    stop = stop or threading.Event()
+    last_image_check = time.monotonic()
+    while not stop.wait(interval):
+        check_images = time.monotonic() - last_image_check >= IMAGE_CHECK_INTERVAL
+        if check_images:
+            last_image_check = time.monotonic()
+        try:
+            for item in builder.rebuild_changed(check_images):
+                print(f"  [REBUILD] {item['name']} ({item['build_ms']:.1f}ms)")
+        except Exception as e:  # 작성 중인 파일 등 - 다음 주기에 다시 시도
+            print(f"  [FAIL] rebuild: {e}")
+
+
+def make_handler(builder: PreviewBuilder):
+    class PreviewHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status: int, body: bytes, content_type: str):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            path = unquote(urlsplit(self.path).path)
+
+            if path == "/":
+                items = "".join(
+                    f'<li><a href="/post/{quote(p.name)}">{html.escape(p.name)}</a></li>'
+                    for p in builder.posts()
+                )
+                body = f"<!DOCTYPE html><meta charset='utf-8'><title>posts</title><ul>{items}</ul>"
+                return self._send(200, body.encode("utf-8"), "text/html; charset=utf-8")
+
+            if path.startswith("/post/"):
+                page = builder.render_page(path[len("/post/"):])
+                if page is None:
+                    return self._send(404, b"not found", "text/plain")
+                return self._send(200, page.encode("utf-8"), "text/html; charset=utf-8")
+
+            if path.startswith("/version/"):
+                entry = builder.get(path[len("/version/"):])
+                body = json.dumps({"version": entry["version"] if entry else None}).encode()
+                return self._send(200, body, "application/json")
+
+            if path.startswith("/files/"):
+                file_path = (builder.output_dir / path[len("/files/"):]).resolve()
+                if builder.output_dir not in file_path.parents or not file_path.is_file():
+                    return self._send(404, b"not found", "text/plain")
+                content_type = mimetypes.guess_type(file_path.name)[0] or "application/octet-stream"
+                return self._send(200, file_path.read_bytes(), content_type)
+
+            self._send(404, b"not found", "text/plain")
+
+    return PreviewHandler
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Local preview server for blog Markdown")
+    parser.add_argument("output_dir", nargs="?", default="output", help="Directory with *.md posts (default: output)")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--interval", type=float, default=0.05, help="File watch interval in seconds")
+    args = parser.parse_args()
+
+    builder = PreviewBuilder(args.output_dir)
+    if not builder.output_dir.is_dir():
+        print(f"[FAIL] Not a directory: {builder.output_dir}")
+        sys.exit(1)
+
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), make_handler(builder))
+    stop = threading.Event()
+    threading.Thread(target=watch, args=(builder, args.interval, stop), daemon=True).start()
+
+    print(f"Previewing {len(builder.posts())} posts from {builder.output_dir}")
+    print(f"  http://127.0.0.1:{args.port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        stop.set()
+        server.shutdown()
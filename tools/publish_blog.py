@@ -4,28 +4,139 @@ Blog Publishing Pipeline
 블로그 글 발행 전체 파이프라인
 
 Usage:
-    python publish_blog.py <md_file> [--publish]
+    python publish_blog.py <md_file> [--publish] [--restart]
 
 Steps:
-    1. PNG → WebP 변환
-    2. Google Drive 업로드
+    1. PNG → WebP 변환 (state/assets.db에 같은 파일의 업로드 URL이 있으면 생략)
+    2. 이미지 업로드 (IMAGE_HOST 또는 --image-host: gdrive | wordpress)
     3. 콘텐츠 준비 (URL 치환, HTML 변환)
     4. WordPress 발행 (기본: draft)
+
+각 단계와 파일 단위 진행 상황은 <md>_publish_state.json에 체크포인트로 저장되며,
+재실행 시 완료되지 않은 첫 단위부터 이어서 실행한다.
 """
 
 import os
 import sys
 import json
+import uuid
 import argparse
+from datetime import datetime
 from pathlib import Path
-from typing import Dict
+from typing import Dict, List
 
 # 현재 디렉토리를 path에 추가
 sys.path.insert(0, str(Path(__file__).parent))
 
-from image_processor import batch_convert_to_webp
-from gdrive_uploader import upload_images_to_gdrive
+from image_processor import (
+    convert_png_to_webp, list_source_images, placeholder_for_file, load_placeholders, save_placeholders
+)
+from image_hosts import get_image_host, upload_images, load_media_manifest, IMAGE_HOSTS, DEFAULT_IMAGE_HOST
+from image_dedup import PerceptualIndex, image_hashes, find_duplicates_in
+from asset_registry import AssetRegistry, file_content_hash, webp_variant
 from wordpress_publisher import publish_blog_post, WordPressPublisher
+from http_client import get_http_client
+
+
+PIPELINE_STEPS = [
+    "image_conversion",
+    "gdrive_upload",
+    "config_generation",
+    "wordpress_publish"
+]
+
+
+def file_fingerprint(path: Path) -> str:
+    """
+    파일 변경 감지용 지문 (크기 + 수정 시각)
+    """
+    stat = Path(path).stat()
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
+
+def load_pipeline_state(state_file: Path, md_file: str) -> Dict:
+    """
+    파이프라인 체크포인트 로드 (없으면 새로 생성)
+
+    state/session_template.yaml의 agent_states처럼
+    단계별 status(pending, running, completed, failed)를 기록한다.
+    """
+    if state_file.exists():
+        with open(state_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    return {
+        "source_file": md_file,
+        "started_at": _now(),
+        "status": "initialized",
+        "step_states": {
+            step: {
+                "status": "pending",
+                "started_at": None,
+                "completed_at": None,
+                "files": {}
+            }
+            for step in PIPELINE_STEPS
+        },
+        "errors": []
+    }
+
+
+def save_pipeline_state(state: Dict, state_file: Path):
+    """
+    체크포인트 저장 (임시 파일에 쓴 뒤 교체하여 중간 종료에도 손상되지 않음)
+    """
+    tmp_file = state_file.with_suffix(state_file.suffix + ".tmp")
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_file, state_file)
+
+
+def _start_step(state: Dict, step: str, state_file: Path) -> Dict:
+    step_state = state["step_states"][step]
+    step_state["status"] = "running"
+    step_state["started_at"] = _now()
+    step_state["completed_at"] = None
+    state["status"] = "in_progress"
+    save_pipeline_state(state, state_file)
+    return step_state
+
+
+def _finish_step(state: Dict, step: str, state_file: Path, status: str = "completed"):
+    step_state = state["step_states"][step]
+    step_state["status"] = status
+    step_state["completed_at"] = _now()
+    save_pipeline_state(state, state_file)
+
+
+def load_previous_publish(result_file: Path, step_state: Dict) -> Dict:
+    """
+    이전 발행 정보 로드 (post_id, post_url, field_hashes)
+
+    _publish_result.json을 우선 사용하고, 없으면 체크포인트에서 가져온다.
+    """
+    if result_file.exists():
+        with open(result_file, 'r', encoding='utf-8') as f:
+            previous = json.load(f)
+        if previous.get("post_id"):
+            return {
+                "post_id": previous["post_id"],
+                "post_url": previous.get("post_url"),
+                "field_hashes": previous.get("field_hashes", {})
+            }
+
+    if step_state.get("post_id"):
+        return {
+            "post_id": step_state["post_id"],
+            "post_url": step_state.get("post_url"),
+            "field_hashes": step_state.get("field_hashes", {})
+        }
+
+    return {}
 
 
 def extract_focus_keyword(md_content: str, metadata: Dict) -> str:
@@ -73,7 +184,10 @@ def run_publish_pipeline(
     md_file: str,
     image_dir: str = None,
     publish: bool = False,
-    skip_upload: bool = False
+    skip_upload: bool = False,
+    restart: bool = False,
+    image_host: str = None,
+    reuse_near: List[str] = None
 ) -> Dict:
     """
     발행 파이프라인 실행
@@ -83,6 +197,10 @@ def run_publish_pipeline(
         image_dir: 이미지 디렉토리 (기본: output/images/selected)
         publish: True면 바로 publish, False면 draft
         skip_upload: True면 이미지 업로드 스킵 (이미 업로드된 경우)
+        restart: True면 기존 체크포인트를 무시하고 처음부터 실행
+        image_host: 이미지 호스트 이름 (None이면 IMAGE_HOST 환경변수, 기본 gdrive)
+        reuse_near: 같은 Figure로 확인한 유사 이미지 이름 ([CHECK] 보고 대상).
+            기존 URL을 재사용하며, 승인 쌍(이미지 -> 원본)은 체크포인트에 남아 재실행 시에도 유지
 
     Returns:
         발행 결과
@@ -94,12 +212,25 @@ def run_publish_pipeline(
         image_dir = base_dir / "output" / "images" / "selected"
 
     webp_dir = Path(image_dir) / "webp"
+    image_host = image_host or os.environ.get("IMAGE_HOST") or DEFAULT_IMAGE_HOST
+
+    # 체크포인트 로드
+    state_file = md_path.parent / f"{md_path.stem}_publish_state.json"
+    if restart and state_file.exists():
+        state_file.unlink()
+    state = load_pipeline_state(state_file, md_file)
+    if state["status"] not in ("initialized", "completed"):
+        print(f"Resuming from checkpoint: {state_file}")
 
     results = {
         "steps": [],
         "errors": []
     }
 
+    # 이번 실행의 외부 HTTP 호출 메트릭 (재시도, 응답 시간, circuit 차단)
+    http_metrics = get_http_client().metrics
+    http_before = http_metrics.snapshot()
+
     # ============================================
     # Step 1: PNG → WebP 변환
     # ============================================
@@ -107,26 +238,154 @@ def run_publish_pipeline(
     print("Step 1: Converting PNG to WebP")
     print("="*50)
 
+    duplicates = {}
+    near_duplicates = {}
+    registered = {}
+    source_hashes = {}
+    registry = AssetRegistry()
+
     try:
-        conversion_results = batch_convert_to_webp(str(image_dir), str(webp_dir))
+        step_state = _start_step(state, "image_conversion", state_file)
+        webp_dir.mkdir(parents=True, exist_ok=True)
+        converted = 0
+        skipped = 0
+        placeholders = {}
+
+        sources = list_source_images(image_dir)
+
+        # extract_figure_region(webp=True)가 원본 없이 바로 저장한 WebP는 변환 없이 그대로 업로드 대상
+        source_stems = {f.stem for f in sources}
+        direct_webps = [f for f in sorted(webp_dir.glob("*.webp")) if f.stem not in source_stems]
+        if direct_webps:
+            print(f"  {len(direct_webps)} WebP files without source image (direct WebP)")
+
+        # 다른 글에서 이미 변환·업로드된 같은 파일은 레지스트리 URL 재사용
+        for png_file in sources + direct_webps:
+            content_hash = file_content_hash(str(png_file))
+            if png_file.suffix == ".webp":
+                record = registry.find_uploaded(content_hash, image_host)
+            else:
+                record = registry.find_uploaded(content_hash, image_host, webp_variant())
+            if record:
+                registered[png_file.name] = {
+                    "of": record["file_name"], "url": record["url"],
+                    "width": record["width"], "height": record["height"]
+                }
+                print(f"  {png_file.name} -> {record['url']} (registry: {record['file_name']})")
+        step_state["registered"] = registered
+
+        # 완전 중복(파일 내용 동일)만 변환·업로드 없이 기존 URL 재사용
+        # 유사 이미지는 다른 Figure(fig1a/fig1b 등)일 수 있으므로 따로 업로드하고 확인 대상으로 보고
+        source_hashes = {f.name: image_hashes(str(f)) for f in sources + direct_webps if f.name not in registered}
+        for name, match in find_duplicates_in(source_hashes).items():
+            if match["exact"]:
+                duplicates[name] = {"of": match["of"], "url": None}
+            else:
+                near_duplicates[name] = {"of": match["of"], "url": None}
+
+        hash_index = PerceptualIndex()
+        for name, hashes in source_hashes.items():
+            if name in duplicates:
+                continue
+            match = hash_index.find(hashes, image_host)
+            # 같은 Figure의 재크롭은 새로 업로드 (변경 여부는 체크포인트가 판단)
+            if not match or Path(match["file_name"] or "").stem == Path(name).stem:
+                continue
+            if match["exact"]:
+                duplicates[name] = {"of": match["file_name"], "url": match["url"]}
+                near_duplicates.pop(name, None)
+            elif name not in near_duplicates:
+                near_duplicates[name] = {"of": match["file_name"], "url": match["url"]}
+        hash_index.close()
+
+        # 사용자가 확인한 유사 이미지는 완전 중복처럼 기존 URL 재사용 (원본이 바뀌면 다시 확인)
+        # 이전 실행에서 보고되어 이미 따로 업로드된(레지스트리에 있는) 이미지도 승인 대상
+        reported = {**(step_state.get("near_duplicates") or {}), **near_duplicates}
+        approved_near = step_state.setdefault("approved_near", {})
+        for name in reuse_near or []:
+            if name in reported:
+                approved_near[name] = reported[name]
+            elif name not in approved_near:
+                print(f"  [WARN] --reuse-near {name}: not reported as a similar image, ignored")
+        for name, approved in approved_near.items():
+            if name in near_duplicates:
+                if near_duplicates[name]["of"] != approved["of"]:
+                    continue
+                approved = near_duplicates.pop(name)
+            elif name not in registered:
+                continue
+            registered.pop(name, None)
+            duplicates[name] = {
+                "of": approved["of"],
+                "url": approved["url"] or registered.get(approved["of"], {}).get("url")
+            }
+
+        for name, duplicate in duplicates.items():
+            print(f"  {name} = {duplicate['of']} (duplicate, reusing {'uploaded URL' if duplicate['url'] else 'upload'})")
+        for name, near in near_duplicates.items():
+            print(f"  [CHECK] {name} ~ {near['of']} (similar image, uploading separately; "
+                  f"rerun with --reuse-near {name} if it is the same figure)")
+        step_state["duplicates"] = duplicates
+        step_state["near_duplicates"] = near_duplicates
+
+        for png_file in sources:
+            if png_file.name in duplicates or png_file.name in registered:
+                continue
+            webp_file = webp_dir / f"{png_file.stem}.webp"
+            fingerprint = file_fingerprint(png_file)
+            checkpoint = step_state["files"].get(png_file.name)
+
+            if checkpoint and checkpoint["fingerprint"] == fingerprint and webp_file.exists():
+                skipped += 1
+                continue
+
+            result = convert_png_to_webp(str(png_file), str(webp_file), registry=registry)
+            placeholders[webp_file.name] = result["placeholder"]
+            print(f"  {png_file.name} -> {webp_file.name} ({result['reduction_percent']}% smaller)")
+            step_state["files"][png_file.name] = {
+                "fingerprint": fingerprint,
+                "output": webp_file.name,
+                "completed_at": _now()
+            }
+            save_pipeline_state(state, state_file)
+            converted += 1
+
+        if skipped:
+            print(f"  {skipped} files already converted (checkpoint)")
+
+        # 변환하지 않은 이미지(중복, 레지스트리, 이전 실행, direct WebP)도 placeholder는 필요
+        existing = load_placeholders(str(webp_dir))
+        for png_file in sources + direct_webps:
+            webp_name = f"{png_file.stem}.webp"
+            if webp_name not in placeholders and webp_name not in existing:
+                placeholders[webp_name] = placeholder_for_file(str(png_file))
+        save_placeholders(str(webp_dir), placeholders)
+
+        _finish_step(state, "image_conversion", state_file)
         results["steps"].append({
             "step": "image_conversion",
             "status": "success",
-            "files_converted": len(conversion_results)
+            "files_converted": converted,
+            "files_skipped": skipped,
+            "direct_webp": len(direct_webps),
+            "duplicates_reused": len(duplicates),
+            "near_duplicates": near_duplicates,
+            "registry_reused": len(registered)
         })
     except Exception as e:
+        _finish_step(state, "image_conversion", state_file, "failed")
         results["errors"].append(f"Image conversion failed: {e}")
         print(f"Error: {e}")
 
     # ============================================
-    # Step 2: Google Drive 업로드
+    # Step 2: 이미지 업로드 (단계 이름 gdrive_upload는 체크포인트 호환용)
     # ============================================
     print("\n" + "="*50)
-    print("Step 2: Uploading to Google Drive")
+    print(f"Step 2: Uploading images ({image_host})")
     print("="*50)
 
     url_mapping = {}
-    url_mapping_file = webp_dir / "gdrive_urls.json"
+    url_mapping_file = webp_dir / f"{image_host}_urls.json"
 
     if skip_upload and url_mapping_file.exists():
         print("Skipping upload (using existing mapping)")
@@ -134,14 +393,73 @@ def run_publish_pipeline(
             url_mapping = json.load(f)
     else:
         try:
-            url_mapping = upload_images_to_gdrive(str(webp_dir))
+            step_state = _start_step(state, "gdrive_upload", state_file)
+
+            # 내용이 바뀌지 않은 파일은 같은 호스트의 이전 업로드 URL 재사용
+            uploaded = {}
+            for webp_file in webp_dir.glob("*.webp"):
+                checkpoint = step_state["files"].get(webp_file.name)
+                if (checkpoint and checkpoint["fingerprint"] == file_fingerprint(webp_file)
+                        and checkpoint.get("host", DEFAULT_IMAGE_HOST) == image_host):
+                    uploaded[webp_file.name] = checkpoint["direct_link"]
+
+            hashes_by_stem = {Path(name).stem: hashes for name, hashes in source_hashes.items()}
+            hash_index = PerceptualIndex()
+
+            def record_upload(file_path: Path, upload_result: Dict):
+                step_state["files"][file_path.name] = {
+                    "fingerprint": file_fingerprint(file_path),
+                    "host": image_host,
+                    "file_id": upload_result["file_id"],
+                    "direct_link": upload_result["url"],
+                    "completed_at": _now()
+                }
+                save_pipeline_state(state, state_file)
+                hashes = hashes_by_stem.get(file_path.stem) or image_hashes(str(file_path))
+                hash_index.add(hashes, upload_result["url"], file_path.name, image_host)
+
+            host = get_image_host(image_host)
+            url_mapping = upload_images(
+                str(webp_dir),
+                host,
+                uploaded=uploaded,
+                on_uploaded=record_upload,
+                skip={f"{Path(name).stem}.webp" for name in {**duplicates, **registered}},
+                registry=registry
+            )
+            hash_index.close()
+
+            # 중복/레지스트리 이미지는 원본(또는 이전 업로드) URL로 매핑
+            media = load_media_manifest(str(webp_dir), image_host)
+            for name, duplicate in {**duplicates, **registered}.items():
+                original_webp = f"{Path(duplicate['of']).stem}.webp"
+                url = duplicate["url"] or url_mapping.get(original_webp)
+                if url:
+                    stem = Path(name).stem
+                    for key in (name, f"{stem}.png", f"{stem}.webp"):
+                        url_mapping[key] = url
+                    media[f"{stem}.webp"] = media.get(original_webp) or {
+                        "url": url,
+                        "width": duplicate.get("width"),
+                        "height": duplicate.get("height"),
+                        "sizes": {}
+                    }
+            if duplicates or registered:
+                with open(url_mapping_file, 'w', encoding='utf-8') as f:
+                    json.dump(url_mapping, f, indent=2, ensure_ascii=False)
+                with open(webp_dir / host.media_file, 'w', encoding='utf-8') as f:
+                    json.dump(media, f, indent=2, ensure_ascii=False)
+
+            _finish_step(state, "gdrive_upload", state_file)
             results["steps"].append({
                 "step": "gdrive_upload",
                 "status": "success",
+                "image_host": image_host,
                 "files_uploaded": len(url_mapping)
             })
         except Exception as e:
-            results["errors"].append(f"Google Drive upload failed: {e}")
+            _finish_step(state, "gdrive_upload", state_file, "failed")
+            results["errors"].append(f"Image upload ({image_host}) failed: {e}")
             print(f"Error: {e}")
 
     # ============================================
@@ -151,6 +469,8 @@ def run_publish_pipeline(
     print("Step 3: Preparing publish configuration")
     print("="*50)
 
+    _start_step(state, "config_generation", state_file)
+
     # Markdown 메타데이터 파싱
     with open(md_file, 'r', encoding='utf-8') as f:
         md_content = f.read()
@@ -175,6 +495,7 @@ def run_publish_pipeline(
     print(f"  Focus Keyword: {publish_config['focus_keyword']}")
     print(f"  Tags: {', '.join(publish_config['tags'][:5])}")
 
+    _finish_step(state, "config_generation", state_file)
     results["steps"].append({
         "step": "config_generation",
         "status": "success",
@@ -190,29 +511,62 @@ def run_publish_pipeline(
 
     status = "publish" if publish else "draft"
 
+    step_state = state["step_states"]["wordpress_publish"]
+    result_file = md_path.parent / f"{md_path.stem}_publish_result.json"
+
+    # 이전 발행 결과가 있으면 새 글 대신 변경된 필드만 수정
+    previous = load_previous_publish(result_file, step_state)
+    if previous.get("post_id"):
+        print(f"Updating existing post (ID: {previous['post_id']})")
+    if not step_state.get("idempotency_key"):
+        # 멱등성 키는 발행 결과가 저장될 때까지 재시도 간에 유지
+        # (기존 글이 삭제되어 새로 만드는 경우에도 사용)
+        step_state["idempotency_key"] = uuid.uuid4().hex
+    _start_step(state, "wordpress_publish", state_file)
+
     try:
         post_result = publish_blog_post(
             md_file=md_file,
             url_mapping=url_mapping,
             category_name=publish_config["category"],
             focus_keyword=publish_config["focus_keyword"],
-            status=status
+            status=status,
+            idempotency_key=step_state.get("idempotency_key"),
+            previous=previous,
+            registry=registry,
+            image_host=image_host,
+            image_media=load_media_manifest(str(webp_dir), image_host),
+            image_placeholders=load_placeholders(str(webp_dir))
         )
 
+        step_state["post_id"] = post_result["post_id"]
+        step_state["post_url"] = post_result["post_url"]
+        step_state["field_hashes"] = post_result["field_hashes"]
+        step_state.pop("idempotency_key", None)
+        _finish_step(state, "wordpress_publish", state_file)
+
         results["steps"].append({
             "step": "wordpress_publish",
-            "status": "success",
+            "status": "success" if post_result["updated_fields"] else "unchanged",
             "post_id": post_result["post_id"],
-            "post_url": post_result["post_url"]
+            "post_url": post_result["post_url"],
+            "updated_fields": post_result["updated_fields"]
         })
 
         results["post_id"] = post_result["post_id"]
         results["post_url"] = post_result["post_url"]
+        results["field_hashes"] = post_result["field_hashes"]
 
     except Exception as e:
+        _finish_step(state, "wordpress_publish", state_file, "failed")
         results["errors"].append(f"WordPress publish failed: {e}")
         print(f"Error: {e}")
 
+        # 다음 실행에서도 같은 글을 수정하도록 이전 발행 정보 유지
+        for key in ("post_id", "post_url", "field_hashes"):
+            if previous.get(key):
+                results[key] = previous[key]
+
     # ============================================
     # 결과 요약
     # ============================================
@@ -224,13 +578,32 @@ def run_publish_pipeline(
         print(f"\nPost URL: {results['post_url']}")
         print(f"Status: {status}")
 
+    if near_duplicates:
+        print(f"\nSimilar images to confirm ({len(near_duplicates)}, uploaded separately):")
+        for name, near in near_duplicates.items():
+            print(f"  - {name} ~ {near['of']}")
+        print("  Same figure? Rerun with " + " ".join(f"--reuse-near {name}" for name in near_duplicates))
+
     if results["errors"]:
         print(f"\nErrors ({len(results['errors'])}):")
         for err in results["errors"]:
             print(f"  - {err}")
 
+    results["http"] = http_metrics.since(http_before)
+    if results["http"]:
+        print("\nHTTP:")
+        for host, stats in results["http"].items():
+            print(f"  {host}: {stats['calls']} calls, {stats['retries']} retries, {stats['failures']} failed, "
+                  f"avg {stats['latency_ms_avg']:.0f}ms")
+
+    registry.close()
+
+    # 체크포인트 최종 상태
+    state["status"] = "failed" if results["errors"] else "completed"
+    state["errors"] = results["errors"]
+    save_pipeline_state(state, state_file)
+
     # 결과 저장
-    result_file = md_path.parent / f"{md_path.stem}_publish_result.json"
     with open(result_file, 'w', encoding='utf-8') as f:
         json.dump(results, f, ensure_ascii=False, indent=2)
 
@@ -242,7 +615,12 @@ def main():
     parser.add_argument("md_file", help="Markdown file to publish")
     parser.add_argument("--image-dir", help="Image directory (default: output/images/selected)")
     parser.add_argument("--publish", action="store_true", help="Publish immediately (default: draft)")
-    parser.add_argument("--skip-upload", action="store_true", help="Skip Google Drive upload")
+    parser.add_argument("--skip-upload", action="store_true", help="Skip image upload")
+    parser.add_argument("--image-host", choices=sorted(IMAGE_HOSTS),
+                        help="Image host (default: IMAGE_HOST or gdrive)")
+    parser.add_argument("--restart", action="store_true", help="Ignore checkpoint and run all steps again")
+    parser.add_argument("--reuse-near", action="append", metavar="IMAGE",
+                        help="Reuse the matched URL for a reported similar image (repeatable)")
     parser.add_argument("--test-connection", action="store_true", help="Test WordPress connection only")
 
     args = parser.parse_args()
@@ -256,7 +634,10 @@ def main():
         md_file=args.md_file,
         image_dir=args.image_dir,
         publish=args.publish,
-        skip_upload=args.skip_upload
+        skip_upload=args.skip_upload,
+        restart=args.restart,
+        image_host=args.image_host,
+        reuse_near=args.reuse_near
     )
 
     sys.exit(0 if not results["errors"] else 1)
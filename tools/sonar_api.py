@@ -6,10 +6,22 @@ Perplexity Sonar Pro를 사용한 학술 논문 검색
 
 import os
 import json
+import time
+import threading
 import requests
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Iterator
 from dataclasses import dataclass, asdict
 from pathlib import Path
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from sonar_cache import SonarCache, make_cache_key, RECENCY_TTL
+from citation_index import CitationIndex
+from http_client import get_http_client
+from sonar_scheduler import (
+    SonarScheduler, get_scheduler, estimate_tokens,
+    PRIORITY_NORMAL, PRIORITY_BACKGROUND
+)
 
 # .env 파일 로드
 try:
@@ -40,36 +52,192 @@ class SonarResponse:
     query: str
 
 
+@dataclass
+class DirectionResult:
+    """방향별 검색 결과 (fan-out 용)"""
+    direction: str
+    response: Optional[SonarResponse] = None
+    error: Optional[str] = None
+    elapsed_seconds: float = 0.0
+
+
+@dataclass
+class SonarStreamChunk:
+    """스트리밍 응답 chunk"""
+    delta: str
+    answer: str  # 지금까지 누적된 answer
+    citations: List
+    done: bool = False
+    cancelled: bool = False
+    response: Optional[SonarResponse] = None  # done chunk: search_academic과 같은 형식의 전체 응답
+
+
+ACADEMIC_SYSTEM_PROMPT = """You are a research assistant specializing in orthodontics 
+and dental literature. Provide accurate, well-cited information from peer-reviewed sources.
+Focus on:
+- Randomized controlled trials (RCTs)
+- Systematic reviews and meta-analyses
+- Recent publications from reputable journals
+
+Always include specific data points (sample sizes, p-values, effect sizes) when available."""
+
+# research_expander 비교용 기본 검색 방향
+RESEARCH_DIRECTIONS = ["related", "opposing", "supporting", "recent", "meta-analysis"]
+
+# compare_studies 비교 연구 목록 토큰 상한
+COMPARE_MAX_PROMPT_TOKENS = 6000
+
+# Deep Research 응답 대기 상한 (초, SONAR_READ_TIMEOUT으로 변경)
+DEFAULT_READ_TIMEOUT = 300.0
+
+
+class IncompleteStreamError(Exception):
+    """스트림이 완료 신호([DONE] 또는 finish_reason) 없이 끝남 (연결 끊김, 잘린 응답)"""
+
+
+def iter_sse_events(lines: Iterator[str], cancel_event: Optional[threading.Event] = None) -> Iterator[str]:
+    """
+    Server-Sent Events 라인 스트림에서 data 필드를 이벤트 단위로 반환
+
+    여러 줄의 data:는 줄바꿈으로 합치고, 빈 줄에서 이벤트를 구분한다.
+    cancel_event는 keep-alive 주석을 포함한 모든 줄마다 확인하여, 첫 토큰 전 대기 중에도 바로 중단한다.
+    """
+    data_lines = []
+    for line in lines:
+        if cancel_event is not None and cancel_event.is_set():
+            return
+        if line is None:
+            continue
+        if line == "":
+            if data_lines:
+                yield "\n".join(data_lines)
+                data_lines = []
+            continue
+        if line.startswith(":"):
+            continue  # 주석 (keep-alive)
+        if line.startswith("data:"):
+            data_lines.append(line[5:].lstrip(" "))
+    if data_lines:
+        yield "\n".join(data_lines)
+
+
+def parse_search_results(raw_response: Dict) -> List[SearchResult]:
+    """응답의 search_results(제공되는 경우)를 SearchResult로 변환"""
+    results = []
+    for item in raw_response.get("search_results") or []:
+        url = item.get("url", "")
+        results.append(SearchResult(
+            title=item.get("title", ""),
+            url=url,
+            snippet=item.get("snippet", ""),
+            source=urlsplit(url).netloc
+        ))
+    return results
+
+
 class SonarAPI:
     """Sonar Pro API 래퍼"""
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        use_cache: bool = True,
+        cache: Optional[SonarCache] = None,
+        use_index: bool = True,
+        citation_index: Optional[CitationIndex] = None,
+        scheduler: Optional[SonarScheduler] = None
+    ):
         self.api_key = api_key or os.environ.get("PERPLEXITY_API_KEY")
         if not self.api_key:
             raise ValueError("PERPLEXITY_API_KEY 환경변수 또는 api_key 필요")
         
-        self.base_url = "https://api.perplexity.ai/chat/completions"
+        # PERPLEXITY_API_URL로 로컬 fake 서버 지정 가능 (테스트용)
+        self.base_url = os.environ.get(
+            "PERPLEXITY_API_URL", "https://api.perplexity.ai/chat/completions"
+        )
         self.model = "sonar-deep-research"  # Deep Research 모델 사용 (심층 분석)
+
+        # 타임아웃/재시도/circuit breaker 공용 클라이언트
+        self.http = get_http_client()
+        self.read_timeout = float(os.environ.get("SONAR_READ_TIMEOUT", DEFAULT_READ_TIMEOUT))
+
+        # 응답 캐시 (동일 쿼리 재호출 방지)
+        self.cache = cache or (SonarCache() if use_cache else None)
+
+        # 로컬 인용 색인 (모든 응답의 citations 누적)
+        self.citation_index = citation_index or (CitationIndex() if use_index else None)
+
+        # 속도 제한 / 예산 / 우선순위 (캐시 미스인 실제 API 호출에만 적용)
+        # (기본은 프로세스 공용 스케줄러 - 여러 SonarAPI가 같은 속도 제한/세션 예산을 공유)
+        self.scheduler = scheduler or get_scheduler()
         
+    def _build_messages(self, query: str, system_prompt: str = "") -> List[Dict]:
+        messages = []
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        messages.append({"role": "user", "content": query})
+        return messages
+
     def _make_request(
         self,
         query: str,
         system_prompt: str = "",
         domain_filter: List[str] = None,
-        recency_filter: str = None
+        recency_filter: str = None,
+        timeout: Optional[float] = None,
+        priority: int = PRIORITY_NORMAL
     ) -> Dict:
-        """API 요청 실행"""
+        """API 요청 실행 (캐시 사용 시 캐시 우선)"""
         
+        messages = self._build_messages(query, system_prompt)
+
+        def fetch() -> Dict:
+            estimated_tokens = estimate_tokens(query + system_prompt)
+            raw_response = self.scheduler.run(
+                lambda: self._post(messages, domain_filter, recency_filter, timeout),
+                priority=priority,
+                estimated_tokens=estimated_tokens
+            )
+            self.scheduler.record_usage(raw_response.get("usage"), estimated_tokens)
+            self._index_response(query, raw_response)
+            return raw_response
+
+        if self.cache is None:
+            return fetch()
+
+        key = make_cache_key(self.model, messages, domain_filter, recency_filter)
+        return self.cache.get_or_fetch(key, fetch, recency_filter, query)
+
+    def _index_response(self, query: str, raw_response: Dict):
+        """응답 인용을 로컬 색인에 저장 (어떤 실패도 검색 결과에는 영향 없음)"""
+        if self.citation_index is None:
+            return
+        try:
+            self.citation_index.ingest_response(query, raw_response)
+        except Exception as e:
+            print(f"  Citation index update failed: {e}")
+
+    def _send(
+        self,
+        messages: List[Dict],
+        domain_filter: List[str] = None,
+        recency_filter: str = None,
+        timeout: Optional[float] = None,
+        stream: bool = False,
+        max_retries: int = 3
+    ) -> requests.Response:
+        """
+        Perplexity chat completions 요청 전송
+
+        429/5xx, 연결 실패는 Retry-After(없으면 지수 백오프 + jitter)만큼 기다린 후 재시도한다 (http_client).
+        read 타임아웃은 재시도하지 않으며, 재시도를 포함한 전체 시간은 timeout(기본 SONAR_READ_TIMEOUT)을 넘지 않는다.
+        """
+
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
         }
         
-        messages = []
-        if system_prompt:
-            messages.append({"role": "system", "content": system_prompt})
-        messages.append({"role": "user", "content": query})
-        
         payload = {
             "model": self.model,
             "messages": messages,
@@ -83,17 +251,156 @@ class SonarAPI:
         # 최신성 필터
         if recency_filter:
             payload["search_recency_filter"] = recency_filter
+
+        if stream:
+            payload["stream"] = True
+            headers["Accept"] = "text/event-stream"
         
-        response = requests.post(self.base_url, headers=headers, json=payload)
+        # 검색 요청은 다시 보내도 안전하지만 비싸고 오래 걸리므로:
+        # read 타임아웃(서버가 이미 오래 처리함)은 재시도하지 않고, 재시도 포함 전체 시간은 read 타임아웃 이내
+        read_timeout = timeout or self.read_timeout
+        response = self.http.post(
+            self.base_url,
+            headers=headers,
+            json=payload,
+            timeout=read_timeout,
+            # 재시도도 스케줄러의 속도 제한/예산을 거침
+            before_retry=self.scheduler.acquire_retry,
+            retry_read_timeout=False,
+            deadline=read_timeout,
+            stream=stream,
+            idempotent=True,
+            max_retries=max_retries
+        )
         response.raise_for_status()
-        
+        return response
+
+    def _post(
+        self,
+        messages: List[Dict],
+        domain_filter: List[str] = None,
+        recency_filter: str = None,
+        timeout: Optional[float] = None
+    ) -> Dict:
+        """Perplexity chat completions 호출 (전체 응답)"""
+        response = self._send(messages, domain_filter, recency_filter, timeout)
         return response.json()
+
+    def _stream_request(
+        self,
+        query: str,
+        system_prompt: str = "",
+        domain_filter: List[str] = None,
+        recency_filter: str = None,
+        timeout: Optional[float] = None,
+        cancel_event: Optional[threading.Event] = None,
+        priority: int = PRIORITY_NORMAL
+    ) -> Iterator[SonarStreamChunk]:
+        """
+        SSE 스트리밍 요청 실행
+
+        chunk가 도착할 때마다 누적 answer와 citations를 yield한다.
+        완료되면 일반 응답과 같은 형식으로 캐시에 저장하고, 캐시 적중 시에는 한 번에 반환한다.
+        """
+        messages = self._build_messages(query, system_prompt)
+        key = make_cache_key(self.model, messages, domain_filter, recency_filter)
+
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.cache.hits += 1
+                answer = cached.get("choices", [{}])[0].get("message", {}).get("content", "")
+                yield SonarStreamChunk(
+                    delta=answer,
+                    answer=answer,
+                    citations=cached.get("citations", []),
+                    done=True,
+                    response=self._to_response(query, cached)
+                )
+                return
+
+        estimated_tokens = estimate_tokens(query + system_prompt)
+        response = self.scheduler.run(
+            lambda: self._send(messages, domain_filter, recency_filter, timeout, stream=True),
+            priority=priority,
+            estimated_tokens=estimated_tokens
+        )
+        answer = ""
+        citations = []
+        search_results = []
+        usage = None
+        completed = False
+
+        try:
+            lines = response.iter_lines(chunk_size=None, decode_unicode=True)
+            for event in iter_sse_events(lines, cancel_event):
+                if event == "[DONE]":
+                    completed = True
+                    break
+
+                data = json.loads(event)
+                choice = (data.get("choices") or [{}])[0]
+                delta = choice.get("delta", {}).get("content") or ""
+                citations = data.get("citations") or citations
+                search_results = data.get("search_results") or search_results
+                usage = data.get("usage") or usage
+                answer += delta
+
+                if delta or data.get("citations"):
+                    yield SonarStreamChunk(delta=delta, answer=answer, citations=citations)
+
+                if choice.get("finish_reason"):
+                    completed = True
+                    break
+        finally:
+            response.close()
+            # 취소/잘린 응답/generator close도 받은 만큼은 과금되므로 항상 기록 (예약 해제 포함)
+            self.scheduler.record_usage(usage, estimated_tokens)
+
+        if not completed and cancel_event is not None and cancel_event.is_set():
+            yield SonarStreamChunk(delta="", answer=answer, citations=citations, cancelled=True)
+            return
+
+        # 잘린 응답은 캐시/색인하지 않음
+        if not completed:
+            raise IncompleteStreamError(f"Sonar stream ended before completion ({len(answer)} chars received)")
+
+        # 완료된 응답은 일반 응답 형식으로 색인 + 캐시
+        full_response = {
+            "choices": [{"message": {"role": "assistant", "content": answer}}],
+            "citations": citations
+        }
+        if search_results:
+            full_response["search_results"] = search_results
+        if usage:
+            full_response["usage"] = usage
+
+        self._index_response(query, full_response)
+        if self.cache is not None:
+            self.cache.set(key, full_response, RECENCY_TTL.get(recency_filter, RECENCY_TTL[None]), query)
+
+        yield SonarStreamChunk(
+            delta="", answer=answer, citations=citations, done=True,
+            response=self._to_response(query, full_response)
+        )
+
+    def _to_response(self, query: str, raw_response: Dict) -> SonarResponse:
+        """chat completions 응답 JSON -> SonarResponse"""
+        return SonarResponse(
+            answer=raw_response.get("choices", [{}])[0].get("message", {}).get("content", ""),
+            citations=raw_response.get("citations", []),
+            search_results=parse_search_results(raw_response),
+            model=self.model,
+            query=query
+        )
     
     def search_academic(
         self,
         query: str,
         recency: str = "year",  # year, month, week, day
-        system_context: str = ""
+        system_context: str = "",
+        timeout: Optional[float] = None,
+        priority: int = PRIORITY_NORMAL
     ) -> SonarResponse:
         """
         학술 논문 검색
@@ -102,17 +409,11 @@ class SonarAPI:
             query: 검색 쿼리
             recency: 최신성 필터 (year, month, week, day)
             system_context: 추가 컨텍스트 (예: 도메인 정보)
+            timeout: 요청 타임아웃 (초)
+            priority: 스케줄러 우선순위 (재작업 요청은 PRIORITY_URGENT)
         """
         
-        system_prompt = """You are a research assistant specializing in orthodontics 
-and dental literature. Provide accurate, well-cited information from peer-reviewed sources.
-Focus on:
-- Randomized controlled trials (RCTs)
-- Systematic reviews and meta-analyses
-- Recent publications from reputable journals
-
-Always include specific data points (sample sizes, p-values, effect sizes) when available."""
-
+        system_prompt = ACADEMIC_SYSTEM_PROMPT
         if system_context:
             system_prompt += f"\n\nAdditional context: {system_context}"
         
@@ -120,26 +421,82 @@ Always include specific data points (sample sizes, p-values, effect sizes) when
             query=query,
             system_prompt=system_prompt,
             domain_filter=["academic"],
-            recency_filter=recency
+            recency_filter=recency,
+            timeout=timeout,
+            priority=priority
         )
         
-        # 응답 파싱
-        content = raw_response.get("choices", [{}])[0].get("message", {}).get("content", "")
-        citations = raw_response.get("citations", [])
-        
-        return SonarResponse(
-            answer=content,
-            citations=citations,
-            search_results=[],  # API v2에서 별도 제공
-            model=self.model,
-            query=query
+        return self._to_response(query, raw_response)
+
+    def search_local(self, query: str, limit: int = 10) -> List[SearchResult]:
+        """
+        로컬 인용 색인 검색 (API 호출 없음)
+
+        research_expander는 먼저 로컬 색인을 확인하고, 부족한 방향만 API로 검색한다.
+        """
+        if self.citation_index is None:
+            return []
+        return [
+            SearchResult(
+                title=r["title"] or r["url"],
+                url=r["url"],
+                snippet=r["context"],
+                source=urlsplit(r["url"]).netloc,
+                relevance_score=-r["score"]  # bm25는 낮을수록 관련성 높음
+            )
+            for r in self.citation_index.search(query, limit)
+        ]
+
+    def search_academic_stream(
+        self,
+        query: str,
+        recency: str = "year",
+        system_context: str = "",
+        timeout: Optional[float] = None,
+        cancel_event: Optional[threading.Event] = None,
+        priority: int = PRIORITY_NORMAL
+    ) -> Iterator[SonarStreamChunk]:
+        """
+        학술 논문 검색 (스트리밍)
+
+        search_academic과 같은 요청을 SSE로 받아 부분 answer를 바로 전달한다.
+        cancel_event가 set되거나 generator를 close()하면 연결을 끊는다.
+
+        Args:
+            query: 검색 쿼리
+            recency: 최신성 필터 (year, month, week, day)
+            system_context: 추가 컨텍스트
+            timeout: 요청 타임아웃 (초, chunk 간 대기 시간에도 적용)
+            cancel_event: 취소 신호
+            priority: 스케줄러 우선순위
+
+        Yields:
+            SonarStreamChunk (마지막 chunk는 done=True)
+
+        Raises:
+            IncompleteStreamError: [DONE]/finish_reason 없이 스트림이 끊김 (부분 답변은 캐시/색인하지 않음)
+        """
+        system_prompt = ACADEMIC_SYSTEM_PROMPT
+        if system_context:
+            system_prompt += f"\n\nAdditional context: {system_context}"
+
+        return self._stream_request(
+            query=query,
+            system_prompt=system_prompt,
+            domain_filter=["academic"],
+            recency_filter=recency,
+            timeout=timeout,
+            cancel_event=cancel_event,
+            priority=priority
         )
     
     def find_related_research(
         self,
         paper_title: str,
         paper_findings: str,
-        direction: str = "related"
+        direction: str = "related",
+        timeout: Optional[float] = None,
+        priority: int = PRIORITY_NORMAL
     ) -> SonarResponse:
         """
         관련 연구 검색
@@ -148,6 +505,8 @@ Always include specific data points (sample sizes, p-values, effect sizes) when
             paper_title: 원논문 제목
             paper_findings: 원논문 핵심 발견
             direction: related, opposing, supporting, recent, meta-analysis
+            timeout: 요청 타임아웃 (초)
+            priority: 스케줄러 우선순위
         """
         
         query_templates = {
@@ -172,13 +531,75 @@ Always include specific data points (sample sizes, p-values, effect sizes) when
         
         return self.search_academic(
             query=query,
-            recency="year" if direction == "recent" else None
+            recency="year" if direction == "recent" else None,
+            timeout=timeout,
+            priority=priority
         )
+
+    def find_related_research_concurrent(
+        self,
+        paper_title: str,
+        paper_findings: str,
+        directions: List[str] = None,
+        max_workers: int = 3,
+        timeout: float = 600,
+        priority: int = PRIORITY_BACKGROUND
+    ) -> Iterator[DirectionResult]:
+        """
+        여러 방향의 관련 연구를 동시에 검색하고 완료되는 순서대로 반환
+
+        Args:
+            paper_title: 원논문 제목
+            paper_findings: 원논문 핵심 발견
+            directions: 검색 방향 목록 (기본: RESEARCH_DIRECTIONS)
+            max_workers: 동시 요청 수 상한
+            timeout: 요청별 타임아웃 (초)
+            priority: 스케줄러 우선순위 (기본: 백그라운드)
+
+        Yields:
+            DirectionResult (실패한 방향은 error에 메시지)
+
+        Example:
+            for result in api.find_related_research_concurrent(title, findings):
+                if result.response:
+                    compare(result.direction, result.response)
+        """
+        directions = directions or RESEARCH_DIRECTIONS
+
+        def run(direction: str) -> DirectionResult:
+            started = time.monotonic()
+            try:
+                response = self.find_related_research(
+                    paper_title, paper_findings, direction,
+                    timeout=timeout, priority=priority
+                )
+                return DirectionResult(
+                    direction=direction,
+                    response=response,
+                    elapsed_seconds=round(time.monotonic() - started, 1)
+                )
+            except Exception as e:
+                return DirectionResult(
+                    direction=direction,
+                    error=str(e),
+                    elapsed_seconds=round(time.monotonic() - started, 1)
+                )
+
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            futures = [executor.submit(run, d) for d in directions]
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            # 호출자가 중간에 중단하면 대기 중인 요청은 취소
+            executor.shutdown(wait=False, cancel_futures=True)
     
     def compare_studies(
         self,
         original_paper: Dict,
-        comparison_papers: List[Dict]
+        comparison_papers: List[Dict],
+        max_prompt_tokens: int = COMPARE_MAX_PROMPT_TOKENS,
+        priority: int = PRIORITY_NORMAL
     ) -> SonarResponse:
         """
         연구들 간 비교 분석 요청
@@ -186,12 +607,23 @@ Always include specific data points (sample sizes, p-values, effect sizes) when
         Args:
             original_paper: {"title": str, "findings": str, "methods": str}
             comparison_papers: [{"title": str, "findings": str}, ...]
+            max_prompt_tokens: 비교 연구 목록의 토큰 상한 (초과 시 findings를 균등하게 축약)
+            priority: 스케줄러 우선순위
         """
         
         papers_text = "\n".join([
             f"- {p['title']}: {p['findings']}" 
             for p in comparison_papers
         ])
+
+        if comparison_papers and estimate_tokens(papers_text) > max_prompt_tokens:
+            # 논문당 동일한 글자 수로 findings 축약
+            per_paper_chars = max(80, max_prompt_tokens * 4 // len(comparison_papers))
+            papers_text = "\n".join([
+                f"- {p['title']}: {_truncate(p['findings'], per_paper_chars - len(p['title']))}"
+                for p in comparison_papers
+            ])
+            print(f"  compare_studies: findings truncated to ~{max_prompt_tokens} tokens")
         
         query = f"""Compare these orthodontic studies:
 
@@ -208,13 +640,21 @@ Analyze:
 3. Which study has stronger evidence (sample size, study design)
 4. Clinical implications of the differences"""
 
-        return self.search_academic(query)
+        return self.search_academic(query, priority=priority)
+
+
+def _truncate(text: str, max_chars: int) -> str:
+    max_chars = max(40, max_chars)
+    if len(text) <= max_chars:
+        return text
+    return text[:max_chars - 3].rstrip() + "..."
 
 
 def search_orthodontic_literature(
     topic: str,
     specific_question: Optional[str] = None,
-    api_key: Optional[str] = None
+    api_key: Optional[str] = None,
+    use_cache: bool = True
 ) -> Dict:
     """
     치과교정 문헌 검색 편의 함수
@@ -223,12 +663,13 @@ def search_orthodontic_literature(
         topic: 검색 주제 (예: "IPR timing clear aligner")
         specific_question: 구체적 질문 (선택)
         api_key: API 키 (환경변수 대체 가능)
+        use_cache: 로컬 응답 캐시 사용 여부
         
     Returns:
         검색 결과 딕셔너리
     """
     
-    api = SonarAPI(api_key)
+    api = SonarAPI(api_key, use_cache=use_cache)
     
     query = f"orthodontic {topic}"
     if specific_question:
@@ -247,20 +688,42 @@ def search_orthodontic_literature(
 if __name__ == "__main__":
     import sys
     
-    if len(sys.argv) < 2:
-        print("Usage: python sonar_api.py <search_query>")
+    flags = {"--no-cache", "--no-stream"}
+    args = sys.argv[1:]
+    use_cache = "--no-cache" not in args
+    use_stream = "--no-stream" not in args
+    args = [a for a in args if a not in flags]
+
+    if not args:
+        print("Usage: python sonar_api.py <search_query> [--no-cache] [--no-stream]")
         print("Example: python sonar_api.py 'IPR timing pediatric Invisalign'")
         sys.exit(1)
     
-    query = " ".join(sys.argv[1:])
+    query = " ".join(args)
     
     try:
-        result = search_orthodontic_literature(query)
-        print(f"\n=== Search: {result['query']} ===\n")
-        print(result['answer'])
-        print(f"\n=== Citations ({len(result['citations'])}) ===")
-        for i, cite in enumerate(result['citations'], 1):
+        if use_stream:
+            # 답변을 도착하는 대로 출력 (Ctrl+C로 취소)
+            api = SonarAPI(use_cache=use_cache)
+            query = f"orthodontic {query}"
+            print(f"\n=== Search: {query} ===\n")
+            citations = []
+            for chunk in api.search_academic_stream(query):
+                print(chunk.delta, end="", flush=True)
+                citations = chunk.citations
+            print()
+        else:
+            result = search_orthodontic_literature(query, use_cache=use_cache)
+            print(f"\n=== Search: {result['query']} ===\n")
+            print(result['answer'])
+            citations = result['citations']
+
+        print(f"\n=== Citations ({len(citations)}) ===")
+        for i, cite in enumerate(citations, 1):
             print(f"{i}. {cite}")
+    except KeyboardInterrupt:
+        print("\nCancelled")
+        sys.exit(130)
     except Exception as e:
         print(f"Error: {e}")
         sys.exit(1)
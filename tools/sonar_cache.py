@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Sonar Response Cache
+Sonar API 응답을 로컬에 캐시하고 동일 요청을 병합(coalescing)
+
+- 키: 정규화된 (model, messages, filters)의 SHA-256
+- TTL: search_recency_filter에 따라 다름 (최신성 필터가 짧을수록 짧게)
+- 동시에 들어온 같은 키의 요청은 한 번만 API 호출
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Callable
+
+
+DEFAULT_CACHE_DIR = Path(__file__).parent.parent / ".cache" / "sonar"
+
+# 최신성 필터별 TTL (초)
+RECENCY_TTL = {
+    "day": 6 * 3600,
+    "week": 24 * 3600,
+    "month": 7 * 24 * 3600,
+    "year": 30 * 24 * 3600,
+    None: 30 * 24 * 3600,
+}
+
+
+def _normalize_text(text: str) -> str:
+    """공백/대소문자 차이만 있는 쿼리를 같은 키로 취급"""
+    return re.sub(r"\s+", " ", text).strip().casefold()
+
+
+def make_cache_key(
+    model: str,
+    messages: List[Dict],
+    domain_filter: List[str] = None,
+    recency_filter: str = None
+) -> str:
+    """
+    요청 캐시 키 생성
+
+    Args:
+        model: 모델 이름
+        messages: chat messages
+        domain_filter: search_domain_filter
+        recency_filter: search_recency_filter
+
+    Returns:
+        SHA-256 hex digest
+    """
+    normalized = {
+        "model": model,
+        "messages": [
+            {"role": m["role"], "content": _normalize_text(m["content"])}
+            for m in messages
+        ],
+        "domain_filter": sorted(domain_filter or []),
+        "recency_filter": recency_filter
+    }
+    encoded = json.dumps(normalized, ensure_ascii=False, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class SonarCache:
+    """파일 기반 Sonar 응답 캐시 + in-flight 요청 병합"""
+
+    def __init__(self, cache_dir: str = None):
+        self.cache_dir = Path(cache_dir or os.environ.get("SONAR_CACHE_DIR") or DEFAULT_CACHE_DIR)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        # key -> {"event": Event, "response": Dict | None}
+        self._inflight: Dict[str, Dict] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict]:
+        """유효한 캐시 응답 반환 (없거나, 만료되었거나, 형식이 깨졌으면 None)"""
+        path = self._path(key)
+        if not path.exists():
+            return None
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            if time.time() - float(entry["created_at"]) > float(entry["ttl"]):
+                return None
+            response = entry["response"]
+        except (OSError, KeyError, ValueError, TypeError):
+            # JSONDecodeError는 ValueError
+            return None
+
+        return response if isinstance(response, dict) else None
+
+    def set(self, key: str, response: Dict, ttl: int, query: str = ""):
+        """응답 저장 (임시 파일에 쓴 뒤 교체)"""
+        entry = {
+            "created_at": time.time(),
+            "ttl": ttl,
+            "query": query,
+            "response": response
+        }
+        path = self._path(key)
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def get_or_fetch(
+        self,
+        key: str,
+        fetch: Callable[[], Dict],
+        recency_filter: str = None,
+        query: str = ""
+    ) -> Dict:
+        """
+        캐시 조회 후 없으면 fetch 실행
+
+        같은 키로 이미 진행 중인 요청이 있으면 새로 호출하지 않고 그 결과를 기다린다.
+
+        Args:
+            key: make_cache_key()로 만든 키
+            fetch: 실제 API 호출 함수
+            recency_filter: TTL 결정용 최신성 필터
+            query: 캐시 항목에 기록할 원 쿼리 (디버깅용)
+        """
+        cached = self.get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        with self._lock:
+            pending = self._inflight.get(key)
+            leader = pending is None
+            if leader:
+                pending = {"event": threading.Event(), "response": None}
+                self._inflight[key] = pending
+
+        if not leader:
+            pending["event"].wait()
+            if pending["response"] is not None:
+                self.coalesced += 1
+                return pending["response"]
+            # 선행 요청이 실패한 경우 직접 호출
+            return self.get_or_fetch(key, fetch, recency_filter, query)
+
+        try:
+            self.misses += 1
+            response = fetch()
+            self.set(key, response, RECENCY_TTL.get(recency_filter, RECENCY_TTL[None]), query)
+            pending["response"] = response
+            return response
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            pending["event"].set()
+
+    def clear_expired(self) -> int:
+        """만료된 캐시 파일 삭제, 삭제 개수 반환"""
+        removed = 0
+        now = time.time()
+        for path in self.cache_dir.glob("*.json"):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    entry = json.load(f)
+                expired = now - float(entry["created_at"]) > float(entry["ttl"])
+            except (OSError, KeyError, ValueError, TypeError):
+                expired = True
+            if expired:
+                path.unlink(missing_ok=True)
+                removed += 1
+        return removed
@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+Sonar Query Scheduler
+Sonar API 요청의 속도 제한, 토큰/비용 예산, 우선순위 관리
+
+- Token bucket: 분당 요청 수 제한 (burst 허용)
+- 세션 예산: 누적 토큰/비용이 한도를 넘으면 새 요청 거부
+    세션 상태 파일이 있으면 이전 프로세스의 사용량까지 합산, 실행 중 요청의 예상 토큰은 미리 예약
+- 우선순위: quality_reviewer 재작업(URGENT) 요청이 백그라운드 검색보다 먼저 실행
+- 사용량: 응답의 usage 필드를 세션 상태 파일(state/*.yaml)에 더함 (파일 잠금, 덮어쓰지 않음)
+- 프로세스당 하나의 스케줄러 공유 (get_scheduler)
+"""
+
+import os
+import time
+import heapq
+import itertools
+import threading
+from pathlib import Path
+from concurrent.futures import Future
+from typing import Dict, Optional, Callable, Any
+
+try:
+    import fcntl
+except ImportError:  # Windows: 잠금 없이 기록
+    fcntl = None
+
+
+PRIORITY_URGENT = 0       # quality_reviewer 재작업 요청
+PRIORITY_NORMAL = 5       # 일반 검색
+PRIORITY_BACKGROUND = 10  # 사전 수집, fan-out 검색
+
+# sonar-deep-research 가격 (USD, 응답에 usage.cost가 없을 때 사용)
+PRICE_PER_MILLION_TOKENS = {
+    "prompt_tokens": 2.0,
+    "completion_tokens": 8.0,
+    "citation_tokens": 2.0,
+    "reasoning_tokens": 3.0,
+}
+PRICE_PER_SEARCH_QUERY = 0.005
+
+
+class BudgetExceededError(Exception):
+    """세션 토큰/비용 예산 초과"""
+
+
+def estimate_tokens(text: str) -> int:
+    """대략적인 토큰 수 (영문 기준 4자 ≈ 1토큰)"""
+    return len(text) // 4 + 1
+
+
+def usage_cost(usage: Dict) -> float:
+    """usage 필드에서 비용(USD) 계산"""
+    cost = usage.get("cost")
+    if isinstance(cost, dict) and "total_cost" in cost:
+        return float(cost["total_cost"])
+
+    total = sum(
+        usage.get(field, 0) * price / 1_000_000
+        for field, price in PRICE_PER_MILLION_TOKENS.items()
+    )
+    total += usage.get("num_search_queries", 0) * PRICE_PER_SEARCH_QUERY
+    return total
+
+
+class TokenBucket:
+    """분당 요청 수 제한"""
+
+    def __init__(self, rate_per_minute: float, capacity: int = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or max(1, int(rate_per_minute))
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self) -> float:
+        """토큰 1개를 얻기까지 남은 시간 (초)"""
+        with self._lock:
+            self._refill()
+            if self.tokens >= 1:
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+    def refund(self):
+        """요청을 보내지 않았을 때 try_acquire로 얻은 토큰 반환"""
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens + 1)
+
+
+class SonarScheduler:
+    """Sonar 요청 스케줄러 (우선순위 큐 + 속도 제한 + 예산)"""
+
+    def __init__(
+        self,
+        requests_per_minute: float = None,
+        max_concurrent: int = None,
+        token_budget: int = None,
+        cost_budget: float = None,
+        session_state_file: str = None
+    ):
+        """
+        Args:
+            requests_per_minute: 분당 최대 요청 수 (기본: SONAR_RPM 또는 5)
+            max_concurrent: 동시 실행 요청 수 (기본: SONAR_MAX_CONCURRENT 또는 3)
+            token_budget: 세션 총 토큰 한도 (기본: SONAR_TOKEN_BUDGET, 없으면 무제한)
+            cost_budget: 세션 비용 한도 USD (기본: SONAR_COST_BUDGET, 없으면 무제한)
+            session_state_file: 사용량을 기록할 세션 상태 YAML (기본: SONAR_SESSION_STATE)
+        """
+        env = os.environ
+        self.bucket = TokenBucket(float(requests_per_minute or env.get("SONAR_RPM", 5)))
+        self.max_concurrent = int(max_concurrent or env.get("SONAR_MAX_CONCURRENT", 3))
+        self.token_budget = token_budget or (int(env["SONAR_TOKEN_BUDGET"]) if env.get("SONAR_TOKEN_BUDGET") else None)
+        self.cost_budget = cost_budget or (float(env["SONAR_COST_BUDGET"]) if env.get("SONAR_COST_BUDGET") else None)
+        self.session_state_file = session_state_file or env.get("SONAR_SESSION_STATE")
+
+        # 세션 누적 사용량 (세션 상태 파일이 있으면 이전 실행분부터 시작)
+        self.usage = empty_usage()
+        if self.session_state_file:
+            self.usage = read_session_usage(self.session_state_file)
+        # 실행 중인 요청의 예상 토큰/비용 (응답 usage가 기록되면 해제)
+        self.reserved_tokens = 0
+        self.reserved_cost = 0.0
+
+        self._queue = []
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._running = 0
+        self._dispatcher = None
+        self._state_lock = threading.Lock()
+
+    # ------------------------------------------------------------
+    # 제출
+    # ------------------------------------------------------------
+
+    def submit(
+        self,
+        fn: Callable[[], Any],
+        priority: int = PRIORITY_NORMAL,
+        estimated_tokens: int = 0
+    ) -> Future:
+        """
+        요청 등록 (우선순위 값이 작을수록 먼저 실행, 같으면 먼저 들어온 순서)
+
+        Args:
+            fn: 실제 API 호출 함수
+            priority: PRIORITY_URGENT / PRIORITY_NORMAL / PRIORITY_BACKGROUND
+            estimated_tokens: 프롬프트 예상 토큰 (예산 사전 검사용)
+        """
+        future = Future()
+        with self._cond:
+            heapq.heappush(self._queue, (priority, next(self._counter), fn, estimated_tokens, future))
+            if self._dispatcher is None:
+                self._dispatcher = threading.Thread(target=self._dispatch_loop, daemon=True)
+                self._dispatcher.start()
+            self._cond.notify_all()
+        return future
+
+    def run(
+        self,
+        fn: Callable[[], Any],
+        priority: int = PRIORITY_NORMAL,
+        estimated_tokens: int = 0
+    ) -> Any:
+        """submit 후 결과를 기다림"""
+        return self.submit(fn, priority, estimated_tokens).result()
+
+    # ------------------------------------------------------------
+    # 예산 / 사용량
+    # ------------------------------------------------------------
+
+    def _refresh_session_usage(self):
+        """다른 프로세스가 같은 세션에 기록한 사용량 반영"""
+        if self.session_state_file:
+            self.usage = read_session_usage(self.session_state_file)
+
+    def check_budget(self, estimated_tokens: int = 0):
+        """예산 초과 시 BudgetExceededError (세션 누적 + 실행 중 예약분 기준)"""
+        with self._cond:
+            self._check_budget_locked(estimated_tokens)
+
+    def _check_budget_locked(self, estimated_tokens: int):
+        used_tokens = self.usage["total_tokens"] + self.reserved_tokens
+        if self.token_budget is not None and used_tokens + estimated_tokens > self.token_budget:
+            raise BudgetExceededError(
+                f"Sonar token budget exceeded ({used_tokens} + {estimated_tokens} > {self.token_budget})"
+            )
+        used_cost = self.usage["cost_usd"] + self.reserved_cost
+        if self.cost_budget is not None and used_cost >= self.cost_budget:
+            raise BudgetExceededError(
+                f"Sonar cost budget exceeded (${used_cost:.2f} >= ${self.cost_budget:.2f})"
+            )
+
+    def reserve(self, estimated_tokens: int = 0):
+        """예산 확인과 예약을 한 번에 (동시 요청이 모두 같은 잔여 예산을 보고 통과하지 않도록)"""
+        with self._cond:
+            self._refresh_session_usage()
+            self._check_budget_locked(estimated_tokens)
+            self.reserved_tokens += estimated_tokens
+            self.reserved_cost += usage_cost({"prompt_tokens": estimated_tokens})
+
+    def release(self, estimated_tokens: int = 0):
+        """reserve한 예상치 해제"""
+        with self._cond:
+            self.reserved_tokens = max(0, self.reserved_tokens - estimated_tokens)
+            self.reserved_cost = max(0.0, self.reserved_cost - usage_cost({"prompt_tokens": estimated_tokens}))
+
+    def acquire_retry(self, estimated_tokens: int = 0):
+        """
+        HTTP 재시도 전 호출 (http_client의 before_retry): 재시도도 속도 제한과 예산을 따름
+
+        예약은 원래 요청의 것을 그대로 쓰고, 예산은 현재 사용량 기준으로 다시 확인한다.
+        """
+        while not self.bucket.try_acquire():
+            time.sleep(max(self.bucket.wait_time(), 0.01))
+        with self._cond:
+            self._refresh_session_usage()
+            self._check_budget_locked(0)
+
+    def record_usage(self, usage: Optional[Dict], reserved_tokens: int = 0):
+        """
+        응답 usage를 세션 사용량에 더하고 예약 해제
+
+        Args:
+            usage: 응답의 usage 필드
+            reserved_tokens: 이 요청이 reserve한 예상 토큰 (run/submit의 estimated_tokens)
+        """
+        usage = usage or {}
+        delta = {
+            "requests": 1,
+            "prompt_tokens": usage.get("prompt_tokens", 0),
+            "completion_tokens": usage.get("completion_tokens", 0),
+            "total_tokens": usage.get("total_tokens", 0),
+            "cost_usd": usage_cost(usage),
+        }
+        self.release(reserved_tokens)
+
+        if self.session_state_file:
+            with self._state_lock:
+                total = add_usage_to_session(self.session_state_file, delta)
+            with self._cond:
+                self.usage = total
+        else:
+            with self._cond:
+                self.usage = _add_usage(self.usage, delta)
+
+    # ------------------------------------------------------------
+    # 디스패처
+    # ------------------------------------------------------------
+
+    def _dispatch_loop(self):
+        while True:
+            with self._cond:
+                while not self._queue or self._running >= self.max_concurrent:
+                    self._cond.wait()
+
+            # 속도 제한 대기 (대기 중 더 급한 요청이 들어오면 그 요청이 먼저 나감)
+            wait = self.bucket.wait_time()
+            if wait > 0:
+                time.sleep(min(wait, 1.0))
+                continue
+            if not self.bucket.try_acquire():
+                continue
+
+            with self._cond:
+                priority, _, fn, estimated_tokens, future = heapq.heappop(self._queue)
+                self._running += 1
+
+            threading.Thread(
+                target=self._execute, args=(fn, estimated_tokens, future), daemon=True
+            ).start()
+
+    def _execute(self, fn: Callable[[], Any], estimated_tokens: int, future: Future):
+        # 취소되었거나 예산 초과로 API를 호출하지 않으면 속도 제한 토큰을 돌려준다
+        try:
+            if not future.set_running_or_notify_cancel():
+                self.bucket.refund()
+                return
+            try:
+                self.reserve(estimated_tokens)
+            except BaseException as e:
+                self.bucket.refund()
+                future.set_exception(e)
+                return
+            try:
+                future.set_result(fn())
+            except BaseException as e:
+                # 응답이 없으면 record_usage가 호출되지 않으므로 여기서 예약 해제
+                self.release(estimated_tokens)
+                future.set_exception(e)
+        finally:
+            with self._cond:
+                self._running -= 1
+                self._cond.notify_all()
+
+
+def empty_usage() -> Dict:
+    return {
+        "requests": 0,
+        "prompt_tokens": 0,
+        "completion_tokens": 0,
+        "total_tokens": 0,
+        "cost_usd": 0.0,
+    }
+
+
+def _add_usage(usage: Dict, delta: Dict) -> Dict:
+    total = {field: (usage or {}).get(field, 0) + delta.get(field, 0) for field in empty_usage()}
+    total["cost_usd"] = round(total["cost_usd"], 6)
+    return total
+
+
+def read_session_usage(session_state_file: str) -> Dict:
+    """세션 상태 YAML의 api_usage.sonar (없으면 0)"""
+    import yaml
+
+    path = Path(session_state_file)
+    if not path.exists():
+        return empty_usage()
+    with open(path, "r", encoding="utf-8") as f:
+        state = yaml.safe_load(f) or {}
+    return _add_usage((state.get("api_usage") or {}).get("sonar"), {})
+
+
+def add_usage_to_session(session_state_file: str, delta: Dict) -> Dict:
+    """
+    세션 상태 YAML(state/session_template.yaml 형식)의 Sonar 사용량에 delta를 더함
+
+    api_usage.sonar와 agent_states.research_expander.searches_performed를 갱신한다.
+    같은 세션을 쓰는 여러 프로세스가 서로 덮어쓰지 않도록 {파일}.lock으로 읽기-수정-쓰기를 잠근다.
+
+    Returns:
+        더한 후의 세션 누적 사용량
+    """
+    import yaml
+
+    path = Path(session_state_file)
+    with open(path.with_suffix(path.suffix + ".lock"), "a") as lock_file:
+        if fcntl:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+        state = {}
+        if path.exists():
+            with open(path, "r", encoding="utf-8") as f:
+                state = yaml.safe_load(f) or {}
+
+        api_usage = state.setdefault("api_usage", {})
+        usage = _add_usage(api_usage.get("sonar"), delta)
+        api_usage["sonar"] = usage
+        expander = state.setdefault("agent_states", {}).setdefault("research_expander", {})
+        expander["searches_performed"] = usage["requests"]
+
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            yaml.safe_dump(state, f, allow_unicode=True, sort_keys=False)
+        os.replace(tmp_path, path)
+
+    return usage
+
+
+_default_scheduler = None
+_default_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> SonarScheduler:
+    """프로세스 공용 SonarScheduler (SonarAPI 인스턴스가 여러 개여도 속도 제한/예산 공유)"""
+    global _default_scheduler
+    with _default_scheduler_lock:
+        if _default_scheduler is None:
+            _default_scheduler = SonarScheduler()
+        return _default_scheduler
@@ -8,11 +8,17 @@ import os
 import re
 import json
 import base64
+import hashlib
+import uuid
 from pathlib import Path
 from typing import Dict, Optional, List
+from urllib.parse import urlsplit
 import requests
 import markdown
 
+from asset_registry import AssetRegistry, file_content_hash, webp_variant
+from http_client import get_http_client
+
 # .env 파일 로드
 try:
     from dotenv import load_dotenv
@@ -48,10 +54,13 @@ class WordPressPublisher:
 
         self.api_url = f"{self.site_url}/wp-json/wp/v2"
 
+        # 타임아웃/재시도/circuit breaker 공용 클라이언트
+        self.http = get_http_client()
+
     def test_connection(self) -> bool:
         """연결 테스트"""
         try:
-            response = requests.get(
+            response = self.http.get(
                 f"{self.api_url}/users/me",
                 headers=self.headers
             )
@@ -65,7 +74,7 @@ class WordPressPublisher:
 
     def get_categories(self) -> List[Dict]:
         """카테고리 목록 조회"""
-        response = requests.get(
+        response = self.http.get(
             f"{self.api_url}/categories",
             headers=self.headers,
             params={"per_page": 100}
@@ -82,7 +91,7 @@ class WordPressPublisher:
                 return cat["id"]
 
         # 카테고리 생성
-        response = requests.post(
+        response = self.http.post(
             f"{self.api_url}/categories",
             headers=self.headers,
             json={"name": name}
@@ -92,7 +101,7 @@ class WordPressPublisher:
 
     def get_tags(self) -> List[Dict]:
         """태그 목록 조회"""
-        response = requests.get(
+        response = self.http.get(
             f"{self.api_url}/tags",
             headers=self.headers,
             params={"per_page": 100}
@@ -111,7 +120,7 @@ class WordPressPublisher:
                 tag_ids.append(tag_map[name])
             else:
                 # 태그 생성
-                response = requests.post(
+                response = self.http.post(
                     f"{self.api_url}/tags",
                     headers=self.headers,
                     json={"name": name}
@@ -121,6 +130,32 @@ class WordPressPublisher:
 
         return tag_ids
 
+    def find_post_by_idempotency_key(self, idempotency_key: str) -> Optional[Dict]:
+        """
+        멱등성 키 마커가 본문에 포함된 글 조회
+
+        WordPress 검색은 본문(HTML 주석 포함)도 대상으로 하므로
+        create_post가 남긴 마커로 이전 시도에서 생성된 글을 찾을 수 있다.
+        """
+        marker = idempotency_marker(idempotency_key)
+        response = self.http.get(
+            f"{self.api_url}/posts",
+            headers=self.headers,
+            params={
+                "search": idempotency_key,
+                "status": "publish,future,draft,pending,private",
+                "context": "edit",
+                "per_page": 10
+            }
+        )
+        response.raise_for_status()
+
+        for post in response.json():
+            raw = post.get("content", {}).get("raw", "")
+            if marker in raw:
+                return post
+        return None
+
     def create_post(
         self,
         title: str,
@@ -129,7 +164,8 @@ class WordPressPublisher:
         categories: List[int] = None,
         tags: List[int] = None,
         excerpt: str = None,
-        meta: Dict = None
+        meta: Dict = None,
+        idempotency_key: str = None
     ) -> Dict:
         """
         새 글 생성
@@ -142,10 +178,19 @@ class WordPressPublisher:
             tags: 태그 ID 목록
             excerpt: 요약문
             meta: 메타 필드 (Yoast SEO 등)
+            idempotency_key: 재시도 시 중복 생성을 막기 위한 키
+                (같은 키로 이미 생성된 글이 있으면 새로 만들지 않고 반환)
 
         Returns:
             생성된 글 정보
         """
+        if idempotency_key:
+            existing = self.find_post_by_idempotency_key(idempotency_key)
+            if existing:
+                print(f"Post already created for key {idempotency_key} (ID: {existing['id']})")
+                return existing
+            content = f"{content}\n{idempotency_marker(idempotency_key)}"
+
         post_data = {
             "title": title,
             "content": content,
@@ -161,7 +206,7 @@ class WordPressPublisher:
         if meta:
             post_data["meta"] = meta
 
-        response = requests.post(
+        response = self.http.post(
             f"{self.api_url}/posts",
             headers=self.headers,
             json=post_data
@@ -169,6 +214,26 @@ class WordPressPublisher:
         response.raise_for_status()
         return response.json()
 
+    def update_post(self, post_id: int, fields: Dict) -> Dict:
+        """
+        기존 글 수정 (전달된 필드만 변경)
+
+        Args:
+            post_id: 글 ID
+            fields: 변경할 필드 (title, content, excerpt, status, categories, tags, meta)
+
+        Returns:
+            수정된 글 정보
+        """
+        response = self.http.post(
+            f"{self.api_url}/posts/{post_id}",
+            headers=self.headers,
+            idempotent=True,
+            json=fields
+        )
+        response.raise_for_status()
+        return response.json()
+
     def set_featured_image_fifu(
         self,
         post_id: int,
@@ -181,9 +246,10 @@ class WordPressPublisher:
         그렇지 않으면 post meta로 직접 설정
         """
         # FIFU는 보통 fifu_image_url 메타 필드 사용
-        response = requests.post(
+        response = self.http.post(
             f"{self.api_url}/posts/{post_id}",
             headers=self.headers,
+            idempotent=True,
             json={
                 "meta": {
                     "fifu_image_url": image_url,
@@ -215,9 +281,10 @@ class WordPressPublisher:
         if meta_description:
             meta_data["rank_math_description"] = meta_description
 
-        response = requests.post(
+        response = self.http.post(
             f"{self.api_url}/posts/{post_id}",
             headers=self.headers,
+            idempotent=True,
             json={"meta": meta_data}
         )
 
@@ -229,6 +296,11 @@ class WordPressPublisher:
             return False
 
 
+def idempotency_marker(idempotency_key: str) -> str:
+    """본문에 삽입되는 멱등성 키 마커 (HTML 주석, 화면에 표시되지 않음)"""
+    return f"<!-- publish-key:{idempotency_key} -->"
+
+
 def md_to_html(md_content: str) -> str:
     """
     Markdown을 WordPress 호환 HTML로 변환
@@ -259,16 +331,107 @@ def md_to_html(md_content: str) -> str:
     return html
 
 
+IMG_TAG_PATTERN = re.compile(r'<img\b[^>]*>', re.IGNORECASE)
+
+
+def _get_attr(tag: str, name: str) -> Optional[str]:
+    match = re.search(rf'\s{name}="([^"]*)"', tag)
+    return match.group(1) if match else None
+
+
+def _set_attr(tag: str, name: str, value: str) -> str:
+    if _get_attr(tag, name) is not None:
+        return re.sub(rf'(\s{name}=)"[^"]*"', rf'\1"{value}"', tag, count=1)
+    end = -2 if tag.endswith("/>") else -1
+    return f'{tag[:end].rstrip()} {name}="{value}"{" />" if end == -2 else ">"}'
+
+
+def _remove_attr(tag: str, name: str) -> str:
+    return re.sub(rf'\s{name}="[^"]*"', "", tag, count=1)
+
+
+def add_image_attributes(
+    html: str,
+    media: Dict[str, Dict] = None,
+    placeholders: Dict[str, Dict] = None
+) -> str:
+    """
+    렌더링된 HTML의 <img>에 크기/로딩 속성 추가
+
+    - width/height: 이미지 manifest({host}_media.json)에서 src URL(또는 파일명)로 조회
+      브라우저가 로딩 전에 자리를 잡아 layout shift 방지
+    - 첫 이미지(LCP, 보통 paper_first_page): fetchpriority="high"
+    - 나머지: loading="lazy", decoding="async"
+    - placeholder(LQIP)가 있으면 style 배경으로 인라인 -> 원본 로딩 전에 흐린 이미지가 바로 표시
+    본문에 직접 지정된 width/height/loading/decoding/style은 유지한다.
+
+    Args:
+        html: md_to_html() 결과
+        media: {파일명: {"url", "width", "height", "sizes"}}
+        placeholders: {파일명: {"lqip", "color"}} (image_processor placeholders.json)
+
+    Returns:
+        속성이 추가된 HTML
+    """
+    by_url, by_stem = {}, {}
+    for name, entry in (media or {}).items():
+        by_stem[Path(name).stem] = entry
+        by_url[entry["url"]] = entry
+        for size in (entry.get("sizes") or {}).values():
+            by_url.setdefault(size["url"], size)
+
+    placeholder_by_stem = {Path(name).stem: value for name, value in (placeholders or {}).items()}
+    stem_by_url = {entry["url"]: Path(name).stem for name, entry in (media or {}).items()}
+    count = 0
+
+    def process(match) -> str:
+        nonlocal count
+        tag = match.group(0)
+        src = _get_attr(tag, "src") or ""
+        stem = stem_by_url.get(src) or Path(urlsplit(src).path).stem
+        entry = by_url.get(src) or by_stem.get(stem)
+
+        if entry and entry.get("width") and entry.get("height") and _get_attr(tag, "width") is None:
+            tag = _set_attr(tag, "width", str(entry["width"]))
+            tag = _set_attr(tag, "height", str(entry["height"]))
+
+        placeholder = placeholder_by_stem.get(stem)
+        if placeholder and _get_attr(tag, "style") is None:
+            tag = _set_attr(
+                tag, "style",
+                f"background:{placeholder['color']} url({placeholder['lqip']}) center/cover no-repeat"
+            )
+
+        if count == 0:
+            if _get_attr(tag, "loading") == "lazy":
+                tag = _remove_attr(tag, "loading")
+            tag = _set_attr(tag, "fetchpriority", "high")
+        else:
+            for name, value in (("loading", "lazy"), ("decoding", "async")):
+                if _get_attr(tag, name) is None:
+                    tag = _set_attr(tag, name, value)
+        count += 1
+        return tag
+
+    return IMG_TAG_PATTERN.sub(process, html)
+
+
+def media_manifest_path(url_mapping_path: str) -> Path:
+    """{host}_urls.json 옆의 {host}_media.json 경로"""
+    path = Path(url_mapping_path)
+    return path.with_name(path.name.replace("_urls.json", "_media.json"))
+
+
 def replace_image_urls(
     content: str,
     url_mapping: Dict[str, str]
 ) -> str:
     """
-    로컬 이미지 경로를 Google Drive URL로 치환
+    로컬 이미지 경로를 이미지 호스트 URL로 치환
 
     Args:
         content: HTML 또는 Markdown 본문
-        url_mapping: {로컬파일명: GDrive URL} 매핑
+        url_mapping: {로컬파일명: 호스트 URL} 매핑
 
     Returns:
         URL이 치환된 본문
@@ -290,25 +453,156 @@ def replace_image_urls(
     return content
 
 
+LOCAL_IMAGE_PATTERN = re.compile(r'!\[[^\]]*\]\(([^)\s]+)[^)]*\)|<img[^>]+src="([^"]+)"')
+
+
+def resolve_registered_images(
+    content: str,
+    base_dir: str,
+    url_mapping: Dict[str, str],
+    registry: AssetRegistry,
+    host: str = "gdrive"
+) -> Dict[str, str]:
+    """
+    url_mapping에 없는 로컬 이미지 참조를 레지스트리에서 찾아 매핑에 추가
+
+    다른 글에서 이미 업로드된 이미지(로고, 표지 등)를 그대로 참조한 경우
+    업로드 단계 없이도 URL을 얻는다. 조회는 로컬 DB만 사용.
+
+    Args:
+        content: Markdown 본문
+        base_dir: 상대 경로 기준 디렉토리 (Markdown 파일 위치)
+        url_mapping: 기존 {파일명: URL} 매핑
+        registry: AssetRegistry
+        host: 이미지 호스트 이름 (image_hosts)
+
+    Returns:
+        레지스트리에서 찾은 항목이 추가된 매핑 사본
+    """
+    mapping = dict(url_mapping)
+    known_stems = {Path(name).stem for name in mapping}
+
+    for match in LOCAL_IMAGE_PATTERN.finditer(content):
+        ref = match.group(1) or match.group(2)
+        if ref.startswith(("http://", "https://", "data:")) or Path(ref).stem in known_stems:
+            continue
+        path = Path(base_dir) / ref
+        if not path.is_file():
+            continue
+        record = registry.find_uploaded(file_content_hash(str(path)), host, webp_variant())
+        if record:
+            mapping[path.name] = record["url"]
+            known_stems.add(path.stem)
+            print(f"  {path.name} -> {record['url']} (registry)")
+
+    return mapping
+
+
+def hash_post_fields(fields: Dict) -> Dict[str, str]:
+    """
+    글 필드별 해시 (meta는 키 단위)
+
+    본문 전체를 저장하지 않고도 다음 발행 시 변경된 필드를 판단할 수 있다.
+    """
+    hashes = {}
+    for name, value in fields.items():
+        if name == "meta":
+            for key, meta_value in value.items():
+                hashes[f"meta.{key}"] = _hash_value(meta_value)
+        else:
+            hashes[name] = _hash_value(value)
+    return hashes
+
+
+def _hash_value(value) -> str:
+    encoded = json.dumps(value, ensure_ascii=False, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def diff_post_fields(fields: Dict, previous_hashes: Dict[str, str]) -> Dict:
+    """
+    이전 발행 해시와 비교하여 변경된 필드만 반환
+
+    이전 발행에 있었지만 이번에 빠진 meta 키는 None으로 보낸다
+    (WordPress REST API는 null meta 값을 삭제로 처리).
+
+    Returns:
+        변경된 필드 (meta는 변경/삭제된 키만 포함), 변경 없으면 빈 dict
+    """
+    current = hash_post_fields(fields)
+    changed = {}
+    for name, value in fields.items():
+        if name == "meta":
+            meta = {
+                key: meta_value for key, meta_value in value.items()
+                if previous_hashes.get(f"meta.{key}") != current[f"meta.{key}"]
+            }
+            for hash_key in previous_hashes:
+                if hash_key.startswith("meta.") and hash_key not in current:
+                    meta[hash_key[len("meta."):]] = None
+            if meta:
+                changed["meta"] = meta
+        elif previous_hashes.get(name) != current[name]:
+            changed[name] = value
+    return changed
+
+
+def find_featured_image_url(url_mapping: Dict[str, str], metadata: Dict) -> Optional[str]:
+    """
+    대표 이미지 URL 결정
+    우선순위: 1) 논문 첫 페이지 2) metadata의 featured_image
+    """
+    # 논문 첫 페이지 이미지 찾기
+    for key in url_mapping:
+        if 'paper_first_page' in key or 'first_page' in key:
+            return url_mapping[key]
+
+    # 없으면 metadata에서 가져오기
+    featured_image = metadata.get("featured_image")
+    if featured_image:
+        featured_name = Path(featured_image).name
+        webp_name = Path(featured_image).stem + ".webp"
+        return url_mapping.get(webp_name) or url_mapping.get(featured_name)
+
+    return None
+
+
 def publish_blog_post(
     md_file: str,
     url_mapping: Dict[str, str],
     category_name: str = "최신 치과교정학 연구",
     focus_keyword: str = None,
-    status: str = "draft"
+    status: str = "draft",
+    idempotency_key: str = None,
+    previous: Dict = None,
+    registry: AssetRegistry = None,
+    image_host: str = None,
+    image_media: Dict[str, Dict] = None,
+    image_placeholders: Dict[str, Dict] = None
 ) -> Dict:
     """
     블로그 글 발행 통합 함수
 
+    이전 발행 결과(previous)에 post_id가 있으면 새 글을 만들지 않고
+    변경된 필드만 POST /posts/{id}로 전송한다. 변경이 없으면 요청하지 않는다.
+
     Args:
         md_file: Markdown 파일 경로
         url_mapping: 이미지 URL 매핑
         category_name: 카테고리 이름
         focus_keyword: Yoast Focus 키워드
         status: publish 또는 draft
+        idempotency_key: 글 생성 멱등성 키 (재시도 시 중복 draft 방지).
+            이전 글이 삭제되어(404/410) 새로 만드는 경우에도 사용하므로 post_id가 있어도 넘긴다.
+            없으면 새로 만들지만 재시도 간에 유지되지 않는다.
+        previous: 이전 발행 결과 (post_id, post_url, field_hashes)
+        registry: 지정하면 url_mapping에 없는 로컬 이미지를 레지스트리에서 찾아 치환
+        image_host: 레지스트리 조회 대상 이미지 호스트 (None이면 IMAGE_HOST 환경변수, 기본 gdrive)
+        image_media: 이미지 manifest ({host}_media.json) - <img> width/height 삽입용
+        image_placeholders: LQIP (webp/placeholders.json) - <img> 배경으로 인라인
 
     Returns:
-        발행 결과
+        발행 결과 (field_hashes, updated_fields 포함)
     """
     # Markdown 파일 읽기
     with open(md_file, 'r', encoding='utf-8') as f:
@@ -323,10 +617,86 @@ def publish_blog_post(
             metadata = yaml.safe_load(parts[1])
 
     # 이미지 URL 치환
+    if registry is not None:
+        url_mapping = resolve_registered_images(
+            md_content, str(Path(md_file).parent), url_mapping, registry,
+            image_host or os.environ.get("IMAGE_HOST") or "gdrive"
+        )
     md_content = replace_image_urls(md_content, url_mapping)
 
-    # HTML 변환
-    html_content = md_to_html(md_content)
+    # HTML 변환 (+ 이미지 크기/lazy loading/placeholder 속성)
+    html_content = add_image_attributes(md_to_html(md_content), image_media, image_placeholders)
+
+    title = metadata.get("title", Path(md_file).stem)
+    excerpt = metadata.get("excerpt", "")
+    featured_url = find_featured_image_url(url_mapping, metadata)
+
+    # 발행할 필드 (카테고리/태그는 이름 기준으로 비교, 전송 시 ID로 변환)
+    meta = {}
+    if featured_url:
+        meta["fifu_image_url"] = featured_url
+        meta["_thumbnail_ext_url"] = featured_url  # 일부 FIFU 버전
+    if focus_keyword:
+        meta["rank_math_focus_keyword"] = focus_keyword
+        if excerpt:
+            meta["rank_math_description"] = excerpt[:160]
+
+    fields = {
+        "title": title,
+        "content": html_content,
+        "excerpt": excerpt,
+        "status": status,
+        "categories": [category_name],
+        "tags": metadata.get("tags", []),
+        "meta": meta
+    }
+    field_hashes = hash_post_fields(fields)
+
+    previous = previous or {}
+    post_id = previous.get("post_id")
+
+    if post_id:
+        # 해시가 없는 이전 결과는 모든 필드를 변경된 것으로 간주
+        changed = diff_post_fields(fields, previous.get("field_hashes") or {})
+
+        if not changed:
+            print(f"No changes since last publish (ID: {post_id})")
+            return {
+                "post_id": post_id,
+                "post_url": previous.get("post_url"),
+                "status": status,
+                "title": title,
+                "field_hashes": field_hashes,
+                "updated_fields": []
+            }
+
+        wp = WordPressPublisher()
+
+        # 변경된 필드만 전송
+        payload = {k: v for k, v in changed.items() if k not in ("categories", "tags")}
+        if "categories" in changed:
+            payload["categories"] = [wp.get_or_create_category(category_name)]
+        if "tags" in changed:
+            payload["tags"] = wp.get_or_create_tags(changed["tags"])
+
+        updated_fields = sorted(changed)
+        try:
+            post = wp.update_post(post_id, payload)
+        except requests.HTTPError as e:
+            if e.response is None or e.response.status_code not in (404, 410):
+                raise
+            # 글이 삭제된 경우 새로 생성
+            print(f"Post {post_id} not found, creating a new post")
+        else:
+            print(f"Post updated: {post['link']} (ID: {post_id}, fields: {', '.join(updated_fields)})")
+            return {
+                "post_id": post_id,
+                "post_url": post["link"],
+                "status": status,
+                "title": title,
+                "field_hashes": field_hashes,
+                "updated_fields": updated_fields
+            }
 
     # WordPress 발행
     wp = WordPressPublisher()
@@ -343,52 +713,42 @@ def publish_blog_post(
     if "tags" in metadata:
         tag_ids = wp.get_or_create_tags(metadata["tags"])
 
-    # 글 생성
-    title = metadata.get("title", Path(md_file).stem)
-    excerpt = metadata.get("excerpt", "")
-
+    # 글 생성 (생성 경로에는 항상 멱등성 키 마커를 남김)
+    if not idempotency_key:
+        idempotency_key = uuid.uuid4().hex
     post = wp.create_post(
         title=title,
         content=html_content,
         status=status,
         categories=[category_id],
         tags=tag_ids,
-        excerpt=excerpt
+        excerpt=excerpt,
+        idempotency_key=idempotency_key
     )
 
     post_id = post["id"]
     print(f"Post created: {post['link']} (ID: {post_id})")
 
     # 대표 이미지 설정 (FIFU)
-    # 우선순위: 1) 논문 첫 페이지 2) metadata의 featured_image
-    featured_url = None
-
-    # 논문 첫 페이지 이미지 찾기
-    for key in url_mapping:
-        if 'paper_first_page' in key or 'first_page' in key:
-            featured_url = url_mapping[key]
-            break
-
-    # 없으면 metadata에서 가져오기
-    if not featured_url:
-        featured_image = metadata.get("featured_image")
-        if featured_image:
-            featured_name = Path(featured_image).name
-            webp_name = Path(featured_image).stem + ".webp"
-            featured_url = url_mapping.get(webp_name) or url_mapping.get(featured_name)
-
     if featured_url:
-        wp.set_featured_image_fifu(post_id, featured_url)
+        if not wp.set_featured_image_fifu(post_id, featured_url):
+            # 설정 실패한 메타는 다음 실행 시 다시 전송
+            field_hashes.pop("meta.fifu_image_url", None)
+            field_hashes.pop("meta._thumbnail_ext_url", None)
 
     # Rank Math SEO Focus 키워드
     if focus_keyword:
-        wp.set_rankmath_meta(post_id, focus_keyword, excerpt[:160] if excerpt else None)
+        if not wp.set_rankmath_meta(post_id, focus_keyword, excerpt[:160] if excerpt else None):
+            field_hashes.pop("meta.rank_math_focus_keyword", None)
+            field_hashes.pop("meta.rank_math_description", None)
 
     return {
         "post_id": post_id,
         "post_url": post["link"],
         "status": status,
-        "title": title
+        "title": title,
+        "field_hashes": field_hashes,
+        "updated_fields": sorted(fields)
     }
 
 
@@ -404,11 +764,24 @@ if __name__ == "__main__":
 
     # URL 매핑 로드
     url_mapping = {}
+    image_media = {}
+    image_placeholders = {}
     if len(sys.argv) > 2:
         with open(sys.argv[2], 'r', encoding='utf-8') as f:
             url_mapping = json.load(f)
+        media_path = media_manifest_path(sys.argv[2])
+        if media_path.exists():
+            with open(media_path, 'r', encoding='utf-8') as f:
+                image_media = json.load(f)
+        placeholders_path = Path(sys.argv[2]).with_name("placeholders.json")
+        if placeholders_path.exists():
+            with open(placeholders_path, 'r', encoding='utf-8') as f:
+                image_placeholders = json.load(f)
 
     status = sys.argv[3] if len(sys.argv) > 3 else "draft"
 
-    result = publish_blog_post(md_file, url_mapping, status=status)
+    registry = AssetRegistry()
+    result = publish_blog_post(md_file, url_mapping, status=status, registry=registry,
+                               image_media=image_media, image_placeholders=image_placeholders)
+    registry.close()
     print(f"\nPublished: {result['post_url']}")